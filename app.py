@@ -1,52 +1,25 @@
 from flask import Flask, render_template
 from instance.config import Config
-from routes.auth_routes import auth_bp
-from routes.admin_routes import admin_bp
-from routes.profile import profile_bp
-from routes.conference_routes import conference_bp
-from routes.roles import roles_bp
-from routes.participant import participant_bp
-from routes.organizer_routes import organizer_bp
-from routes.reviewer_routes import reviewer_bp
-from routes.author_routes import author_bp
-from routes.publish_schedule_pdf import schedule_bp
 from extensions import db
+from commands import register_commands
+from utils.db_pool import configure_db_pool, init_db_pool_metrics
+from utils.sessions import init_sessions
+from utils.analytics import init_analytics
+from utils.content_versions import init_content_versions
+from utils.static_site import init_static_site
+from utils.page_cache import init_page_cache
+from utils.template_cache import init_template_cache, warm_templates
 from datetime import datetime,date
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-app = Flask(__name__, instance_relative_config=True)
-app.config.from_object(Config)
-# Initialize extensions
-db.init_app(app)
 
-migrate = Migrate(app, db)
-
-from models import *
-
-# Register blueprints
-app.register_blueprint(auth_bp)
-app.register_blueprint(admin_bp)
-app.register_blueprint(conference_bp)
-app.register_blueprint(profile_bp)
-app.register_blueprint(roles_bp)
-app.register_blueprint(participant_bp)
-app.register_blueprint(organizer_bp)
-app.register_blueprint(schedule_bp)
-app.register_blueprint(reviewer_bp)
-app.register_blueprint(author_bp, url_prefix='/author')
-
-
-@app.context_processor
 def inject_now():
     return {'now': datetime.now}
 
-@app.route("/")
 def home():
     return render_template("index.html")
 
-#with app.app_context():
-    #db.create_all()
-
 def is_submitted_test(value):
     """Checks if a review recommendation is submitted (i.e., not None)."""
     return value is not None
@@ -60,8 +33,88 @@ def format_datetime_filter(value, format_string):
         return value.strftime(format_string)
     return value # Return original value if it's not a date/datetime
 
-app.jinja_env.tests['is_submitted'] = is_submitted_test
-app.jinja_env.filters['strftime'] = format_datetime_filter
+
+def register_blueprints(app):
+    # Imported when an app is built: the blueprints pull in every route's dependencies
+    from routes.auth_routes import auth_bp
+    from routes.admin_routes import admin_bp
+    from routes.profile import profile_bp
+    from routes.conference_routes import conference_bp
+    from routes.roles import roles_bp
+    from routes.participant import participant_bp
+    from routes.organizer_routes import organizer_bp
+    from routes.reviewer_routes import reviewer_bp
+    from routes.author_routes import author_bp
+    from routes.publish_schedule_pdf import schedule_bp
+    from routes.health import health_bp
+
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(conference_bp)
+    app.register_blueprint(profile_bp)
+    app.register_blueprint(roles_bp)
+    app.register_blueprint(participant_bp)
+    app.register_blueprint(organizer_bp)
+    app.register_blueprint(schedule_bp)
+    app.register_blueprint(reviewer_bp)
+    app.register_blueprint(author_bp, url_prefix='/author')
+    app.register_blueprint(health_bp)
+
+
+def create_app(config_object=Config):
+    """Builds a configured application; `config_object` is anything app.config.from_object() accepts."""
+    app = Flask(__name__, instance_relative_config=True)
+    app.config.from_object(config_object)
+    # Client address and scheme from the trusted proxies' X-Forwarded-* headers (rate limits key on it)
+    if app.config.get('TRUSTED_PROXIES'):
+        proxies = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+    # Initialize extensions
+    configure_db_pool(app)
+    db.init_app(app)
+    init_db_pool_metrics(app)
+    init_sessions(app)
+    init_analytics(app)
+    init_content_versions(app)
+    init_static_site(app)
+    init_page_cache(app)
+
+    Migrate(app, db)
+    register_commands(app)
+
+    # Register blueprints
+    register_blueprints(app)
+
+    app.context_processor(inject_now)
+    app.add_url_rule("/", "home", home)
+
+    #with app.app_context():
+        #db.create_all()
+
+    app.jinja_env.tests['is_submitted'] = is_submitted_test
+    app.jinja_env.filters['strftime'] = format_datetime_filter
+
+    # Web workers compile every template before taking traffic (filters must be registered first)
+    init_template_cache(app)
+    if app.config.get('TEMPLATE_WARMUP', False):
+        warm_templates(app)
+
+    return app
+
+
+_app = None
+
+
+def __getattr__(name):
+    # `app` is built on first access, so `flask --app app` and `gunicorn app:app` get the
+    # module-level instance while `gunicorn 'app:create_app()'` builds only its own
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,199 @@
+"""
+Flask CLI commands for periodic / maintenance jobs.
+
+Run with `flask --app app <command>`; schedule them from cron or the platform's
+job runner. Each command runs inside the application context.
+"""
+import click
+
+
+def register_commands(app):
+    """Attaches all maintenance commands to the app's CLI."""
+
+    @app.cli.command("send-review-reminders")
+    def send_review_reminders_command():
+        """Emails each reviewer one digest of their overdue reviews."""
+        from utils.review_reminders import send_overdue_review_reminders
+
+        digests_sent, reviews_reminded = send_overdue_review_reminders()
+        click.echo(f"Sent {digests_sent} reminder digest(s) covering {reviews_reminded} overdue review(s).")
+
+    @app.cli.command("purge-sessions")
+    def purge_sessions_command():
+        """Deletes expired server-side sessions (SESSION_BACKEND = sql)."""
+        from utils.sessions import purge_expired_sessions
+
+        click.echo(f"Removed {purge_expired_sessions()} expired session(s).")
+
+    @app.cli.command("purge-otps")
+    @click.option("--batch-size", type=int, default=None, help="Rows deleted per transaction.")
+    def purge_otps_command(batch_size):
+        """Deletes expired pending registrations (one-time codes) in batches."""
+        from utils.otp import purge_expired_otps
+
+        click.echo(f"Removed {purge_expired_otps(batch_size=batch_size)} expired verification code(s).")
+
+    @app.cli.command("import-users")
+    @click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--base-url", required=True,
+                  help="Site root URL (e.g. https://conf.example.edu/) for the invitation emails' links.")
+    @click.option("--no-invitations", is_flag=True, help="Create the accounts without emailing anyone.")
+    def import_users_command(csv_path, base_url, no_invitations):
+        """Creates user accounts from a CSV file (name, email, ...), reporting progress per batch."""
+        from utils.user_import import import_users
+
+        def progress(report):
+            click.echo(f"  {report.rows_read} rows read: {report.created} created, "
+                       f"{report.duplicates} duplicate(s), {report.invalid} invalid")
+
+        with open(csv_path, newline="", encoding="utf-8-sig") as csv_file:
+            try:
+                report = import_users(csv_file, base_url, send_invitations=not no_invitations, on_progress=progress)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+
+        for line, message in report.errors:
+            click.echo(f"  line {line}: {message}")
+        click.echo(f"Done: {report.created} account(s) created, {report.invitations_queued} invitation(s) queued.")
+
+    @app.cli.command("refresh-analytics")
+    @click.option("--stale-only", is_flag=True, help="Only recompute conferences changed since the last refresh.")
+    def refresh_analytics_command(stale_only):
+        """Rebuilds the super admin analytics rollups (per conference and per university)."""
+        from utils.analytics import refresh_analytics, refresh_stale_analytics
+
+        refreshed = refresh_stale_analytics() if stale_only else refresh_analytics()
+        click.echo(f"Refreshed analytics for {refreshed} conference(s).")
+
+    @app.cli.command("generate-certificates")
+    @click.argument("conf_id", type=int)
+    @click.option("--limit", type=int, default=None, help="Issue at most this many certificates in this run.")
+    @click.option("--processes", type=int, default=None, help="PDF worker processes (default: CPU count).")
+    @click.option("--force", is_flag=True, help="Issue even though the conference has not ended.")
+    def generate_certificates_command(conf_id, limit, processes, force):
+        """Issues the missing certificates of a conference; safe to interrupt and re-run."""
+        from utils.certificates import generate_certificates
+
+        def progress(report):
+            click.echo(f"  {report.issued} issued, {report.failed} failed, {report.remaining} to go")
+
+        try:
+            report = generate_certificates(conf_id, limit=limit, processes=processes, on_progress=progress,
+                                           allow_incomplete=force)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        for role_id, message in report.errors:
+            click.echo(f"  role {role_id}: {message}")
+        click.echo(f"Done: {report.issued} certificate(s) issued, {report.remaining} still missing.")
+
+    @app.cli.command("benchmark-certificates")
+    @click.argument("conf_id", type=int)
+    @click.option("--count", type=int, default=50, help="Certificates rendered per mode.")
+    def benchmark_certificates_command(conf_id, count):
+        """Times full xhtml2pdf certificate renders against stamping onto a pre-rendered page."""
+        from extensions import db
+        from models import Conference
+        from utils.certificates import benchmark_render_modes
+
+        conference = db.session.get(Conference, conf_id)
+        if conference is None:
+            raise click.ClickException(f"Conference {conf_id} does not exist.")
+
+        per_certificate = benchmark_render_modes(conference, count)
+        for mode, seconds in per_certificate.items():
+            click.echo(f"  {mode:>5}: {seconds * 1000:8.1f} ms per certificate")
+        click.echo(f"Stamping is {per_certificate['html'] / per_certificate['stamp']:.1f}x faster "
+                   f"({count} certificates per mode).")
+
+    @app.cli.command("benchmark-pdf-engines")
+    @click.option("--sessions", type=int, default=100, help="Sessions in the synthetic schedule.")
+    @click.option("--papers", type=int, default=4, help="Papers per session.")
+    @click.option("--repeat", type=int, default=3, help="Timed renders per engine.")
+    def benchmark_pdf_engines_command(sessions, papers, repeat):
+        """Compares render time and peak memory of the PDF engines on a synthetic schedule."""
+        from utils.pdf_engines import benchmark_engines
+
+        click.echo(f"Schedule with {sessions} sessions x {papers} papers:")
+        for name, (seconds, peak_mib, size) in benchmark_engines(sessions, papers, repeat).items():
+            click.echo(f"  {name:>10}: {seconds * 1000:8.1f} ms per render, {peak_mib:6.1f} MiB peak, "
+                       f"{size / 1024:7.1f} KiB PDF")
+
+    @app.cli.command("compile-proceedings")
+    @click.argument("conf_id", type=int)
+    @click.option("--force", is_flag=True, help="Rebuild even if the current volume is cached.")
+    def compile_proceedings_command(conf_id, force):
+        """Compiles the proceedings volume from the conference's camera-ready files."""
+        from utils.proceedings import compile_proceedings
+
+        try:
+            report = compile_proceedings(conf_id, force=force)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        for paper_id, title in report.missing:
+            click.echo(f"  paper {paper_id} left out (no camera-ready file): {title}")
+        state = "Up to date" if report.cached else "Compiled"
+        click.echo(f"{state}: {report.papers} paper(s), {report.pages} page(s) -> {report.path}")
+
+    @app.cli.command("export-static")
+    @click.option("--output", type=click.Path(file_okay=False), default=None,
+                  help="Output directory (default: STATIC_EXPORT_DIR).")
+    @click.option("--force", is_flag=True, help="Re-render every conference, changed or not.")
+    def export_static_command(output, force):
+        """Renders the public conference pages and schedule PDFs to static files."""
+        from utils.static_site import publish_static_site
+
+        try:
+            report = publish_static_site(output, force=force)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Rendered {report.conferences_rendered} conference(s) ({report.files_written} file(s)), "
+                   f"{report.conferences_unchanged} unchanged, {report.conferences_removed} removed; "
+                   f"listing {'rendered' if report.listing_rendered else 'unchanged'}.")
+
+    @app.cli.command("warm-templates")
+    def warm_templates_command():
+        """Compiles every template into the shared bytecode cache; fails if any does not compile."""
+        from utils.template_cache import warm_templates
+
+        loaded, seconds, errors = warm_templates(app)
+        for name, message in errors:
+            click.echo(f"  {name}: {message}")
+        click.echo(f"Loaded {loaded} template(s) in {seconds * 1000:.0f} ms.")
+        if errors:
+            raise click.ClickException(f"{len(errors)} template(s) failed to compile.")
+
+    @app.cli.command("explain-role-lookups")
+    def explain_role_lookups_command():
+        """Prints EXPLAIN plans for the hot ConferenceRole queries and checks index usage."""
+        from utils.query_plans import check_role_lookup_plans
+
+        all_used = True
+        for name, acceptable_indexes, used, plan in check_role_lookup_plans():
+            all_used = all_used and used
+            click.echo(f"[{'OK' if used else 'MISS'}] {name} -> {' | '.join(acceptable_indexes)}")
+            for line in plan:
+                click.echo(f"    {line}")
+
+        if not all_used:
+            raise click.ClickException("Some queries do not use their intended index.")
+
+    @app.cli.command("benchmark-startup")
+    @click.option("--runs", type=int, default=3, help="Fresh interpreters to boot the app in.")
+    @click.option("--top", type=int, default=10, help="Slowest imports to list.")
+    def benchmark_startup_command(runs, top):
+        """Boots the app in fresh interpreters under -X importtime and reports time, RSS and slow imports."""
+        from utils.startup_profile import measure_startup
+
+        try:
+            report = measure_startup(runs, top, root=app.root_path)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(f"Startup: {report.seconds * 1000:.0f} ms, {report.max_rss_mib:.1f} MiB peak RSS "
+                   f"(median of {report.runs} run(s)).")
+        for module, seconds in report.slowest:
+            click.echo(f"  {seconds * 1000:8.1f} ms  {module}")
+        if report.heavy_loaded:
+            click.echo(f"Heavy modules loaded at boot: {', '.join(report.heavy_loaded)}")
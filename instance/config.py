@@ -17,4 +17,129 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool per worker process for server databases (see utils/db_pool.py):
+    # kept-open and extra connections, seconds to wait for a free one, maximum
+    # connection age in seconds and a liveness test on checkout (replaces connections
+    # broken by a failover). Size workers x (size + overflow) to the server's limit.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') not in ('0', 'false', 'False')
+    # PostgreSQL: server-side statement timeout (0 disables) and connection attempt timeout
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 10))
+
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+
+    # Password hashing policy (Werkzeug method string, e.g. "scrypt:32768:8:1" or
+    # "pbkdf2:sha256:600000"). Changing it upgrades existing hashes on next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+    # Concurrent hash computations per process, extra queued jobs, and how long a
+    # request waits for a slot before getting a "busy" response
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+    # Background threads used by utils.email_utils.enqueue_email for batch mail jobs
+    MAIL_OUTBOX_WORKERS = int(os.environ.get('MAIL_OUTBOX_WORKERS', 4))
+
+    # Default time a reviewer gets to submit a review when the organizer sets no due date
+    REVIEW_PERIOD_DAYS = int(os.environ.get('REVIEW_PERIOD_DAYS', 14))
+    # Minimum gap between two reminder digests for the same overdue review
+    REVIEW_REMINDER_INTERVAL_HOURS = int(os.environ.get('REVIEW_REMINDER_INTERVAL_HOURS', 48))
+
+    # Number of most recent completed conferences listed on the public explore page
+    EXPLORE_PAST_CONFERENCES_LIMIT = int(os.environ.get('EXPLORE_PAST_CONFERENCES_LIMIT', 100))
+
+    # Registration: "otp" emails a 6-digit code and creates the account once it is entered,
+    # "link" creates an unverified account and emails a verification link
+    REGISTRATION_VERIFICATION = os.environ.get('REGISTRATION_VERIFICATION', 'otp')
+    OTP_TTL_MINUTES = int(os.environ.get('OTP_TTL_MINUTES', 10))
+    OTP_MAX_ATTEMPTS = int(os.environ.get('OTP_MAX_ATTEMPTS', 5))
+    # Rows deleted per transaction by `flask purge-otps`
+    OTP_PURGE_BATCH_SIZE = int(os.environ.get('OTP_PURGE_BATCH_SIZE', 1000))
+
+    # Bulk CSV user import: rows per batch (one dedupe query + one INSERT each) and
+    # lifetime of the set-your-password links in the invitation emails
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))
+    IMPORT_INVITATION_EXPIRES_SEC = int(os.environ.get('IMPORT_INVITATION_EXPIRES_SEC', 7 * 24 * 3600))
+
+    # Mark analytics rollups stale on every ORM flush that touches papers, reviews,
+    # registrations or roles (see utils/analytics.py); `flask refresh-analytics` rebuilds them
+    ANALYTICS_TRACK_CHANGES = os.environ.get('ANALYTICS_TRACK_CHANGES', '1') not in ('0', 'false', 'False')
+
+    # Rows fetched per round trip (server-side cursor on PostgreSQL) by the streaming exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+    # Certificate generation: roles per batch (one INSERT + commit each), PDF worker
+    # processes (default: CPU count) and certificates issued per organizer request
+    CERTIFICATE_BATCH_SIZE = int(os.environ.get('CERTIFICATE_BATCH_SIZE', 200))
+    CERTIFICATE_PROCESSES = int(os.environ.get('CERTIFICATE_PROCESSES', 0)) or None
+    CERTIFICATE_REQUEST_LIMIT = int(os.environ.get('CERTIFICATE_REQUEST_LIMIT', 500))
+    # "stamp" lays the page out once per conference and type and stamps names onto it;
+    # "html" renders every certificate through xhtml2pdf
+    CERTIFICATE_RENDER_MODE = os.environ.get('CERTIFICATE_RENDER_MODE', 'stamp')
+
+    # Engine rendering schedule PDFs and certificate pages: "xhtml2pdf" (HTML templates)
+    # or "reportlab" (direct layout, faster); see utils/pdf_engines.py
+    PDF_ENGINE = os.environ.get('PDF_ENGINE', 'xhtml2pdf')
+
+    # Background threads compiling proceedings volumes (per process)
+    PROCEEDINGS_WORKERS = int(os.environ.get('PROCEEDINGS_WORKERS', 1))
+
+    # Static copy of the public conference pages (see utils/static_site.py). When set,
+    # commits that change public content re-publish the changed conferences in the background
+    STATIC_EXPORT_DIR = os.environ.get('STATIC_EXPORT_DIR') or None
+    STATIC_PUBLISH_ON_CHANGE = os.environ.get('STATIC_PUBLISH_ON_CHANGE', '1') not in ('0', 'false', 'False')
+
+    # HTTP caching of the public pages for anonymous visitors (see utils/page_cache.py):
+    # ETags/304s, Cache-Control max-age, and a body cache ("memory://" LRU per process
+    # or "redis://..." shared, requires the `redis` package)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', '1') not in ('0', 'false', 'False')
+    PAGE_CACHE_URL = os.environ.get('PAGE_CACHE_URL', 'memory://')
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 512))
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    PAGE_CACHE_MAX_AGE = int(os.environ.get('PAGE_CACHE_MAX_AGE', 60))
+
+    # Compiled templates cached on disk and shared by all workers (default directory:
+    # Jinja's per-user temp dir)
+    JINJA_BYTECODE_CACHE = os.environ.get('JINJA_BYTECODE_CACHE', '1') not in ('0', 'false', 'False')
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR') or None
+    # Precompile every template when the app is created. Off by default so `flask` commands
+    # and scripts don't pay for it; set TEMPLATE_WARMUP=1 in the web server's environment
+    TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', '0') not in ('0', 'false', 'False')
+
+    # Rows per page on the keyset-paginated admin role queues
+    QUEUE_PAGE_SIZE = int(os.environ.get('QUEUE_PAGE_SIZE', 50))
+
+    # "cookie" keeps the session in the signed cookie (Flask default). "sql" or "memory"
+    # store it server-side: cached roles, instant revocation (see utils/sessions.py)
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cookie')
+
+    # Reverse proxies (load balancer, PaaS router) in front of the app whose
+    # X-Forwarded-For/-Proto are trusted; 0 when clients connect directly
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+
+    # Auth rate limits (token buckets, "N/second|minute|hour|day") per client IP and per
+    # submitted email. "memory://" keeps buckets per process; use "redis://..." to share
+    # them between workers (requires the `redis` package).
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') not in ('0', 'false', 'False')
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_RULES = {
+        'login': {
+            'ip': os.environ.get('RATELIMIT_LOGIN_IP', '20/minute'),
+            'account': os.environ.get('RATELIMIT_LOGIN_ACCOUNT', '5/minute'),
+        },
+        'register': {
+            'ip': os.environ.get('RATELIMIT_REGISTER_IP', '5/minute'),
+            'account': os.environ.get('RATELIMIT_REGISTER_ACCOUNT', '3/hour'),
+        },
+        'reset_password': {
+            'ip': os.environ.get('RATELIMIT_RESET_IP', '5/minute'),
+            'account': os.environ.get('RATELIMIT_RESET_ACCOUNT', '3/hour'),
+        },
+        'verify_otp': {
+            'ip': os.environ.get('RATELIMIT_VERIFY_OTP_IP', '10/minute'),
+        },
+    }
@@ -0,0 +1,42 @@
+"""Hashed OTP codes, attempt counter and expiry index
+
+Revision ID: 0e334acbac65
+Revises: a11d1ad53ce5
+Create Date: 2026-10-19 06:36:35.844894
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e334acbac65'
+down_revision = 'a11d1ad53ce5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Pending codes live for minutes and the old rows hold plain-text codes that
+    # cannot be carried over to otp_hash, so drop them before adding NOT NULL columns.
+    op.execute("DELETE FROM otp_verifications")
+    with op.batch_alter_table('otp_verifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('otp_hash', sa.String(length=64), nullable=False))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('university_name', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('department', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('contact_no', sa.String(length=20), nullable=True))
+        batch_op.create_index(batch_op.f('ix_otp_verifications_expires_at'), ['expires_at'], unique=False)
+        batch_op.drop_column('otp_code')
+
+
+def downgrade():
+    op.execute("DELETE FROM otp_verifications")
+    with op.batch_alter_table('otp_verifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('otp_code', sa.VARCHAR(length=6), nullable=False))
+        batch_op.drop_index(batch_op.f('ix_otp_verifications_expires_at'))
+        batch_op.drop_column('contact_no')
+        batch_op.drop_column('department')
+        batch_op.drop_column('university_name')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('otp_hash')
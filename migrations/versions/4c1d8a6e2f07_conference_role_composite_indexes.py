@@ -0,0 +1,37 @@
+"""Composite indexes for ConferenceRole lookups
+
+Revision ID: 4c1d8a6e2f07
+Revises: b7e2c4d91a3f
+Create Date: 2026-10-19 11:03:17.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1d8a6e2f07'
+down_revision = 'b7e2c4d91a3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The role decorators (user_id, conference_id, role, status) are already served by the
+    # _user_conference_uc unique index: it matches at most one row, so no extra index is added.
+    with op.batch_alter_table('conference_roles', schema=None) as batch_op:
+        batch_op.create_index('ix_conference_roles_conf_status_role_user',
+                              ['conference_id', 'status', 'role', 'user_id'], unique=False)
+        batch_op.create_index('ix_conference_roles_role_status_conf',
+                              ['role', 'status', 'conference_id'], unique=False)
+        # Subsumed by the composites above (role / status are never filtered alone)
+        batch_op.drop_index(batch_op.f('ix_conference_roles_role'))
+        batch_op.drop_index(batch_op.f('ix_conference_roles_status'))
+
+
+def downgrade():
+    with op.batch_alter_table('conference_roles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_conference_roles_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_conference_roles_role'), ['role'], unique=False)
+        batch_op.drop_index('ix_conference_roles_role_status_conf')
+        batch_op.drop_index('ix_conference_roles_conf_status_role_user')
@@ -0,0 +1,26 @@
+"""Conference content version of the public pages
+
+Revision ID: 51dff473feaf
+Revises: a90711ffb18b
+Create Date: 2026-10-19 07:00:34.866882
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '51dff473feaf'
+down_revision = 'a90711ffb18b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conferences', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('conferences', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
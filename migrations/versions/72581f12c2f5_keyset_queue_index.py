@@ -0,0 +1,28 @@
+"""Keyset pagination index for the admin role queues
+
+Revision ID: 72581f12c2f5
+Revises: 0e334acbac65
+Create Date: 2026-10-19 06:40:53.646911
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '72581f12c2f5'
+down_revision = '0e334acbac65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conference_roles', schema=None) as batch_op:
+        batch_op.drop_index('ix_conference_roles_role_status_conf')
+        batch_op.create_index('ix_conference_roles_role_status_conf_id', ['role', 'status', 'conference_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conference_roles', schema=None) as batch_op:
+        batch_op.drop_index('ix_conference_roles_role_status_conf_id')
+        batch_op.create_index('ix_conference_roles_role_status_conf', ['role', 'status', 'conference_id'], unique=False)
@@ -0,0 +1,26 @@
+"""One certificate per role and type
+
+Revision ID: a90711ffb18b
+Revises: cf08c183bdbd
+Create Date: 2026-10-19 06:48:09.628175
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a90711ffb18b'
+down_revision = 'cf08c183bdbd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.create_unique_constraint('_role_certificate_type_uc', ['role_id', 'certificate_type'])
+
+
+def downgrade():
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.drop_constraint('_role_certificate_type_uc', type_='unique')
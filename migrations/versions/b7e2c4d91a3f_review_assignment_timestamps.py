@@ -0,0 +1,51 @@
+"""Review assignment, due and submission timestamps
+
+Revision ID: b7e2c4d91a3f
+Revises: 9043214a30b0
+Create Date: 2026-10-19 10:12:41.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4d91a3f'
+down_revision = '9043214a30b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('assigned_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('due_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('submitted_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_reminded_at', sa.DateTime(), nullable=True))
+
+    # Backfill: created_at was the only timestamp (and was overwritten on submit),
+    # so it is the best available value for both assignment and submission.
+    op.execute("UPDATE reviews SET assigned_at = created_at")
+    op.execute("UPDATE reviews SET submitted_at = created_at WHERE recommendation IS NOT NULL")
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.alter_column('assigned_at', existing_type=sa.DateTime(), nullable=False)
+        # The composite indexes below have paper_id / reviewer_role_id as leading columns
+        batch_op.drop_index(batch_op.f('ix_reviews_paper_id'))
+        batch_op.drop_index(batch_op.f('ix_reviews_reviewer_role_id'))
+        batch_op.create_index('ix_reviews_reviewer_role_id_submitted_at', ['reviewer_role_id', 'submitted_at'], unique=False)
+        batch_op.create_index('ix_reviews_paper_id_submitted_at', ['paper_id', 'submitted_at'], unique=False)
+        batch_op.create_index('ix_reviews_submitted_at_due_at', ['submitted_at', 'due_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_submitted_at_due_at')
+        batch_op.drop_index('ix_reviews_paper_id_submitted_at')
+        batch_op.drop_index('ix_reviews_reviewer_role_id_submitted_at')
+        batch_op.create_index(batch_op.f('ix_reviews_reviewer_role_id'), ['reviewer_role_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_reviews_paper_id'), ['paper_id'], unique=False)
+        batch_op.drop_column('last_reminded_at')
+        batch_op.drop_column('submitted_at')
+        batch_op.drop_column('due_at')
+        batch_op.drop_column('assigned_at')
@@ -0,0 +1,65 @@
+"""Analytics rollup tables for the super admin dashboard
+
+Revision ID: cf08c183bdbd
+Revises: 72581f12c2f5
+Create Date: 2026-10-19 06:43:48.529779
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cf08c183bdbd'
+down_revision = '72581f12c2f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_university_stats',
+    sa.Column('hosting_university', sa.String(length=200), nullable=False),
+    sa.Column('conferences', sa.Integer(), nullable=False),
+    sa.Column('papers_submitted', sa.Integer(), nullable=False),
+    sa.Column('papers_accepted', sa.Integer(), nullable=False),
+    sa.Column('papers_rejected', sa.Integer(), nullable=False),
+    sa.Column('reviewers', sa.Integer(), nullable=False),
+    sa.Column('reviews_assigned', sa.Integer(), nullable=False),
+    sa.Column('reviews_submitted', sa.Integer(), nullable=False),
+    sa.Column('registrations', sa.Integer(), nullable=False),
+    sa.Column('registrations_paid', sa.Integer(), nullable=False),
+    sa.Column('fee_revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('fee_outstanding', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('hosting_university')
+    )
+    op.create_table('analytics_conference_stats',
+    sa.Column('conference_id', sa.Integer(), nullable=False),
+    sa.Column('hosting_university', sa.String(length=200), nullable=False),
+    sa.Column('papers_submitted', sa.Integer(), nullable=False),
+    sa.Column('papers_accepted', sa.Integer(), nullable=False),
+    sa.Column('papers_rejected', sa.Integer(), nullable=False),
+    sa.Column('reviewers', sa.Integer(), nullable=False),
+    sa.Column('reviews_assigned', sa.Integer(), nullable=False),
+    sa.Column('reviews_submitted', sa.Integer(), nullable=False),
+    sa.Column('registrations', sa.Integer(), nullable=False),
+    sa.Column('registrations_paid', sa.Integer(), nullable=False),
+    sa.Column('fee_revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('fee_outstanding', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('stale', sa.Boolean(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['conference_id'], ['conferences.conference_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('conference_id')
+    )
+    with op.batch_alter_table('analytics_conference_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_analytics_conference_stats_hosting_university'), ['hosting_university'], unique=False)
+        batch_op.create_index(batch_op.f('ix_analytics_conference_stats_stale'), ['stale'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('analytics_conference_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_analytics_conference_stats_stale'))
+        batch_op.drop_index(batch_op.f('ix_analytics_conference_stats_hosting_university'))
+
+    op.drop_table('analytics_conference_stats')
+    op.drop_table('analytics_university_stats')
@@ -0,0 +1,30 @@
+"""Date-range index for SQL-side conference status
+
+Revision ID: e91f3b7c5d24
+Revises: 4c1d8a6e2f07
+Create Date: 2026-10-19 11:47:52.604390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91f3b7c5d24'
+down_revision = '4c1d8a6e2f07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Conference.status filters become date ranges: upcoming uses ix_conferences_start_date,
+    # completed/ongoing use (end_date, start_date), which replaces the end_date-only index.
+    with op.batch_alter_table('conferences', schema=None) as batch_op:
+        batch_op.create_index('ix_conferences_end_date_start_date', ['end_date', 'start_date'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_conferences_end_date'))
+
+
+def downgrade():
+    with op.batch_alter_table('conferences', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_conferences_end_date'), ['end_date'], unique=False)
+        batch_op.drop_index('ix_conferences_end_date_start_date')
@@ -1,14 +1,23 @@
 
 from flask_sqlalchemy import SQLAlchemy
+import hashlib
 from datetime import datetime, timedelta, timezone
 from flask import current_app
 from itsdangerous import URLSafeTimedSerializer as Serializer
 from enum import Enum as PyEnum
 from extensions import db
 from datetime import date
+from sqlalchemy import and_, or_, not_, case
+from sqlalchemy.ext.hybrid import hybrid_property, Comparator
+from sqlalchemy.sql import operators
 TOKEN_EXPIRATION_SEC = 1800
 
 
+def utc_now_naive():
+    """Current UTC time without tzinfo, comparable with values read back from DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # ---------- ENUM DEFINITIONS ----------
 class UserRole(PyEnum):
     participant = "participant"
@@ -50,6 +59,49 @@ class ConferenceStatus(PyEnum):
     completed = "completed"
 
 
+def conference_status_predicate(cls, status, today=None):
+    """
+    Index-friendly WHERE clause for a conference status, expressed as plain date ranges
+    so the start_date / (end_date, start_date) indexes can be used. `today` is bound at
+    query time, so no stored status column (and no nightly job) is needed.
+    """
+    today = today or date.today()
+    status = getattr(status, "value", status)
+    if status == "upcoming":
+        return cls.start_date > today
+    if status == "completed":
+        return cls.end_date < today
+    if status == "ongoing":
+        return and_(cls.end_date >= today, cls.start_date <= today)
+    raise ValueError(f"Unknown conference status: {status!r}")
+
+
+class ConferenceStatusComparator(Comparator):
+    """
+    SQL side of Conference.status. Used as a value (SELECT / ORDER BY) it is a CASE
+    expression; compared with ==, != or in_() it becomes the equivalent date-range
+    predicate, which unlike the CASE expression can use the date indexes.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.today = date.today()
+        super().__init__(case(
+            (cls.start_date > self.today, "upcoming"),
+            (cls.end_date < self.today, "completed"),
+            else_="ongoing"
+        ))
+
+    def operate(self, op, *other, **kwargs):
+        if op is operators.eq:
+            return conference_status_predicate(self.cls, other[0], self.today)
+        if op is operators.ne:
+            return not_(conference_status_predicate(self.cls, other[0], self.today))
+        if op is operators.in_op:
+            return or_(*[conference_status_predicate(self.cls, value, self.today) for value in other[0]])
+        return op(self.expression, *other, **kwargs)
+
+
 # ---------- MODELS ----------
 class User(db.Model):
     __tablename__ = "users"
@@ -68,20 +120,34 @@ class User(db.Model):
     conference_roles = db.relationship("ConferenceRole", back_populates="user", cascade="all, delete-orphan")
 
     def get_reset_token(self, expires_sec=1800):
-        """Generates a secure, timed token for password reset."""
+        """
+        Generates a secure, timed token for password reset. The lifetime is signed into
+        the token, and the token stops working once the password has been changed.
+        """
         s = Serializer(current_app.config['SECRET_KEY'])
-        return s.dumps({'user_id': self.user_id})
+        return s.dumps({'user_id': self.user_id, 'expires_sec': expires_sec,
+                        'password': self._password_fingerprint()})
 
     @staticmethod
-    def verify_reset_token(token, expires_sec=1800):
+    def verify_reset_token(token):
         """Verifies the reset token and returns the user if valid."""
         s = Serializer(current_app.config['SECRET_KEY'])
         try:
-            data = s.loads(token, max_age=expires_sec)
+            data, signed_at = s.loads(token, return_timestamp=True)
             user_id = data.get('user_id')
+            expires_sec = data.get('expires_sec', TOKEN_EXPIRATION_SEC)
         except:
             return None
-        return User.query.get(user_id)
+        if datetime.now(timezone.utc) - signed_at > timedelta(seconds=expires_sec):
+            return None
+        user = User.query.get(user_id)
+        if user is None or data.get('password') != user._password_fingerprint():
+            return None
+        return user
+
+    def _password_fingerprint(self):
+        # Tokens carry this instead of the hash itself: their payload is only signed, not encrypted
+        return hashlib.sha256(self.password_hash.encode()).hexdigest()[:16]
 
     def get_verification_token(self, expires_sec=TOKEN_EXPIRATION_SEC):
         """Generates a secure, timed token for email verification."""
@@ -109,8 +175,9 @@ class ConferenceRole(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=False)
     conference_id = db.Column(db.Integer, db.ForeignKey("conferences.conference_id"), nullable=False)
-    role = db.Column(db.Enum(UserRole), nullable=False, index=True)
-    status = db.Column(db.Integer, nullable=False, default=0, index=True)
+    # role / status are indexed through the composite indexes in __table_args__
+    role = db.Column(db.Enum(UserRole), nullable=False)
+    status = db.Column(db.Integer, nullable=False, default=0)
     expertise = db.Column(db.Text)
 
     user = db.relationship("User", back_populates="conference_roles")
@@ -127,7 +194,16 @@ class ConferenceRole(db.Model):
     sessions_chaired = db.relationship("Session", back_populates="session_chair_role",
                                        foreign_keys='Session.session_chair_role_id')
 
-    __table_args__ = (db.UniqueConstraint('user_id', 'conference_id', name='_user_conference_uc'),)
+    __table_args__ = (
+        # Also serves the role decorators (user_id + conference_id matches at most one row)
+        db.UniqueConstraint('user_id', 'conference_id', name='_user_conference_uc'),
+        # Per-conference listings/counts (view_participants, manage_reviewers, organizer dashboard):
+        # conference_id + status [+ role IN (...)], user_id included for DISTINCT user counts
+        db.Index('ix_conference_roles_conf_status_role_user', 'conference_id', 'status', 'role', 'user_id'),
+        # Cross-conference admin queues (pending participants, all organizers), keyset-paginated
+        # on (conference_id, id); id is explicit so PostgreSQL can also walk the index in order
+        db.Index('ix_conference_roles_role_status_conf_id', 'role', 'status', 'conference_id', 'id'),
+    )
 
     def __repr__(self):
         return f"<ConferenceRole UserID: {self.user_id} as {self.role.value} in ConfID: {self.conference_id}>"
@@ -142,14 +218,21 @@ class Conference(db.Model):
     final_schedule_file = db.Column(db.String(200), nullable=True)
     description = db.Column(db.Text)
     start_date = db.Column(db.Date, nullable=False, index=True)
-    end_date = db.Column(db.Date, nullable=False, index=True)
+    # end_date is indexed via (end_date, start_date) below, which also serves "ongoing"
+    end_date = db.Column(db.Date, nullable=False)
     location = db.Column(db.String(200))
     author_fee = db.Column(db.Numeric(10, 2), nullable=False)
     participant_fee = db.Column(db.Numeric(10, 2), nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     created_by_admin_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=False, index=True)
-    @property
+    # Bumped whenever anything shown on the conference's public pages changes (see utils/content_versions.py)
+    content_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
+    __table_args__ = (
+        db.Index('ix_conferences_end_date_start_date', 'end_date', 'start_date'),
+    )
+
+    @hybrid_property
     def status(self):
         """Calculates the conference status dynamically based on current date."""
         today = date.today()
@@ -160,6 +243,11 @@ class Conference(db.Model):
         else:
             return "ongoing"
 
+    @status.comparator
+    def status(cls):
+        # e.g. Conference.query.filter(Conference.status == "upcoming") runs in the database
+        return ConferenceStatusComparator(cls)
+
     @property
     def main_organizer(self):
         """A helper property to find the first approved organizer."""
@@ -246,18 +334,39 @@ class Paper(db.Model):
 class Review(db.Model):
     __tablename__ = "reviews"
     review_id = db.Column(db.Integer, primary_key=True)
-    paper_id = db.Column(db.Integer, db.ForeignKey("papers.paper_id"), nullable=False, index=True)
+    # paper_id / reviewer_role_id lookups are served by the composite indexes below
+    paper_id = db.Column(db.Integer, db.ForeignKey("papers.paper_id"), nullable=False)
     # UPDATED: Foreign key now points to ConferenceRole
-    reviewer_role_id = db.Column(db.Integer, db.ForeignKey("conference_roles.id"), nullable=False, index=True)
+    reviewer_role_id = db.Column(db.Integer, db.ForeignKey("conference_roles.id"), nullable=False)
     comments_to_author = db.Column(db.Text)
     comments_to_organiser = db.Column(db.Text)
     score = db.Column(db.Integer, index=True)
     recommendation = db.Column(db.Enum(ReviewRecommendation))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
+    # Assignment lifecycle: assigned -> (reminded) -> submitted. submitted_at is NULL while pending.
+    assigned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    due_at = db.Column(db.DateTime, nullable=True)
+    submitted_at = db.Column(db.DateTime, nullable=True)
+    last_reminded_at = db.Column(db.DateTime, nullable=True)
+
     paper = db.relationship("Paper", back_populates="reviews")
     reviewer_role = db.relationship("ConferenceRole", back_populates="reviews_conducted")
 
+    __table_args__ = (
+        # Reviewer workload / "my pending reviews"
+        db.Index('ix_reviews_reviewer_role_id_submitted_at', 'reviewer_role_id', 'submitted_at'),
+        # Per-paper progress ("2 of 3 reviews in")
+        db.Index('ix_reviews_paper_id_submitted_at', 'paper_id', 'submitted_at'),
+        # Overdue scan: WHERE submitted_at IS NULL AND due_at < now
+        db.Index('ix_reviews_submitted_at_due_at', 'submitted_at', 'due_at'),
+    )
+
+    @property
+    def is_overdue(self):
+        """True if the review is still pending and its due date has passed."""
+        return self.submitted_at is None and self.due_at is not None and self.due_at < utc_now_naive()
+
     def __repr__(self):
         return f"<Review {self.review_id} - Score {self.score}>"
 
@@ -315,17 +424,103 @@ class Certificate(db.Model):
 
     conference_role = db.relationship("ConferenceRole")
 
+    __table_args__ = (
+        # One certificate of each type per role; also serves the "not issued yet" anti-join
+        db.UniqueConstraint('role_id', 'certificate_type', name='_role_certificate_type_uc'),
+    )
+
 
 class OTPVerification(db.Model):
+    """A pending registration waiting for its emailed one-time code (see utils/otp.py)."""
     __tablename__ = "otp_verifications"
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), nullable=False, index=True)
-    otp_code = db.Column(db.String(6), nullable=False)
+    # HMAC-SHA256 of the code, never the code itself
+    otp_hash = db.Column(db.String(64), nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
     full_name = db.Column(db.String(150), nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    expires_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc) + timedelta(minutes=10),
-                           nullable=False)
+    university_name = db.Column(db.String(200))
+    department = db.Column(db.String(200))
+    contact_no = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, default=utc_now_naive, nullable=False)
+    # Indexed for the purge job (expires_at < now) and the live-code lookup
+    expires_at = db.Column(db.DateTime, default=lambda: utc_now_naive() + timedelta(minutes=10),
+                           nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<OTP for {self.email}>"
+
+class UserSession(db.Model):
+    """Server-side session record, used when SESSION_BACKEND = "sql" (see utils/sessions.py)."""
+    __tablename__ = "user_sessions"
+    sid = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True, index=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UserSession {self.sid[:8]} for user {self.user_id}>"
+
+
+class ConferenceStats(db.Model):
+    """Per-conference analytics rollup for the super admin dashboard (see utils/analytics.py)."""
+    __tablename__ = "analytics_conference_stats"
+    conference_id = db.Column(db.Integer, db.ForeignKey("conferences.conference_id", ondelete="CASCADE"),
+                              primary_key=True)
+    # Copied from the conference so the university rollup is a GROUP BY over this table alone
+    hosting_university = db.Column(db.String(200), nullable=False, index=True)
+    papers_submitted = db.Column(db.Integer, default=0, nullable=False)
+    papers_accepted = db.Column(db.Integer, default=0, nullable=False)
+    papers_rejected = db.Column(db.Integer, default=0, nullable=False)
+    reviewers = db.Column(db.Integer, default=0, nullable=False)
+    reviews_assigned = db.Column(db.Integer, default=0, nullable=False)
+    reviews_submitted = db.Column(db.Integer, default=0, nullable=False)
+    registrations = db.Column(db.Integer, default=0, nullable=False)
+    registrations_paid = db.Column(db.Integer, default=0, nullable=False)
+    # Sum of Registration.fee_amount for completed payments / still pending
+    fee_revenue = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    fee_outstanding = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    # Set by the after_flush hook when a source row changes; cleared by a refresh
+    stale = db.Column(db.Boolean, default=True, nullable=False, index=True)
+    refreshed_at = db.Column(db.DateTime, default=utc_now_naive, nullable=False)
+
+    conference = db.relationship("Conference")
+
+    @property
+    def acceptance_rate(self):
+        """Accepted share of decided papers, or None before any decision."""
+        decided = self.papers_accepted + self.papers_rejected
+        return self.papers_accepted / decided if decided else None
+
+    @property
+    def reviewer_load(self):
+        """Average reviews assigned per approved reviewer, or None without reviewers."""
+        return self.reviews_assigned / self.reviewers if self.reviewers else None
+
+    def __repr__(self):
+        return f"<ConferenceStats ConfID {self.conference_id}>"
+
+
+class UniversityStats(db.Model):
+    """Per-hosting-university analytics rollup, summed from ConferenceStats."""
+    __tablename__ = "analytics_university_stats"
+    hosting_university = db.Column(db.String(200), primary_key=True)
+    conferences = db.Column(db.Integer, default=0, nullable=False)
+    papers_submitted = db.Column(db.Integer, default=0, nullable=False)
+    papers_accepted = db.Column(db.Integer, default=0, nullable=False)
+    papers_rejected = db.Column(db.Integer, default=0, nullable=False)
+    reviewers = db.Column(db.Integer, default=0, nullable=False)
+    reviews_assigned = db.Column(db.Integer, default=0, nullable=False)
+    reviews_submitted = db.Column(db.Integer, default=0, nullable=False)
+    registrations = db.Column(db.Integer, default=0, nullable=False)
+    registrations_paid = db.Column(db.Integer, default=0, nullable=False)
+    fee_revenue = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    fee_outstanding = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=utc_now_naive, nullable=False)
+
+    acceptance_rate = ConferenceStats.acceptance_rate
+    reviewer_load = ConferenceStats.reviewer_load
 
     def __repr__(self):
-        return f"<OTP {self.otp_code} for {self.email}>"
\ No newline at end of file
+        return f"<UniversityStats {self.hosting_university}>"
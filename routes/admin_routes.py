@@ -1,31 +1,16 @@
 from flask import Blueprint, render_template, request, redirect, flash, session, url_for, abort
-from models import Conference, User, ConferenceRole, UserRole  # IMPORT UserRole and ConferenceRole
+from models import Conference, ConferenceRole, UserRole  # IMPORT UserRole and ConferenceRole
 from extensions import db
-from functools import wraps
+from utils.permissions import admin_required
+from utils.user_import import import_status, start_user_import
+from utils.bulk_roles import selected_role_ids, bulk_approve, bulk_reject, bulk_response
+from utils.role_queues import owned_by, queue_page
 from datetime import datetime
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select
 
 admin_bp = Blueprint("admin", __name__)
 
 
-# --- DECORATOR (UPDATED) ---
-def admin_required(f):
-    """Decorator to ensure only admins can access"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-
-        user = User.query.get(session["user_id"])
-        # UPDATED: Check the boolean flags on the User object
-        if not user or not (user.is_admin or user.is_super_admin):
-            flash("You do not have administrative privileges to access this page.", "error")
-            return redirect(url_for("main.index"))
-        return f(*args, **kwargs)
-    return decorated_function
-
-
 # --- CONFERENCE MANAGEMENT ---
 
 @admin_bp.route("/dashboard_admin/add_conference", methods=["GET", "POST"])
@@ -106,8 +91,17 @@ def add_conference():
 @admin_required
 def view_conference():
     admin_id = session["user_id"]
-    conferences = Conference.query.filter_by(created_by_admin_id=admin_id).all()
-    return render_template("admin/view_conference.html", conferences=conferences)
+    query = Conference.query.filter_by(created_by_admin_id=admin_id)
+
+    # Optional ?status=upcoming|ongoing|completed filter, evaluated in the database
+    status_filter = request.args.get("status")
+    if status_filter in ("upcoming", "ongoing", "completed"):
+        query = query.filter(Conference.status == status_filter)
+    else:
+        status_filter = None
+
+    conferences = query.order_by(Conference.start_date.desc()).all()
+    return render_template("admin/view_conference.html", conferences=conferences, status_filter=status_filter)
 
 
 @admin_bp.route("/dashboard_admin/delete_conference/<int:conf_id>", methods=["POST"])
@@ -181,55 +175,121 @@ def role_action(role_id, action):
     return redirect(url_for("admin.view_organisers", conf_id=conf_id))
 
 
+@admin_bp.route("/role_action/<int:conf_id>/bulk", methods=["POST"])
+@admin_required
+def bulk_role_action(conf_id):
+    """Approve or reject several pending organizer requests of one conference at once."""
+    action = request.form.get("action")
+    role_ids = selected_role_ids()
+    queue_url = url_for("admin.view_organisers", conf_id=conf_id)
+
+    if action not in ("approve", "reject"):
+        flash("Invalid action.", "error")
+        return redirect(queue_url)
+    if not role_ids:
+        flash("Please select at least one request.", "warning")
+        return redirect(queue_url)
+
+    # Ownership is part of the statement: nothing matches unless this admin created the conference
+    owned_conference = select(Conference.conference_id).where(
+        Conference.conference_id == conf_id,
+        Conference.created_by_admin_id == session["user_id"]
+    )
+    criteria = (
+        ConferenceRole.conference_id.in_(owned_conference.scalar_subquery()),
+        ConferenceRole.role == UserRole.organizer,
+        ConferenceRole.status == 0
+    )
+
+    if action == "approve":
+        processed = bulk_approve(role_ids, *criteria)
+        message = f"{processed} organizer request(s) approved."
+    else:
+        processed = bulk_reject(role_ids, *criteria)
+        message = f"{processed} organizer request(s) rejected and removed."
+
+    skipped = len(role_ids) - processed
+    if skipped:
+        message += f" {skipped} selected request(s) were skipped (already handled or not yours)."
+
+    pending_count = ConferenceRole.query.filter_by(conference_id=conf_id, role=UserRole.organizer, status=0).count()
+    return bulk_response(message, "success" if processed else "warning",
+                         {"pending_organizers": pending_count}, queue_url, processed, skipped)
+
+
 @admin_bp.route("/view_all_organizers")
 @admin_required
 def view_all_organizers():
-    """Displays a list of all approved organizers across all conferences."""
-    all_approved_organizer_roles = ConferenceRole.query.options(
-        joinedload(ConferenceRole.user),
-        joinedload(ConferenceRole.conference)
-    ).filter(
-        ConferenceRole.role == UserRole.organizer,
-        ConferenceRole.status == 1
-    ).order_by(ConferenceRole.conference_id).all()
+    """Displays approved organizers across all conferences, one keyset page at a time."""
+    page = queue_page(
+        UserRole.organizer, 1,
+        cursor=request.args.get("after"),
+        conference_id=request.args.get("conf_id", type=int)
+    )
 
     return render_template(
         "admin/view_all_organizers.html",
-        organizer_roles=all_approved_organizer_roles
+        organizer_roles=page.roles,
+        page=page
     )
 
 
 @admin_bp.route("/manage_pending_participants")
 @admin_required
 def manage_pending_participants():
-    """Displays a list of all participants with status=0 (pending/unapproved)."""
-
-    # Fetch all ConferenceRole entries where role is Participant and status is 0
-    pending_roles = ConferenceRole.query.options(db.joinedload(ConferenceRole.user)).filter_by(
-        role=UserRole.participant,
-        status=0
-    ).all()
+    """Displays pending (status=0) participants of this admin's conferences, one keyset page at a time."""
+    page = queue_page(
+        UserRole.participant, 0,
+        cursor=request.args.get("after"),
+        conference_id=request.args.get("conf_id", type=int),
+        admin_id=session["user_id"]
+    )
 
     return render_template(
         "admin/manage_pending_participants.html",
-        pending_roles=pending_roles
+        pending_roles=page.roles,
+        page=page
     )
 
 
+@admin_bp.route("/delete_pending_participants/bulk", methods=["POST"])
+@admin_required
+def bulk_delete_pending_participants():
+    """Deletes several pending participant roles in conferences created by this admin."""
+    role_ids = selected_role_ids()
+    queue_url = url_for("admin.manage_pending_participants")
+    if not role_ids:
+        flash("Please select at least one participant.", "warning")
+        return redirect(queue_url)
+
+    criteria = (owned_by(session["user_id"]), ConferenceRole.role == UserRole.participant, ConferenceRole.status == 0)
+    processed = bulk_reject(role_ids, *criteria)
+
+    message = f"Deleted {processed} pending participant role(s)."
+    skipped = len(role_ids) - processed
+    if skipped:
+        message += f" {skipped} selected role(s) were skipped (already handled or not in your conferences)."
+
+    pending_count = ConferenceRole.query.filter(*criteria).count()
+    return bulk_response(message, "success" if processed else "warning",
+                         {"pending_participants": pending_count}, queue_url, processed, skipped)
+
+
 @admin_bp.route("/delete_pending_participant/<int:role_id>", methods=["POST"])
 @admin_required
 def delete_pending_participant(role_id):
-    """Deletes a specific ConferenceRole entry if it's a participant and status is 0."""
-
-    # Fetch the role and ensure it is the correct type and status before deletion
-    role_to_delete = ConferenceRole.query.filter_by(
-        id=role_id,
-        role=UserRole.participant,
-        status=0
+    """Deletes a specific ConferenceRole entry if it's a pending participant in one of this admin's conferences."""
+
+    # Fetch the role and ensure it is the correct type, status and conference before deletion
+    role_to_delete = ConferenceRole.query.filter(
+        ConferenceRole.id == role_id,
+        ConferenceRole.role == UserRole.participant,
+        ConferenceRole.status == 0,
+        owned_by(session["user_id"])
     ).first()
 
     if not role_to_delete:
-        flash("Error: The role was not found or is already approved.", "error")
+        flash("Error: The role was not found, is already approved or is not in your conferences.", "error")
         return redirect(url_for("admin.manage_pending_participants"))
 
     user_name = role_to_delete.user.name
@@ -242,4 +302,36 @@ def delete_pending_participant(role_id):
         db.session.rollback()
         flash(f"Database error during deletion: {e}", "error")
 
-    return redirect(url_for("admin.manage_pending_participants"))
\ No newline at end of file
+    return redirect(url_for("admin.manage_pending_participants"))
+
+# --- BULK USER IMPORT ---
+
+@admin_bp.route("/dashboard_admin/import_users", methods=["GET", "POST"])
+@admin_required
+def import_users():
+    """Uploads a CSV of accounts to create; the import runs in the background."""
+    if request.method == "POST":
+        upload = request.files.get("csv_file")
+        if not upload or not upload.filename:
+            flash("Please choose a CSV file to import.", "error")
+            return redirect(url_for("admin.import_users"))
+
+        job_id = start_user_import(
+            upload,
+            request.url_root,
+            send_invitations=request.form.get("send_invitations") == "on"
+        )
+        flash("Importing in the background. This page shows the progress.", "success")
+        return redirect(url_for("admin.import_users_status", job_id=job_id))
+
+    return render_template("admin/import_users.html")
+
+
+@admin_bp.route("/dashboard_admin/import_users/<job_id>")
+@admin_required
+def import_users_status(job_id):
+    """Progress and report of a background user import."""
+    status = import_status(job_id)
+    if status is None:
+        abort(404)
+    return render_template("admin/import_users_status.html", status=status)
@@ -1,10 +1,15 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
-from werkzeug.security import check_password_hash, generate_password_hash
-from models import User,ConferenceRole,Conference # UserRole enum is no longer needed here for auth logic
+from models import User,ConferenceRole,Conference,OTPVerification,ConferenceStats,UniversityStats # UserRole enum is no longer needed here for auth logic
 from extensions import db
-from functools import wraps
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Email, Mail
+from utils.passwords import hash_password, verify_and_upgrade, PasswordHashBusy
+from utils.rate_limit import rate_limited
+from utils.email_utils import send_email
+from utils.otp import create_pending_registration, check_otp, OTP_OK, OTP_INVALID, OTP_LOCKED
+from utils.sessions import start_user_session, revoke_user_sessions
+from utils.analytics import refresh_stale_analytics, platform_totals
+# Re-exported: other blueprints import login_required from here
+from utils.permissions import login_required, super_admin_required
+from sqlalchemy.orm import contains_eager
 import os
 TOKEN_EXPIRATION_SEC = 1800
 
@@ -12,56 +17,6 @@ TOKEN_EXPIRATION_SEC = 1800
 auth_bp = Blueprint("auth", __name__)
 
 
-# --- DECORATORS (UPDATED) ---
-
-def login_required(f):
-    """Decorator to ensure the user is logged in."""
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-        return f(*args, **kwargs)
-
-    return decorated_function
-
-
-def admin_required(f):
-    """Decorator to ensure the user is an admin or super admin."""
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-
-        # Check admin status from the session for efficiency
-        if not session.get("is_admin") and not session.get("is_super_admin"):
-            flash("You do not have administrative privileges for this page.", "error")
-            return redirect(url_for("auth.dashboard"))  # Redirect to their main dashboard
-        return f(*args, **kwargs)
-
-    return decorated_function
-
-
-def super_admin_required(f):
-    """Decorator to ensure the user is a super admin."""
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-
-        if not session.get("is_super_admin"):
-            flash("You do not have permission to access this page.", "error")
-            return redirect(url_for("auth.dashboard"))
-        return f(*args, **kwargs)
-
-    return decorated_function
-
-
 # --- SUPER ADMIN ROUTES (UPDATED) ---
 
 @auth_bp.route("/dashboard_super_admin/add_admin", methods=["GET", "POST"])
@@ -76,7 +31,11 @@ def add_admin():
             flash("Email is already registered.", "error")
             return redirect(url_for("auth.add_admin"))
 
-        hashed_password = generate_password_hash(password)
+        try:
+            hashed_password = hash_password(password)
+        except PasswordHashBusy:
+            flash("The server is busy. Please try again in a moment.", "warning")
+            return render_template("superAdmin/add_admin.html"), 503
 
         new_admin = User(
             name=name,
@@ -104,6 +63,8 @@ def add_admin():
             sender_email = current_app.config['MAIL_USERNAME']  # This should be the verified SendGrid address
 
             # 2. Build the SendGrid Message object
+            from sendgrid import SendGridAPIClient
+            from sendgrid.helpers.mail import Email, Mail
             message = Mail(
                 from_email=Email(sender_email, "Conference Manager"),  # Correct way
                 to_emails=email,
@@ -147,6 +108,7 @@ def delete_admin(user_id):
     admin_to_delete = User.query.get_or_404(user_id)
     # UPDATED: Check using the 'is_admin' flag.
     if admin_to_delete.is_admin and not admin_to_delete.is_super_admin:
+        revoke_user_sessions(admin_to_delete.user_id)
         db.session.delete(admin_to_delete)
         db.session.commit()
         flash("Admin deleted successfully!", "success")
@@ -155,6 +117,26 @@ def delete_admin(user_id):
     return redirect(url_for("auth.view_admins"))
 
 
+@auth_bp.route("/dashboard_super_admin/analytics")
+@super_admin_required
+def analytics():
+    """Platform-wide metrics, served from the analytics rollup tables."""
+    # Only conferences changed since the last refresh are recomputed here
+    refresh_stale_analytics()
+
+    university_stats = UniversityStats.query.order_by(UniversityStats.hosting_university).all()
+    conference_stats = ConferenceStats.query.join(ConferenceStats.conference).options(
+        contains_eager(ConferenceStats.conference)
+    ).order_by(Conference.start_date.desc()).all()
+
+    return render_template(
+        "superAdmin/analytics.html",
+        totals=platform_totals(university_stats),
+        university_stats=university_stats,
+        conference_stats=conference_stats
+    )
+
+
 # --- GENERAL AUTH ROUTES (UPDATED) ---
 
 @auth_bp.route("/")
@@ -163,14 +145,21 @@ def index():
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
+@rate_limited("login", account_field="email")
 def login():
     if request.method == "POST":
         email = request.form.get("email")
         password = request.form.get("password")
         user = User.query.filter_by(email=email).first()
 
-        # 1. Check for Invalid Credentials
-        if not user or not check_password_hash(user.password_hash, password):
+        # 1. Check for Invalid Credentials (hash check runs on the bounded hashing pool)
+        try:
+            password_ok = user is not None and verify_and_upgrade(user, password)
+        except PasswordHashBusy:
+            flash("The server is busy processing other logins. Please try again in a moment.", "warning")
+            return render_template("login.html"), 503
+
+        if not password_ok:
             flash("Invalid email or password.", "error")
             return redirect(url_for("auth.login"))
 
@@ -182,11 +171,12 @@ def login():
             return redirect(url_for('auth.login'))
             # Alternatively: return redirect(url_for('auth.resend_verification'))
 
-        # 3. Successful Login: Set Session Variables
-        session["user_id"] = user.user_id
-        session["user_name"] = user.name
-        session["is_super_admin"] = user.is_super_admin
-        session["is_admin"] = user.is_admin
+        # Persist a transparently upgraded hash (hashing policy changed since last login)
+        if db.session.is_modified(user):
+            db.session.commit()
+
+        # 3. Successful Login: new session with the user's roles cached in it
+        start_user_session(user)
 
         flash(f"Welcome back, {user.name}!", "success")
         return redirect(url_for("auth.dashboard"))
@@ -217,12 +207,24 @@ def dashboard():
     if session.get("is_admin"):
         return render_template("admin/dashboard_admin.html", user_name=user_name)
 
-    # For all other users, fetch their specific roles for the hub dashboard
-    user_roles = ConferenceRole.query.filter_by(user_id=session['user_id']).all()
-    return render_template("dashboard.html", user_name=user_name, roles=user_roles)
+    # For all other users, fetch their specific roles for the hub dashboard.
+    # Conferences are joined in the same query; active ones first, completed ones last.
+    roles_query = ConferenceRole.query.join(ConferenceRole.conference).options(
+        contains_eager(ConferenceRole.conference)
+    ).filter(ConferenceRole.user_id == session['user_id'])
+
+    status_filter = request.args.get("status")
+    if status_filter in ("upcoming", "ongoing", "completed"):
+        roles_query = roles_query.filter(Conference.status == status_filter)
+    else:
+        status_filter = None
+
+    user_roles = roles_query.order_by(Conference.status == "completed", Conference.start_date).all()
+    return render_template("dashboard.html", user_name=user_name, roles=user_roles, status_filter=status_filter)
 
 
 @auth_bp.route("/register", methods=["GET", "POST"])
+@rate_limited("register", account_field="email")
 def register():
     """Handles new user registration and sends an email verification link."""
     if request.method == "POST":
@@ -241,9 +243,30 @@ def register():
             return redirect(url_for("auth.login"))
 
         # 3. Hash the password
-        hashed_password = generate_password_hash(password)
+        try:
+            hashed_password = hash_password(password)
+        except PasswordHashBusy:
+            flash("The server is busy. Please try again in a moment.", "warning")
+            return render_template("register.html"), 503
+
+        # 4a. OTP flow: park the registration until the emailed code is confirmed
+        if current_app.config.get("REGISTRATION_VERIFICATION", "otp") == "otp":
+            code = create_pending_registration(
+                email, name, hashed_password,
+                university_name=university, department=department, contact_no=contact_no
+            )
+            db.session.commit()
 
-        # 4. Create a new User object
+            session["pending_registration_email"] = email
+            if send_otp_email(email, name, code):
+                flash("We have emailed you a 6-digit verification code. Enter it below to activate your account.",
+                      "info")
+            else:
+                flash("Registration received, but the verification email failed to send. Please contact support.",
+                      "warning")
+            return redirect(url_for("auth.verify_otp"))
+
+        # 4b. Link flow: create a new User object
         new_user = User(
             name=name,
             email=email,
@@ -279,7 +302,57 @@ def register():
 
 
 
+@auth_bp.route("/verify_otp", methods=["GET", "POST"])
+@rate_limited("verify_otp")
+def verify_otp():
+    """Second step of OTP registration: creates the account once the emailed code matches."""
+    email = session.get("pending_registration_email")
+    if not email:
+        flash("Please register first.", "info")
+        return redirect(url_for("auth.register"))
+
+    if request.method == "POST":
+        outcome, pending = check_otp(email, request.form.get("otp"))
+
+        if outcome == OTP_INVALID:
+            flash("That code is incorrect. Please try again.", "error")
+            return redirect(url_for("auth.verify_otp"))
+
+        if outcome != OTP_OK:
+            session.pop("pending_registration_email", None)
+            if outcome == OTP_LOCKED:
+                flash("Too many incorrect codes. Please register again to receive a new code.", "error")
+            else:
+                flash("Your verification code has expired. Please register again to receive a new one.", "warning")
+            return redirect(url_for("auth.register"))
+
+        session.pop("pending_registration_email", None)
+        if User.query.filter_by(email=email).first():
+            OTPVerification.query.filter_by(email=email).delete(synchronize_session=False)
+            db.session.commit()
+            flash("An account with this email address already exists. Please log in.", "warning")
+            return redirect(url_for("auth.login"))
+
+        db.session.add(User(
+            name=pending.full_name,
+            email=email,
+            password_hash=pending.password_hash,
+            university_name=pending.university_name,
+            department=pending.department,
+            contact_no=pending.contact_no,
+            is_email_verified=True
+        ))
+        OTPVerification.query.filter_by(email=email).delete(synchronize_session=False)
+        db.session.commit()
+
+        flash("Your email address is verified and your account is active. Please log in.", "success")
+        return redirect(url_for("auth.login"))
+
+    return render_template("verify_otp.html", email=email)
+
+
 @auth_bp.route("/reset_password", methods=['GET', 'POST'])
+@rate_limited("reset_password", account_field="email")
 def reset_password_request():
     """Route for users to request a password reset link."""
     if request.method == 'POST':
@@ -301,6 +374,8 @@ def reset_password_request():
                 sender_email = current_app.config['MAIL_USERNAME']
 
                 # 2. Build the SendGrid Message object
+                from sendgrid import SendGridAPIClient
+                from sendgrid.helpers.mail import Mail
                 message = Mail(
                     from_email=(sender_email,"ConfMgr"),
                     to_emails=user.email,
@@ -349,8 +424,14 @@ def reset_token(token):
             flash('Passwords do not match.', 'error')
             return render_template('auth/reset_password.html', token=token)
 
-        user.password_hash = generate_password_hash(password)
+        try:
+            user.password_hash = hash_password(password)
+        except PasswordHashBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('auth/reset_password.html', token=token), 503
         db.session.commit()
+        # Whoever held the old password is logged out everywhere
+        revoke_user_sessions(user.user_id)
         flash('Your password has been updated! You are now able to log in.', 'success')
         return redirect(url_for('auth.login'))
 
@@ -396,6 +477,8 @@ If you did not register for this service, please ignore this email.
 The UniConfMgr Team
 """
     # 1. Build the SendGrid Message object
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
     message = Mail(
         from_email=(sender_email,"UniConfMgr"),
         to_emails=user.email,
@@ -422,16 +505,28 @@ The UniConfMgr Team
 
 
 
-def send_rejection_email(author_email: str, author_name: str, paper_title: str, conference: Conference):
-    """
-    Generates and sends a rejection notification using the SendGrid API.
-    """
+def send_otp_email(email, name, code):
+    """Emails the one-time registration code."""
+    ttl = current_app.config.get("OTP_TTL_MINUTES", 10)
+    body_content = f"""
+Dear {name},
 
-    if not author_email:
-        print(f"REJECTION MAIL FAILED: Author email not found for paper '{paper_title}'.")
-        return False
+Thank you for registering with UniConfMgr - The Academic Nexus.
+Your verification code is:
 
-    # 1. Compose the plain text message body
+    {code}
+
+Enter it on the verification page to activate your account. The code expires in {ttl} minutes.
+
+If you did not register for this service, please ignore this email.
+
+The UniConfMgr Team
+"""
+    return send_email(email, 'Your UniConfMgr Verification Code', plain_text_content=body_content)
+
+
+def rejection_email(author_name: str, paper_title: str, conference: Conference):
+    """(subject, plain text body) of the rejection notification."""
     body_content = f"""
 Dear {author_name},
 
@@ -443,13 +538,29 @@ You may still register to attend the conference as a participant via the public
 
 The UniConfMgr Team
 """
+    return f'Decision on Paper: Regrettably Rejected - {conference.title}', body_content
+
+
+def send_rejection_email(author_email: str, author_name: str, paper_title: str, conference: Conference):
+    """
+    Generates and sends a rejection notification using the SendGrid API.
+    """
+
+    if not author_email:
+        print(f"REJECTION MAIL FAILED: Author email not found for paper '{paper_title}'.")
+        return False
+
+    # 1. Compose the plain text message body
+    subject, body_content = rejection_email(author_name, paper_title, conference)
     sender_email = current_app.config['MAIL_USERNAME']  # Verified SendGrid Sender
 
     # 2. Build the SendGrid Message object
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
     message = Mail(
         from_email=(sender_email,"UniConfMgr"),
         to_emails=author_email,
-        subject=f'Decision on Paper: Regrettably Rejected - {conference.title}',
+        subject=subject,
         plain_text_content=body_content
     )
 
@@ -1,62 +1,25 @@
-from flask import Blueprint, render_template, redirect, flash, session, url_for, abort, request, current_app
-from models import ConferenceRole, UserRole, Conference, Track, Paper, PaymentStatus, PaperStatus, Review,Registration # Added PaperStatus
+from flask import Blueprint, render_template, redirect, flash, session, url_for, request, current_app
+from models import ConferenceRole, UserRole, Conference, Track, Paper, PaymentStatus, PaperStatus, Review,Registration, Certificate, CertificateType # Added PaperStatus
 from extensions import db
-from functools import wraps
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from .auth_routes import login_required
+from utils.permissions import login_required, author_required, current_principal
 import os  # Necessary for file paths
 
 author_bp = Blueprint("author", __name__)
 
 
-# --- DECORATOR for Approved Authors ---
-# (This remains correct for protecting the Dashboard)
-def author_required(f):
-    """Decorator to ensure user is a logged-in, APPROVED author."""
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-
-        conference_id = kwargs.get("conf_id")
-        if not conference_id:
-            abort(400)
-
-        is_approved_author = ConferenceRole.query.filter_by(
-            user_id=session["user_id"],
-            conference_id=conference_id,
-            role=UserRole.author,
-            status=1  # Must be APPROVED
-        ).first()
-
-        if not is_approved_author:
-            flash("You do not have approved author privileges for this conference.", "error")
-            return redirect(url_for("auth.dashboard"))
-
-        return f(*args, **kwargs)
-
-    return decorated_function
-
-
 # --- AUTHOR ROUTES GO HERE ---
 @author_bp.route("/dashboard/author/<int:conf_id>")
 @author_required
 def dashboard(conf_id):
     """The main hub showing submission status and actions."""
-    user_id = session['user_id']
 
     # 1. Fetch the Conference object (CRITICAL FIX)
     conference = Conference.query.get_or_404(conf_id)
 
     # 2. Fetch the Author Role
-    author_role = ConferenceRole.query.filter_by(
-        user_id=user_id,
-        conference_id=conf_id,
-        role=UserRole.author,
-    ).first_or_404()  # Should exist due to @author_required
+    author_role = current_principal().conference_role(conf_id)  # Loaded by @author_required
 
     # 3. Fetch the associated Paper (if any)
     paper = Paper.query.options(
@@ -65,12 +28,19 @@ def dashboard(conf_id):
         author_role_id=author_role.id
     ).first()
 
-    # 4. Render the template
+    # 4. Author certificate, once issued (see utils/certificates.py)
+    certificate = Certificate.query.filter_by(
+        role_id=author_role.id,
+        certificate_type=CertificateType.author
+    ).first()
+
+    # 5. Render the template
     return render_template(
         "author/dashboard_author.html",
         conference=conference,  # <--- PASS THE CONFERENCE OBJECT
         author_role=author_role,
-        paper=paper
+        paper=paper,
+        certificate=certificate
     )
 
 
@@ -167,22 +137,17 @@ def submit_paper(conf_id):
 
 # In author_routes.py (Add this route)
 
-@author_required
 @author_bp.route("/view_submission/<int:conf_id>")
+@author_required
 def view_submission(conf_id):
     """
     Displays the detailed status, decision, and communication options for the author's submitted paper.
     """
-    user_id = session['user_id']
     conference = Conference.query.get_or_404(conf_id)
 
 
-    # 1. Fetch the Author Role
-    author_role = ConferenceRole.query.filter_by(
-        user_id=user_id,
-        conference_id=conf_id,
-        role=UserRole.author,
-    ).first_or_404()
+    # 1. The Author Role (already loaded by @author_required)
+    author_role = current_principal().conference_role(conf_id)
 
     # 2. Fetch the associated Paper
     paper = Paper.query.options(
@@ -1,51 +1,43 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, current_app
 from models import Conference, ConferenceRole,Track, User,UserRole
-from datetime import date
 from extensions import db
+from utils.page_cache import cache_public_page
 
 conference_bp = Blueprint("conference", __name__)
 
 
 @conference_bp.route("/explore_conferences")
+@cache_public_page()
 def explore_conferences():
     """
     Public route to display all conferences, categorized by status,
     extracting filter data (University/Department) directly from the Conference model.
     """
-    today = date.today()
+    # 1. Fetch each category with an index-friendly status filter (see Conference.status)
+    upcoming = Conference.query.filter(Conference.status == "upcoming").order_by(Conference.start_date).all()
+    ongoing = Conference.query.filter(Conference.status == "ongoing").order_by(Conference.start_date).all()
 
-    # 1. Fetch all Conferences (No joins needed for filter data)
-    all_conferences = Conference.query.order_by(Conference.start_date).all()
-
-    # --- 2. Extract unique filter names DIRECTLY from the Conference objects ---
-    unique_universities = set()
-    unique_departments = set()
+    # Past conferences grow forever; show the most recent ones only
+    past_limit = current_app.config.get("EXPLORE_PAST_CONFERENCES_LIMIT", 100)
+    past = Conference.query.filter(Conference.status == "completed").order_by(
+        Conference.end_date.desc()
+    ).limit(past_limit).all()
 
     categorized_conferences = {
-        "upcoming": [],
-        "ongoing": [],
-        "past": []
+        "upcoming": upcoming,
+        "ongoing": ongoing,
+        "past": past
     }
 
-    for conf in all_conferences:
-        status = conf.status
-
-        # Extract names from the NEW Conference columns
-        if conf.hosting_university:
-            unique_universities.add(conf.hosting_university)
-        if conf.hosting_department:
-            unique_departments.add(conf.hosting_department)
-
-        if status == "upcoming":
-            categorized_conferences["upcoming"].append(conf)
-        elif status == "ongoing":
-            categorized_conferences["ongoing"].append(conf)
-        else:
-            categorized_conferences["past"].append(conf)
-
-    # 3. Convert sets to sorted lists for Jinja dropdowns
-    university_names = sorted(list(unique_universities))
-    department_names = sorted(list(unique_departments))
+    # --- 2. Unique filter names straight from the indexed Conference columns ---
+    university_names = [
+        name for (name,) in db.session.query(Conference.hosting_university).distinct().order_by(Conference.hosting_university)
+        if name
+    ]
+    department_names = [
+        name for (name,) in db.session.query(Conference.hosting_department).distinct().order_by(Conference.hosting_department)
+        if name
+    ]
 
     return render_template(
         "conference/explore_conferences.html",
@@ -57,6 +49,7 @@ def explore_conferences():
 
 
 @conference_bp.route("/conference/<int:conf_id>")
+@cache_public_page("conf_id")
 def explore_more(conf_id):
     """
     Show detailed information about a specific conference, including tracks and fees.
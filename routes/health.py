@@ -0,0 +1,40 @@
+import time
+
+from flask import Blueprint, current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db
+from utils.db_pool import pool_metrics
+from utils.permissions import super_admin_required
+
+health_bp = Blueprint("health", __name__)
+
+
+def _no_store(body, status=200):
+    return body, status, {"Cache-Control": "no-store"}
+
+
+@health_bp.route("/readyz")
+def readiness():
+    """
+    Readiness probe for the load balancer: checks a connection out of the pool (the
+    pre-ping replaces it if it went stale) and runs SELECT 1. 503 while the database
+    is unreachable or the pool has no free connection within DB_POOL_TIMEOUT.
+    """
+    start = time.perf_counter()
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        print(f"READINESS CHECK FAILED: {e}")
+        return _no_store({"status": "unavailable", "database": "error"}, 503)
+    return _no_store({"status": "ready", "database": "ok",
+                      "latency_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+
+@health_bp.route("/admin/db-pool")
+@super_admin_required
+def db_pool_status():
+    """Connection pool usage of the worker that serves the request."""
+    return _no_store(pool_metrics(current_app))
@@ -1,46 +1,25 @@
-from flask import Blueprint, render_template, redirect, flash, session, url_for,current_app, send_file, abort, request
-from models import Conference, User, ConferenceRole, UserRole, Track, Session,ReviewRecommendation,SessionPaper,Paper, Review, PaperStatus, Registration, PaymentStatus# Ensure all models are imported
+from flask import Blueprint, render_template, redirect, flash, session, url_for,current_app, send_file, abort, request, Response, stream_with_context
+from models import Conference, User, ConferenceRole, UserRole, Track, Session,ReviewRecommendation,SessionPaper,Paper, Review, PaperStatus, Registration, PaymentStatus, utc_now_naive # Ensure all models are imported
 from extensions import db
-from routes.auth_routes import send_rejection_email
-from routes.publish_schedule_pdf import generate_pdf_from_html
-from functools import wraps
-from datetime import datetime
+from routes.auth_routes import rejection_email, send_rejection_email
+from utils.email_utils import enqueue_email
+from utils.schedule_pdf import schedule_pdf
+from utils.review_stats import get_conference_score_stats, invalidate_score_stats, propose_decisions
+from utils.permissions import organizer_required
+from utils.bulk_roles import selected_role_ids, bulk_approve, bulk_reject, bulk_response
+from utils.exports import DATASETS, FORMATS, export_stream
+from utils.certificates import generate_certificates
+from utils.proceedings import proceedings_status, start_proceedings_build
+from utils.analytics import mark_conferences_stale
+from utils.content_versions import bump_conference_versions
+from datetime import datetime, timedelta
+from sqlalchemy import func, case
 from werkzeug.utils import secure_filename
+import io
 import os
 
 organizer_bp = Blueprint("organizer", __name__)
 
-# --- DECORATOR for Organizers ---
-def organizer_required(f):
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-
-        # Get the conference ID from the URL
-        conference_id = kwargs.get("conf_id")
-        if not conference_id:
-            # Handle cases where conf_id might be missing (shouldn't happen with current setup)
-            abort(400)
-
-            # Check if the user has an approved organizer role for this conference
-        is_organizer = ConferenceRole.query.filter_by(
-            user_id=session["user_id"],
-            conference_id=conference_id,
-            role=UserRole.organizer,
-            status=1  # Must be an APPROVED organizer
-        ).first()
-
-        if not is_organizer:
-            flash("You do not have organizer privileges for this conference.", "error")
-            return redirect(url_for("auth.dashboard"))
-
-        return f(*args, **kwargs)
-
-    return decorated_function
-
 # --- ORGANIZER ROUTES ---
 
 @organizer_bp.route("/dashboard/<int:conf_id>")
@@ -127,6 +106,91 @@ def view_participants(conf_id, role_filter):
     )
 
 
+@organizer_bp.route("/export/<int:conf_id>/<dataset>.<fmt>")
+@organizer_required
+def export_data(conf_id, dataset, fmt):
+    """Streams registrations, authors, reviewers or papers of the conference as CSV or XLSX."""
+    if dataset not in DATASETS or fmt not in FORMATS:
+        abort(404)
+    conference = Conference.query.get_or_404(conf_id)
+    filename = f"{secure_filename(conference.title) or conf_id}_{dataset}.{fmt}"
+
+    # The rows are read while the response is sent, so the request context must outlive the view
+    return Response(
+        stream_with_context(export_stream(dataset, conf_id, fmt)),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@organizer_bp.route("/certificates/<int:conf_id>/generate", methods=["POST"])
+@organizer_required
+def generate_conference_certificates(conf_id):
+    """
+    Issues missing certificates, at most CERTIFICATE_REQUEST_LIMIT per request so the
+    worker never times out; the run is resumable, so the organizer just repeats it.
+    """
+    try:
+        report = generate_certificates(conf_id, limit=current_app.config.get("CERTIFICATE_REQUEST_LIMIT", 500))
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for("organizer.dashboard", conf_id=conf_id))
+
+    if not report.pending:
+        flash("All eligible certificates have already been issued.", "info")
+    else:
+        message = f"Issued {report.issued} certificate(s)."
+        if report.failed:
+            message += f" {report.failed} failed and will be retried on the next run."
+        if report.remaining:
+            message += f" {report.remaining} still to issue: run the generator again to continue."
+        flash(message, "success" if not report.failed else "warning")
+    return redirect(url_for("organizer.dashboard", conf_id=conf_id))
+
+
+@organizer_bp.route("/proceedings/<int:conf_id>")
+@organizer_required
+def proceedings(conf_id):
+    """Proceedings volume: papers in order, missing camera-ready files and build state."""
+    conference = Conference.query.get_or_404(conf_id)
+    return render_template("organiser/proceedings.html", conference=conference, status=proceedings_status(conf_id))
+
+
+@organizer_bp.route("/proceedings/<int:conf_id>/compile", methods=["POST"])
+@organizer_required
+def compile_conference_proceedings(conf_id):
+    """Starts a background build of the proceedings unless the current volume is already cached."""
+    Conference.query.get_or_404(conf_id)
+    status = proceedings_status(conf_id)
+    if not status.entries:
+        flash("No accepted paper has a camera-ready file yet.", "warning")
+    elif status.ready:
+        flash("The proceedings are up to date with the camera-ready files.", "info")
+    elif start_proceedings_build(conf_id, status.key):
+        flash("Compiling the proceedings in the background. Refresh this page to check progress.", "success")
+    else:
+        flash("The proceedings are already being compiled.", "info")
+    return redirect(url_for("organizer.proceedings", conf_id=conf_id))
+
+
+@organizer_bp.route("/proceedings/<int:conf_id>/download")
+@organizer_required
+def download_proceedings(conf_id):
+    """Sends the compiled proceedings, if the current volume has been built."""
+    conference = Conference.query.get_or_404(conf_id)
+    status = proceedings_status(conf_id)
+    if not status.ready:
+        flash("The proceedings have not been compiled for the current camera-ready files.", "warning")
+        return redirect(url_for("organizer.proceedings", conf_id=conf_id))
+
+    return send_file(
+        status.path,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=f"{secure_filename(conference.title) or conf_id}_Proceedings.pdf"
+    )
+
+
 @organizer_bp.route("/manage_reviewers/<int:conf_id>")
 @organizer_required
 def manage_reviewers(conf_id):
@@ -189,6 +253,81 @@ def reviewer_action(conf_id, role_id, action):
 
     return redirect(url_for("organizer.manage_reviewers", conf_id=conf_id))
 
+@organizer_bp.route("/reviewer_action/<int:conf_id>/bulk", methods=["POST"])
+@organizer_required
+def bulk_reviewer_action(conf_id):
+    """Approve or reject several pending reviewer requests at once."""
+    action = request.form.get("action")
+    role_ids = selected_role_ids()
+    queue_url = url_for("organizer.manage_reviewers", conf_id=conf_id)
+
+    if action not in ("approve", "reject"):
+        flash("Invalid action.", "error")
+        return redirect(queue_url)
+    if not role_ids:
+        flash("Please select at least one request.", "warning")
+        return redirect(queue_url)
+
+    criteria = (
+        ConferenceRole.conference_id == conf_id,
+        ConferenceRole.role == UserRole.reviewer,
+        ConferenceRole.status == 0,
+        # Organizers cannot act on their own reviewer request
+        ConferenceRole.user_id != session["user_id"]
+    )
+
+    if action == "approve":
+        processed = bulk_approve(role_ids, *criteria)
+        message = f"{processed} reviewer(s) approved."
+    else:
+        processed = bulk_reject(role_ids, *criteria)
+        message = f"{processed} reviewer(s) rejected (roles removed)."
+
+    skipped = len(role_ids) - processed
+    if skipped:
+        message += f" {skipped} selected request(s) were skipped (already handled or your own)."
+
+    pending_count = ConferenceRole.query.filter_by(conference_id=conf_id, role=UserRole.reviewer, status=0).count()
+    return bulk_response(message, "success" if processed else "warning",
+                         {"pending_reviewers": pending_count}, queue_url, processed, skipped)
+
+
+@organizer_bp.route("/reviewer_workload/<int:conf_id>")
+@organizer_required
+def reviewer_workload(conf_id):
+    """Per-reviewer assigned / submitted / overdue counts, aggregated in a single query."""
+    conference = Conference.query.get_or_404(conf_id)
+    now = utc_now_naive()
+
+    pending = Review.submitted_at.is_(None)
+    workload = db.session.query(
+        ConferenceRole.id.label("role_id"),
+        User.name,
+        User.email,
+        func.count(Review.review_id).label("assigned"),
+        func.count(Review.submitted_at).label("submitted"),
+        func.sum(case((pending & (Review.due_at < now), 1), else_=0)).label("overdue"),
+        func.min(case((pending, Review.due_at), else_=None)).label("next_due"),
+        func.max(Review.submitted_at).label("last_submitted")
+    ).join(User, User.user_id == ConferenceRole.user_id).outerjoin(
+        Review, Review.reviewer_role_id == ConferenceRole.id
+    ).filter(
+        ConferenceRole.conference_id == conf_id,
+        ConferenceRole.role == UserRole.reviewer,
+        ConferenceRole.status == 1
+    ).group_by(
+        ConferenceRole.id, User.name, User.email
+    ).order_by(
+        func.sum(case((pending & (Review.due_at < now), 1), else_=0)).desc(),
+        func.count(Review.review_id).desc()
+    ).all()
+
+    return render_template(
+        "organiser/reviewer_workload.html",
+        conference=conference,
+        workload=workload
+    )
+
 # --- 2. TRACKS & SESSIONS ROUTES ---
 
 @organizer_bp.route("/tracks_sessions/<int:conf_id>")
@@ -475,10 +614,21 @@ def manage_papers(conf_id):
         db.joinedload(Paper.reviews)  # Essential for counting assignments
     ).filter_by(conference_id=conf_id).all()
 
+    # Calibrated review scores (cached per conference, recomputed only when reviews change)
+    score_stats = get_conference_score_stats(conf_id)
+
+    sort_by = request.args.get('sort', 'id')
+    if sort_by == 'score':
+        # Ranked papers first, unscored papers after them in submission order
+        rank_lookup = {pid: i for i, pid in enumerate(score_stats.ranking)}
+        papers.sort(key=lambda p: (rank_lookup.get(p.paper_id, len(rank_lookup)), p.paper_id))
+
     return render_template(
         "organiser/manage_papers.html",
         conference=conference,
         papers=papers,
+        score_stats=score_stats,
+        sort_by=sort_by
         # PaperStatus=PaperStatus # Pass the Enum for status display if needed
     )
 
@@ -580,6 +730,17 @@ def assign_reviewers_post(conf_id, paper_id):
         flash("Please select at least one reviewer to assign.", "warning")
         return redirect(url_for('organizer.assign_reviewers_view', conf_id=conf_id, paper_id=paper_id))
 
+    # Due date: explicit date from the form (end of that day), else the configured review period
+    due_date_str = request.form.get("due_date")
+    try:
+        if due_date_str:
+            due_at = datetime.strptime(due_date_str, "%Y-%m-%d") + timedelta(hours=23, minutes=59)
+        else:
+            due_at = utc_now_naive() + timedelta(days=current_app.config.get('REVIEW_PERIOD_DAYS', 14))
+    except ValueError:
+        flash("Invalid due date format.", "error")
+        return redirect(url_for('organizer.assign_reviewers_view', conf_id=conf_id, paper_id=paper_id))
+
     successful_assignments = 0
 
     for role_id_str in reviewer_role_ids:
@@ -597,7 +758,9 @@ def assign_reviewers_post(conf_id, paper_id):
         # 2. Create the new Review record (the assignment)
         new_review = Review(
             paper_id=paper_id,
-            reviewer_role_id=role_id
+            reviewer_role_id=role_id,
+            assigned_at=utc_now_naive(),
+            due_at=due_at
         )
         db.session.add(new_review)
         successful_assignments += 1
@@ -639,7 +802,8 @@ def view_reviews(conf_id, paper_id):
     # CRITICAL: Form is LOCKED if a decision has been made AND edit_mode is FALSE
     is_locked = is_decision_made and not edit_mode
 
-    # Fetch all approved reviewers to compare against assigned list (optional)
+    # Calibrated score for this paper and each reviewer's leniency relative to the conference
+    score_stats = get_conference_score_stats(conf_id)
 
     return render_template(
         "organiser/final_decision_form.html",
@@ -650,7 +814,9 @@ def view_reviews(conf_id, paper_id):
         final_statuses=[PaperStatus.accepted, PaperStatus.rejected, PaperStatus.revision_required],
         # Explicitly list available decisions
         is_decision_made = is_decision_made,  # Pass status flag
-        is_locked = is_locked  # Pass lock control
+        is_locked = is_locked,  # Pass lock control
+        paper_stats=score_stats.paper_summary(paper.paper_id),
+        score_stats=score_stats
     )
 
 
@@ -737,6 +903,168 @@ def final_decision(conf_id, paper_id):
     # Redirect back to the main paper list
     return redirect(url_for('organizer.manage_papers', conf_id=conf_id))
 
+def _build_decision_board(conf_id, form):
+    """
+    Computes the decision-board proposal from the cached score statistics and the
+    per-track rules submitted in `form` (query string for preview, POST body for commit).
+    """
+    score_stats = get_conference_score_stats(conf_id)
+    tracks = Track.query.filter_by(conference_id=conf_id).order_by(Track.name).all()
+
+    # Only the light columns are needed; thousands of papers stay cheap to load
+    paper_rows = db.session.query(
+        Paper.paper_id, Paper.title, Paper.track_id, Paper.status
+    ).filter(Paper.conference_id == conf_id).all()
+
+    open_statuses = (PaperStatus.submitted, PaperStatus.under_review)
+    accepted_per_track = {}
+    for row in paper_rows:
+        if row.status == PaperStatus.accepted:
+            accepted_per_track[row.track_id] = accepted_per_track.get(row.track_id, 0) + 1
+
+    # Parse per-track rules: mode_<track_id> = capacity|threshold, value_<track_id> = number
+    track_rules = {}
+    rule_inputs = {}
+    for track in tracks:
+        mode = form.get(f"mode_{track.track_id}", "capacity")
+        value_str = form.get(f"value_{track.track_id}", "")
+        rule_inputs[track.track_id] = {"mode": mode, "value": value_str}
+        if value_str == "":
+            continue
+        try:
+            value = float(value_str)
+        except ValueError:
+            continue
+        if mode == "capacity":
+            # Capacity is the total for the track, so subtract papers already accepted
+            remaining = int(value) - accepted_per_track.get(track.track_id, 0)
+            track_rules[track.track_id] = ("capacity", max(remaining, 0))
+        elif mode == "threshold":
+            track_rules[track.track_id] = ("threshold", value)
+
+    try:
+        revision_margin = max(float(form.get("revision_margin") or 0), 0.0)
+    except ValueError:
+        revision_margin = 0.0
+
+    proposals = propose_decisions(
+        score_stats,
+        [(row.paper_id, row.track_id) for row in paper_rows if row.status in open_statuses],
+        track_rules,
+        revision_margin
+    )
+
+    return {
+        "score_stats": score_stats,
+        "tracks": tracks,
+        "paper_rows": paper_rows,
+        "rule_inputs": rule_inputs,
+        "revision_margin": revision_margin,
+        "proposals": proposals,
+        "accepted_per_track": accepted_per_track,
+    }
+
+
+@organizer_bp.route("/decision_board/<int:conf_id>")
+@organizer_required
+def decision_board(conf_id):
+    """
+    Ranked decision view: organizers set a capacity or score threshold per track and
+    preview accept/revision/reject proposals for every undecided paper at once.
+    """
+    conference = Conference.query.get_or_404(conf_id)
+    board = _build_decision_board(conf_id, request.args)
+    score_stats = board["score_stats"]
+
+    # Rows ordered per track by calibrated rank; unscored papers go last
+    rank_lookup = {pid: i for i, pid in enumerate(score_stats.ranking)}
+    rows_by_track = {}
+    for row in sorted(board["paper_rows"], key=lambda r: (rank_lookup.get(r.paper_id, len(rank_lookup)), r.paper_id)):
+        rows_by_track.setdefault(row.track_id, []).append(row)
+
+    proposal_counts = {"accepted": 0, "revision_required": 0, "rejected": 0}
+    for outcome in board["proposals"].values():
+        proposal_counts[outcome] += 1
+
+    return render_template(
+        "organiser/decision_board.html",
+        conference=conference,
+        tracks=board["tracks"],
+        rows_by_track=rows_by_track,
+        rule_inputs=board["rule_inputs"],
+        revision_margin=board["revision_margin"],
+        proposals=board["proposals"],
+        proposal_counts=proposal_counts,
+        accepted_per_track=board["accepted_per_track"],
+        score_stats=score_stats
+    )
+
+
+@organizer_bp.route("/decision_board/<int:conf_id>/apply", methods=["POST"])
+@organizer_required
+def apply_decision_board(conf_id):
+    """
+    Recomputes the proposal server-side from the submitted rules and commits every
+    outcome in a single transaction (one UPDATE per outcome). Rejections get what
+    final_decision does: the author role is deleted (with the paper) and the author
+    is emailed, once the transaction has committed.
+    """
+    board = _build_decision_board(conf_id, request.form)
+    proposals = board["proposals"]
+
+    if not proposals:
+        flash("No decisions to apply. Set a capacity or threshold for at least one track.", "warning")
+        return redirect(url_for('organizer.decision_board', conf_id=conf_id, **request.form.to_dict()))
+
+    ids_by_status = {}
+    for paper_id, outcome in proposals.items():
+        ids_by_status.setdefault(outcome, []).append(paper_id)
+
+    # Guard on status so papers decided concurrently by another organizer are not overwritten
+    undecided = (Paper.conference_id == conf_id, Paper.status.in_([PaperStatus.submitted, PaperStatus.under_review]))
+    rejections = []
+    try:
+        updated = 0
+        for outcome, paper_ids in ids_by_status.items():
+            if outcome == "rejected":
+                continue
+            updated += Paper.query.filter(Paper.paper_id.in_(paper_ids), *undecided).update(
+                {Paper.status: PaperStatus[outcome]}, synchronize_session=False
+            )
+        if updated:
+            # Bulk UPDATEs skip the flush hooks: refresh the public pages and analytics here
+            bump_conference_versions([conf_id])
+            mark_conferences_stale([conf_id])
+
+        rejected = Paper.query.options(
+            db.joinedload(Paper.author_role).joinedload(ConferenceRole.user)
+        ).filter(Paper.paper_id.in_(ids_by_status.get("rejected", [])), *undecided).all()
+        for paper in rejected:
+            author = paper.author_role.user
+            rejections.append((author.email, author.name, paper.title))
+            db.session.delete(paper.author_role)  # ORM delete: cascades to the paper and runs the flush hooks
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"DECISION BOARD COMMIT ERROR: {e}")
+        flash(f"Database error occurred while applying decisions: {e}", "error")
+        return redirect(url_for('organizer.decision_board', conf_id=conf_id, **request.form.to_dict()))
+
+    conference = db.session.get(Conference, conf_id)
+    for author_email, author_name, paper_title in rejections:
+        subject, body = rejection_email(author_name, paper_title, conference)
+        enqueue_email(author_email, subject, plain_text_content=body)
+
+    flash(
+        f"Applied decisions: {len(ids_by_status.get('accepted', []))} accepted, "
+        f"{len(ids_by_status.get('revision_required', []))} revision required, "
+        f"{len(rejections)} rejected. Authors can see the outcome on their dashboard; "
+        f"rejected authors are notified by email and their submissions removed.",
+        "success"
+    )
+    return redirect(url_for('organizer.manage_papers', conf_id=conf_id, sort='score'))
+
+
 @organizer_bp.route("/download_camera_ready/<int:conf_id>/<int:paper_id>")
 @organizer_required
 def download_camera_ready(conf_id, paper_id):
@@ -781,6 +1109,7 @@ def remove_assignment(conf_id, review_id):
     try:
         db.session.delete(review_to_delete)
         db.session.commit()
+        invalidate_score_stats(conf_id)
         flash("Reviewer assignment removed successfully.", "success")
     except Exception as e:
         db.session.rollback()
@@ -830,17 +1159,9 @@ def generate_pdf_preview(conf_id):
             date_key = session.schedule_time.date()
             sessions_by_date.setdefault(date_key, []).append(session)
 
-    # 2. Render HTML (Uses the private template intended for PDF conversion)
-    html_content = render_template(
-        "organiser/schedule_pdf.html",
-        conference=conference,
-        all_sessions=sessions,
-        sessions_by_date=sessions_by_date
-    )
-
-    # 3. Generate PDF using the robust helper function
+    # 2. Assemble the PDF from per-day fragments (only changed days are re-rendered)
     try:
-        pdf_data = generate_pdf_from_html(html_content)
+        pdf_data = io.BytesIO(schedule_pdf(conference, sessions_by_date))
 
         filename = f"{conference.title.replace(' ', '_')}_Draft_Schedule.pdf"
 
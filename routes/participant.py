@@ -1,9 +1,9 @@
-from flask import Blueprint, flash, redirect, url_for, render_template, session
+from flask import Blueprint, render_template
 from sqlalchemy.orm import joinedload
 from datetime import datetime
-from models import Conference, ConferenceRole, UserRole, Certificate, CertificateType, Registration, PaymentStatus
+from models import Conference, Certificate, CertificateType, Registration, PaymentStatus
 from extensions import db
-from .auth_routes import login_required  # Assumes login_required is in auth_routes.py
+from utils.permissions import participant_required, current_principal
 
 # --- DEFINE BLUEPRINT ---
 participant_bp = Blueprint("participant", __name__)  # Endpoint name will be 'participant.function_name'
@@ -12,26 +12,14 @@ participant_bp = Blueprint("participant", __name__)  # Endpoint name will be 'pa
 # --- PARTICIPANT DASHBOARD ROUTE ---
 
 @participant_bp.route("/dashboard/participant/<int:conf_id>")
-@login_required
+@participant_required
 def participant_dashboard(conf_id):
     """
     Displays the participant's dashboard for a specific conference.
     Only allows access if the user is an APPROVED participant.
     """
-    user_id = session["user_id"]
-
-    # 1. Verify User is an APPROVED Participant for this conference
-    participant_role = ConferenceRole.query.filter_by(
-        user_id=user_id,
-        conference_id=conf_id,
-        role=UserRole.participant,
-        status=1  # Must be approved (paid)
-    ).first()
-
-    if not participant_role:
-        flash("Access denied. You are not a confirmed participant for this event.", "error")
-        # Redirect to the main user dashboard if access is denied
-        return redirect(url_for("auth.dashboard"))
+    # 1. The APPROVED (paid) Participant role, already verified by @participant_required
+    participant_role = current_principal().conference_role(conf_id)
 
     conference = Conference.query.get_or_404(conf_id)
 
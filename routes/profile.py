@@ -1,10 +1,12 @@
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-# ADD these imports for password hashing and checking
-from werkzeug.security import generate_password_hash, check_password_hash
-from models import User
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_file, abort
+from models import User, Certificate, ConferenceRole
 from extensions import db
+from utils.passwords import hash_password, verify_password, PasswordHashBusy
+from utils.sessions import revoke_user_sessions
+from utils.certificates import certificate_path
 from .auth_routes import login_required
+import os
 
 profile_bp = Blueprint("profile", __name__)
 
@@ -41,7 +43,13 @@ def change_password():
     confirm_password = request.form.get("confirm_password")
 
     # 1. Verify the current password
-    if not check_password_hash(user.password_hash, current_password):
+    try:
+        current_password_ok = verify_password(user.password_hash, current_password)
+    except PasswordHashBusy:
+        flash("The server is busy. Please try again in a moment.", "warning")
+        return redirect(url_for("profile.view_profile"))
+
+    if not current_password_ok:
         flash("Your current password is incorrect. Please try again.", "error")
         return redirect(url_for("profile.view_profile"))
 
@@ -56,8 +64,30 @@ def change_password():
         return redirect(url_for("profile.view_profile"))
 
     # 4. Hash the new password and update the user
-    user.password_hash = generate_password_hash(new_password)
+    try:
+        user.password_hash = hash_password(new_password)
+    except PasswordHashBusy:
+        flash("The server is busy. Please try again in a moment.", "warning")
+        return redirect(url_for("profile.view_profile"))
     db.session.commit()
+    # Log out every other device that still holds a session for this account
+    revoke_user_sessions(user.user_id, keep_current=True)
 
     flash("Your password has been changed successfully!", "success")
-    return redirect(url_for("profile.view_profile"))
\ No newline at end of file
+    return redirect(url_for("profile.view_profile"))
+
+
+@profile_bp.route("/certificates/<int:certificate_id>")
+@login_required
+def download_certificate(certificate_id):
+    """Sends one of the current user's certificates."""
+    certificate = Certificate.query.join(Certificate.conference_role).filter(
+        Certificate.certificate_id == certificate_id,
+        ConferenceRole.user_id == session["user_id"]
+    ).first_or_404()
+
+    path = certificate_path(certificate)
+    if not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype="application/pdf", as_attachment=True,
+                     download_name=f"certificate_{certificate.certificate_type.value}.pdf")
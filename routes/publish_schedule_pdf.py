@@ -2,36 +2,13 @@ from flask import Blueprint, render_template, redirect, flash, send_file, url_fo
 from datetime import datetime
 from extensions import db
 from models import Conference, Session, ConferenceRole, Track,SessionPaper,Session,Paper # All necessary imports
-from xhtml2pdf import pisa
+from utils.schedule_pdf import schedule_pdf
+from utils.page_cache import cache_public_page
 import io
-import os
-import tempfile
 
 # Define the new Blueprint for public/general conference actions
 schedule_bp = Blueprint("schedule", __name__)
 
-def generate_pdf_from_html(html_content):
-    pdf_output = io.BytesIO()
-    cwd_backup = os.getcwd()
-
-    try:
-        temp_dir = tempfile.gettempdir()
-        os.chdir(temp_dir)
-
-        pisa_status = pisa.CreatePDF(
-            html_content.encode("utf-8", "ignore"),
-            dest=pdf_output
-        )
-
-        if pisa_status.err:
-            raise Exception(f"PDF conversion failed (pisa code {pisa_status.err}).")
-
-        pdf_output.seek(0)
-        return pdf_output
-
-    finally:
-        os.chdir(cwd_backup)
-
 
 # =================================================================
 # --- PUBLIC SCHEDULE ROUTES ---
@@ -41,7 +18,7 @@ def generate_pdf_from_html(html_content):
 @schedule_bp.route("/conference/<int:conf_id>/schedule_pdf")
 def get_public_schedule_pdf(conf_id):
     """
-    ROUTE 1: Generates the dynamic PDF schedule using xhtml2pdf (used for downloading a draft).
+    ROUTE 1: Generates the dynamic PDF schedule with the configured PDF engine (used for downloading a draft).
     """
     try:
         conference = Conference.query.get_or_404(conf_id)
@@ -79,16 +56,8 @@ def get_public_schedule_pdf(conf_id):
                 date_key = session.schedule_time.date()
                 sessions_by_date.setdefault(date_key, []).append(session)
 
-        # 2. Render HTML
-        html_content = render_template(
-            "organiser/schedule_pdf.html", # Template designed for print layout
-            conference=conference,
-            all_sessions=sessions,
-            sessions_by_date=sessions_by_date
-        )
-
-        # 3. Generate PDF
-        pdf_data = generate_pdf_from_html(html_content)
+        # 2. Assemble the PDF from per-day fragments (only changed days are re-rendered)
+        pdf_data = io.BytesIO(schedule_pdf(conference, sessions_by_date))
         filename = f"{conference.title.replace(' ', '_')}_Program_Schedule.pdf"
 
         return send_file(
@@ -105,6 +74,7 @@ def get_public_schedule_pdf(conf_id):
 
 
 @schedule_bp.route("/conference/<int:conf_id>/schedule_view")
+@cache_public_page("conf_id")
 def view_schedule_html(conf_id):
     """
     ROUTE 2: Public route to view the dynamic program schedule in HTML format.
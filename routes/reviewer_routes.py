@@ -1,40 +1,12 @@
-from flask import Blueprint, render_template, redirect, flash, session, url_for, abort, request, send_file, current_app
-from models import ConferenceRole, UserRole, Conference,Track,Review,Paper,ReviewRecommendation# Import necessary models
-from functools import wraps
-from datetime import datetime
+from flask import Blueprint, render_template, redirect, flash, session, url_for, request, send_file, current_app
+from models import ConferenceRole, UserRole, Conference,Track,Review,Paper,ReviewRecommendation, Certificate, CertificateType, utc_now_naive # Import necessary models
 from extensions import db
+from utils.review_stats import invalidate_score_stats
+from utils.permissions import reviewer_required, current_principal
 import os
 from flask import current_app
 reviewer_bp = Blueprint("reviewer", __name__) # Define the Blueprint
 
-# --- DECORATOR for Approved Reviewers ---
-def reviewer_required(f):
-    """Decorator to ensure user is a logged-in, APPROVED reviewer."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
-            flash("Please log in to access this page.", "error")
-            return redirect(url_for("auth.login"))
-
-        conference_id = kwargs.get("conf_id")
-        if not conference_id:
-            abort(400)
-
-        # Check if the user has an approved reviewer role for this conference
-        is_approved_reviewer = ConferenceRole.query.filter_by(
-            user_id=session["user_id"],
-            conference_id=conference_id,
-            role=UserRole.reviewer,
-            status=1 # Must be an APPROVED reviewer
-        ).first()
-
-        if not is_approved_reviewer:
-            flash("You do not have approved reviewer privileges for this conference.", "error")
-            return redirect(url_for("auth.dashboard"))
-
-        return f(*args, **kwargs)
-    return decorated_function
-
 # --- REVIEWER ROUTES GO HERE ---
 
 @reviewer_bp.route("/dashboard/reviewer/<int:conf_id>")
@@ -46,12 +18,7 @@ def dashboard(conf_id):
     conference = Conference.query.get_or_404(conf_id)
 
     # 2. Get the reviewer's ConferenceRole ID
-    reviewer_role = ConferenceRole.query.filter_by(
-        user_id=session["user_id"],
-        conference_id=conf_id,
-        role=UserRole.reviewer,
-        status=1
-    ).first()
+    reviewer_role = current_principal().conference_role(conf_id)  # Loaded by @reviewer_required
 
     if not reviewer_role:
         # Should be caught by the decorator, but good practice to handle.
@@ -69,12 +36,19 @@ def dashboard(conf_id):
         reviewer_role_id=reviewer_role.id
     ).all()
 
-    # 4. Render the template, passing all required objects
+    # 4. Reviewer certificate, once issued (see utils/certificates.py)
+    certificate = Certificate.query.filter_by(
+        role_id=reviewer_role.id,
+        certificate_type=CertificateType.reviewer
+    ).first()
+
+    # 5. Render the template, passing all required objects
     return render_template(
         "reviewer/dashboard_reviewer.html",
         conference=conference,  # <--- FIX: Passing the conference object
         assigned_reviews=assigned_reviews,
-        reviewer_role=reviewer_role
+        reviewer_role=reviewer_role,
+        certificate=certificate
     )
 
 @reviewer_bp.route("/apply_registration/<int:conf_id>", methods=["GET", "POST"])
@@ -153,11 +127,7 @@ def view_review_form(conf_id, review_id):
     ).get_or_404(review_id)
 
     # 2. Get the Reviewer's specific ConferenceRole ID
-    reviewer_role = ConferenceRole.query.filter_by(
-        user_id=session["user_id"],
-        conference_id=conf_id,
-        status=1
-    ).first_or_404()
+    reviewer_role = current_principal().conference_role(conf_id)  # Loaded by @reviewer_required
 
     # 3. CRITICAL AUTHORIZATION CHECK: Ensure this assignment belongs to the logged-in user
     if review_assignment.reviewer_role_id != reviewer_role.id:
@@ -180,9 +150,11 @@ def view_review_form(conf_id, review_id):
             review_assignment.comments_to_organiser = comments_to_organiser
             review_assignment.score = int(score)
             review_assignment.recommendation = ReviewRecommendation[recommendation_str]
-            review_assignment.created_at = datetime.now()
+            # Keep created_at/assigned_at as the assignment time; record the submission separately
+            review_assignment.submitted_at = utc_now_naive()
 
             db.session.commit()
+            invalidate_score_stats(conf_id)
             flash("Review successfully submitted/updated! Thank you.", "success")
             return redirect(url_for('reviewer.dashboard', conf_id=conf_id))
 
@@ -214,9 +186,7 @@ def download_paper(conf_id, paper_id):  # <-- Accept paper_id
 
     # CRITICAL SECURITY CHECK: Ensure the paper is assigned to the logged-in reviewer.
     # We must check that a Review record exists for this paper and user.
-    reviewer_role = ConferenceRole.query.filter_by(
-        user_id=session["user_id"], conference_id=conf_id
-    ).first()
+    reviewer_role = current_principal().conference_role(conf_id)  # Loaded by @reviewer_required
 
     # Verify that an active assignment exists for this paper and reviewer
     assignment_exists = Review.query.filter_by(
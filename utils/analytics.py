@@ -0,0 +1,264 @@
+"""
+Cross-conference analytics for the super admin dashboard.
+
+The dashboard reads two small rollup tables instead of scanning papers, reviews
+and registrations on every view:
+
+* analytics_conference_stats: one row per conference, built with one GROUP BY
+  query per source table;
+* analytics_university_stats: one row per hosting university, summed from the
+  conference rows.
+
+Rows are kept fresh two ways. An after_flush hook marks the conference row stale
+whenever an ORM flush touches one of its papers, reviews, registrations or roles,
+and the dashboard recomputes only the stale (or missing) conferences before it
+renders. Bulk UPDATE/DELETE statements bypass the hook and must call
+mark_conferences_stale() for the conferences they touch; `flask refresh-analytics`
+rebuilds everything. Refreshes upsert rather than replace rows and lock what they
+recompute, so two dashboards loading at once (or a dashboard and the CLI) do not
+collide, and changes made during a refresh stay flagged (see refresh_analytics).
+"""
+from decimal import Decimal
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import case, delete, event, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import (
+    Conference, ConferenceRole, ConferenceStats, Paper, PaperStatus, PaymentStatus, Registration, Review,
+    UniversityStats, UserRole, utc_now_naive
+)
+
+COUNTERS = (
+    "papers_submitted", "papers_accepted", "papers_rejected", "reviewers", "reviews_assigned",
+    "reviews_submitted", "registrations", "registrations_paid", "fee_revenue", "fee_outstanding",
+)
+
+# INSERT ... ON CONFLICT constructs of the backends that have one
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _sum_if(condition, column):
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def _grouped(statement, conference_column, conference_ids):
+    if conference_ids is not None:
+        statement = statement.where(conference_column.in_(conference_ids))
+    return db.session.execute(statement.group_by(conference_column)).all()
+
+
+def _conference_rows(conference_ids=None):
+    """Fresh ConferenceStats values for the given conferences (all when None)."""
+    conferences = select(Conference.conference_id, Conference.hosting_university)
+    if conference_ids is not None:
+        conferences = conferences.where(Conference.conference_id.in_(conference_ids))
+
+    now = utc_now_naive()
+    rows = {}
+    for conference_id, university in db.session.execute(conferences):
+        rows[conference_id] = dict({name: 0 for name in COUNTERS}, conference_id=conference_id,
+                                   hosting_university=university, stale=False, refreshed_at=now)
+
+    def merge(result, *names):
+        for conference_id, *values in result:
+            if conference_id in rows:
+                rows[conference_id].update(zip(names, values))
+
+    merge(_grouped(select(
+        Paper.conference_id, func.count(Paper.paper_id),
+        _count_if(Paper.status == PaperStatus.accepted), _count_if(Paper.status == PaperStatus.rejected)
+    ), Paper.conference_id, conference_ids), "papers_submitted", "papers_accepted", "papers_rejected")
+
+    merge(_grouped(select(ConferenceRole.conference_id, func.count(ConferenceRole.id)).where(
+        ConferenceRole.role == UserRole.reviewer, ConferenceRole.status == 1
+    ), ConferenceRole.conference_id, conference_ids), "reviewers")
+
+    merge(_grouped(select(
+        Paper.conference_id, func.count(Review.review_id), func.count(Review.submitted_at)
+    ).join(Review, Review.paper_id == Paper.paper_id), Paper.conference_id, conference_ids),
+        "reviews_assigned", "reviews_submitted")
+
+    paid = Registration.payment_status == PaymentStatus.completed
+    merge(_grouped(select(
+        Registration.conference_id, func.count(Registration.registration_id), _count_if(paid),
+        _sum_if(paid, Registration.fee_amount),
+        _sum_if(Registration.payment_status == PaymentStatus.pending, Registration.fee_amount)
+    ), Registration.conference_id, conference_ids),
+        "registrations", "registrations_paid", "fee_revenue", "fee_outstanding")
+
+    return list(rows.values())
+
+
+def _upsert(model, rows, update_columns=()):
+    """
+    Inserts `rows`; rows whose primary key exists are updated with `update_columns`
+    (skipped when there are none), so concurrent refreshes never collide on a key.
+    """
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in _DIALECT_INSERTS:
+        statement = _DIALECT_INSERTS[dialect](model)
+        key = [column.name for column in model.__table__.primary_key]
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=key, set_={name: statement.excluded[name] for name in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=key)
+        db.session.execute(statement, rows)
+        return
+
+    # Other backends: look the keys up first (not safe against a concurrent refresh)
+    (key,) = model.__table__.primary_key
+    existing = set(db.session.execute(select(key).where(key.in_([row[key.name] for row in rows]))).scalars())
+    updates = [{name: row[name] for name in (key.name, *update_columns)} for row in rows if row[key.name] in existing]
+    if updates and update_columns:
+        db.session.execute(update(model), updates)
+    inserts = [row for row in rows if row[key.name] not in existing]
+    if inserts:
+        db.session.execute(insert(model), inserts)
+
+
+def _rebuild_university_stats():
+    """Rewrites the university rollup with sums over the conference rows (one per conference)."""
+    # Lock the rows first: a concurrent refresh waits here, then sums the conference rows this one wrote
+    db.session.execute(update(UniversityStats).values(conferences=UniversityStats.conferences))
+
+    sums = [func.coalesce(func.sum(getattr(ConferenceStats, name)), 0) for name in COUNTERS]
+    result = db.session.execute(select(
+        ConferenceStats.hosting_university, func.count(ConferenceStats.conference_id), *sums
+    ).group_by(ConferenceStats.hosting_university)).all()
+
+    now = utc_now_naive()
+    _upsert(UniversityStats, [
+        dict(zip(COUNTERS, values), hosting_university=university, conferences=conferences, refreshed_at=now)
+        for university, conferences, *values in result
+    ], update_columns=COUNTERS + ("conferences", "refreshed_at"))
+    db.session.execute(delete(UniversityStats).where(
+        UniversityStats.hosting_university.not_in([university for university, *_ in result])
+    ))
+
+
+def refresh_analytics(conference_ids=None):
+    """
+    Recomputes the conference rows for `conference_ids` (every conference when None),
+    drops rows of deleted conferences, rebuilds the university rollup and commits.
+    Returns the number of conference rows written.
+
+    Safe to run concurrently with writers and with other refreshes. Conferences
+    without a row get a stale placeholder first (committed), because the stale flag
+    can only be set on an existing row. The rows are then locked before anything is
+    counted: a writer that flags one of them waits for this transaction, so its flag
+    lands after the rows are cleared and the conference is recomputed next time.
+    """
+    missing = select(Conference.conference_id, Conference.hosting_university).outerjoin(
+        ConferenceStats, ConferenceStats.conference_id == Conference.conference_id
+    ).where(ConferenceStats.conference_id.is_(None))
+    if conference_ids is not None:
+        missing = missing.where(Conference.conference_id.in_(conference_ids))
+    now = utc_now_naive()
+    _upsert(ConferenceStats, [
+        dict({name: 0 for name in COUNTERS}, conference_id=conference_id, hosting_university=university,
+             stale=True, refreshed_at=now)
+        for conference_id, university in db.session.execute(missing)
+    ])
+    db.session.commit()
+
+    # A no-op UPDATE: row locks on PostgreSQL, the database write lock on SQLite
+    lock = update(ConferenceStats).values(stale=ConferenceStats.stale)
+    orphaned = delete(ConferenceStats).where(
+        ConferenceStats.conference_id.not_in(select(Conference.conference_id).scalar_subquery())
+    )
+    if conference_ids is not None:
+        lock = lock.where(ConferenceStats.conference_id.in_(conference_ids))
+        orphaned = orphaned.where(ConferenceStats.conference_id.in_(conference_ids))
+    db.session.execute(lock)
+
+    rows = _conference_rows(conference_ids)
+    db.session.execute(orphaned)
+    _upsert(ConferenceStats, rows, update_columns=COUNTERS + ("hosting_university", "stale", "refreshed_at"))
+
+    _rebuild_university_stats()
+    db.session.commit()
+    return len(rows)
+
+
+def refresh_stale_analytics():
+    """Refreshes only conferences whose rollup is stale or missing. Returns the number refreshed."""
+    stale_ids = db.session.execute(
+        select(Conference.conference_id)
+        .outerjoin(ConferenceStats, ConferenceStats.conference_id == Conference.conference_id)
+        .where(or_(ConferenceStats.conference_id.is_(None), ConferenceStats.stale.is_(True)))
+    ).scalars().all()
+    orphaned = db.session.execute(
+        select(ConferenceStats.conference_id)
+        .outerjoin(Conference, Conference.conference_id == ConferenceStats.conference_id)
+        .where(Conference.conference_id.is_(None))
+    ).scalars().all()
+
+    if not stale_ids and not orphaned:
+        return 0
+    refresh_analytics(stale_ids + orphaned)
+    return len(stale_ids)
+
+
+def platform_totals(university_rows):
+    """Sums the university rows into one platform-wide UniversityStats (not persisted)."""
+    totals = UniversityStats(hosting_university="All universities", conferences=0,
+                             **{name: Decimal(0) if name.startswith("fee_") else 0 for name in COUNTERS})
+    for row in university_rows:
+        totals.conferences += row.conferences
+        for name in COUNTERS:
+            setattr(totals, name, getattr(totals, name) + getattr(row, name))
+    return totals
+
+
+def _mark_stale(session, flush_context):
+    conference_ids, paper_ids = set(), set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Conference, Paper, Registration, ConferenceRole)):
+            conference_ids.add(obj.conference_id)
+        elif isinstance(obj, Review):
+            paper_ids.add(obj.paper_id)
+    conference_ids.discard(None)
+    paper_ids.discard(None)
+    if not conference_ids and not paper_ids:
+        return
+
+    criteria = []
+    if conference_ids:
+        criteria.append(ConferenceStats.conference_id.in_(conference_ids))
+    if paper_ids:
+        criteria.append(ConferenceStats.conference_id.in_(
+            select(Paper.conference_id).where(Paper.paper_id.in_(paper_ids)).scalar_subquery()
+        ))
+    _flag_stale(session, or_(*criteria))
+
+
+def _flag_stale(session, criterion):
+    # Same connection and transaction as the writes, so the flag commits or rolls back with them
+    session.connection().execute(
+        update(ConferenceStats).where(criterion, ConferenceStats.stale.is_(False)).values(stale=True)
+    )
+
+
+def mark_conferences_stale(conference_ids, session=None):
+    """Marks the conferences' rollups stale in the session's transaction; for bulk writes the hook misses."""
+    conference_ids = set(conference_ids)
+    conference_ids.discard(None)
+    if conference_ids and current_app.config.get("ANALYTICS_TRACK_CHANGES", True):
+        _flag_stale(session or db.session(), ConferenceStats.conference_id.in_(conference_ids))
+
+
+def init_analytics(app):
+    """Installs the stale-marking hook unless ANALYTICS_TRACK_CHANGES is off."""
+    if app.config.get("ANALYTICS_TRACK_CHANGES", True) and not event.contains(db.session, "after_flush", _mark_stale):
+        event.listen(db.session, "after_flush", _mark_stale)
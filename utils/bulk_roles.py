@@ -0,0 +1,88 @@
+"""
+Multi-select approve / reject for the ConferenceRole queues.
+
+Each bulk action is one UPDATE (or one DELETE) over `id IN (...)`. The caller
+passes the queue's conditions (conference, role, pending status, ownership) as
+SQL criteria, so ids the user may not act on are simply not matched instead of
+being loaded and checked one by one.
+
+Bulk statements bypass the ORM flush hooks, so each action also bumps the content
+version and marks the analytics rollup stale of the conferences it touched, in
+the same transaction (utils/content_versions.py, utils/analytics.py).
+"""
+from flask import request, jsonify, flash, redirect
+from sqlalchemy import delete, select, update
+
+from extensions import db
+from models import ConferenceRole, Registration
+from utils.analytics import mark_conferences_stale
+from utils.content_versions import bump_conference_versions
+
+MAX_BULK_IDS = 1000
+
+
+def selected_role_ids():
+    """The role ids ticked in the submitted form (role_ids=1&role_ids=2 ...)."""
+    ids = []
+    for value in request.form.getlist("role_ids"):
+        if value.isdigit():
+            ids.append(int(value))
+    return list(dict.fromkeys(ids))[:MAX_BULK_IDS]
+
+
+def _touch_conferences(matching):
+    """What the flush hooks would have done for the roles selected by `matching`."""
+    conference_ids = set(db.session.scalars(
+        select(ConferenceRole.conference_id).where(ConferenceRole.id.in_(matching.scalar_subquery())).distinct()
+    ))
+    bump_conference_versions(conference_ids)
+    mark_conferences_stale(conference_ids)
+
+
+def bulk_approve(role_ids, *criteria):
+    """Sets status=1 on the matching roles with a single UPDATE. Returns the row count."""
+    if not role_ids:
+        return 0
+    _touch_conferences(select(ConferenceRole.id).where(ConferenceRole.id.in_(role_ids), *criteria))
+    result = db.session.execute(
+        update(ConferenceRole)
+        .where(ConferenceRole.id.in_(role_ids), *criteria)
+        .values(status=1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def bulk_reject(role_ids, *criteria):
+    """
+    Deletes the matching roles with a single DELETE (plus one for pending
+    registrations that point at them). Returns the number of roles removed.
+    """
+    if not role_ids:
+        return 0
+    matching = select(ConferenceRole.id).where(ConferenceRole.id.in_(role_ids), *criteria)
+    _touch_conferences(matching)
+    db.session.execute(
+        delete(Registration)
+        .where(Registration.role_id.in_(matching.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    result = db.session.execute(
+        delete(ConferenceRole)
+        .where(ConferenceRole.id.in_(role_ids), *criteria)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def bulk_response(message, category, counts, redirect_url, processed, skipped):
+    """
+    JSON clients (fetch/XHR) get the outcome and the refreshed queue counts in
+    this one response; regular form posts get a flash message and a redirect.
+    """
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(message=message, processed=processed, skipped=skipped, counts=counts)
+    flash(message, category)
+    return redirect(redirect_url)
@@ -0,0 +1,371 @@
+"""
+Batch certificate generation for a completed conference.
+
+Eligible roles (all approved):
+
+* participants -> participant certificate;
+* authors whose paper was accepted -> author certificate (with the paper title);
+* reviewers with at least one submitted review -> reviewer certificate.
+
+Roles that already hold a certificate of that type are skipped, which makes a run
+resumable: it can be interrupted (or capped with `limit`) and simply started again.
+Work is done CERTIFICATE_BATCH_SIZE roles at a time on a process pool, and each
+batch ends with one executemany INSERT of Certificate rows and a commit. Files are
+written atomically to deterministic paths, so a crash between writing a file and
+committing its row only means the file is rewritten on the next run.
+
+Two render modes (CERTIFICATE_RENDER_MODE):
+
+* "stamp" (default): the conference's page is laid out once per certificate
+  type by the configured PDF engine (PDF_ENGINE) with the recipient frame left
+  blank, and each certificate is that page plus a few text operators for the
+  name, university, paper title and number (see CertificateStamper).
+  `flask benchmark-certificates` compares the two modes.
+* "html": every certificate is a full xhtml2pdf render of the template.
+"""
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from flask import current_app, render_template
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import cm
+from sqlalchemy import and_, exists, insert, null, select, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import (
+    Certificate, CertificateType, Conference, ConferenceRole, Paper, PaperStatus, Review, User, UserRole,
+    utc_now_naive
+)
+from utils.files import write_atomic
+from utils.pdf_engines import generate_pdf_from_html, get_pdf_engine
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_RENDER_MODE = "stamp"
+RENDER_MODES = ("stamp", "html")
+MAX_REPORTED_ERRORS = 100
+CERTIFICATE_DIR = "certificates"
+
+PAGE_SIZE = landscape(A4)
+# The recipient @frame of certificates/certificate.html (left 2cm, top 7.6cm, 25.7cm x 6cm),
+# as reportlab (x, y, width, height) measured from the bottom-left corner
+RECIPIENT_FRAME = (2 * cm, PAGE_SIZE[1] - 7.6 * cm - 6 * cm, 25.7 * cm, 6 * cm)
+
+# Per-field text style: (font, size, leading, RGB colour), matching the template's CSS
+STAMP_STYLES = {
+    "name": ("Helvetica-Bold", 28, 34, (0.122, 0.161, 0.216)),
+    "university": ("Helvetica", 14, 18, (0.42, 0.447, 0.502)),
+    "detail": ("Helvetica", 13, 19, (0.122, 0.161, 0.216)),
+    "number": ("Helvetica", 9, 12, (0.42, 0.447, 0.502)),
+}
+_STAMP_FONTS = {"Helvetica": "/StampRegular", "Helvetica-Bold": "/StampBold"}
+
+
+@dataclass
+class CertificateReport:
+    # Eligible roles without a certificate when the run started
+    pending: int = 0
+    issued: int = 0
+    failed: int = 0
+    # (role id, message); capped at MAX_REPORTED_ERRORS
+    errors: list = field(default_factory=list)
+
+    @property
+    def remaining(self):
+        """Certificates still missing after this run (failed ones are retried next time)."""
+        return self.pending - self.issued
+
+    def add_error(self, role_id, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((role_id, message))
+
+
+def uploads_root():
+    return os.path.join(current_app.root_path, "uploads")
+
+
+def certificate_path(certificate):
+    """Absolute path of an issued certificate's PDF."""
+    return os.path.join(uploads_root(), certificate.file_path)
+
+
+def _not_issued(certificate_type):
+    return ~exists().where(
+        Certificate.role_id == ConferenceRole.id, Certificate.certificate_type == certificate_type
+    )
+
+
+def pending_certificates(conf_id):
+    """
+    (role_id, certificate_type, name, university, paper_title) for every eligible role
+    without its certificate yet, ordered by role.
+    """
+    approved = and_(ConferenceRole.conference_id == conf_id, ConferenceRole.status == 1)
+    base = select(ConferenceRole.id, User.name, User.university_name).join(
+        User, User.user_id == ConferenceRole.user_id
+    )
+
+    participants = base.add_columns(null()).where(
+        approved, ConferenceRole.role == UserRole.participant, _not_issued(CertificateType.participant)
+    )
+    authors = base.add_columns(Paper.title).join(Paper, Paper.author_role_id == ConferenceRole.id).where(
+        approved, ConferenceRole.role == UserRole.author, Paper.status == PaperStatus.accepted,
+        _not_issued(CertificateType.author)
+    )
+    reviewers = base.add_columns(null()).where(
+        approved, ConferenceRole.role == UserRole.reviewer, _not_issued(CertificateType.reviewer),
+        exists().where(Review.reviewer_role_id == ConferenceRole.id, Review.submitted_at.isnot(None))
+    )
+
+    pending = []
+    for certificate_type, statement in ((CertificateType.participant, participants),
+                                        (CertificateType.author, authors),
+                                        (CertificateType.reviewer, reviewers)):
+        for role_id, name, university, paper_title in db.session.execute(statement):
+            pending.append((role_id, certificate_type, name, university, paper_title))
+    pending.sort(key=lambda job: job[0])
+    return pending
+
+
+def render_certificate_html(conference, certificate_type, role_id=None, name=None, university=None,
+                            paper_title=None, blank=False):
+    return render_template(
+        "certificates/certificate.html", conference=conference, certificate_type=certificate_type.value,
+        role_id=role_id, name=name, university=university, paper_title=paper_title, blank=blank
+    )
+
+
+def render_certificate_base(conference, certificate_type):
+    """The conference's certificate page for one type, recipient frame left blank (PDF bytes)."""
+    return get_pdf_engine().certificate(conference, certificate_type, blank=True)
+
+
+def _pdf_text(text):
+    # The standard fonts are WinAnsi encoded; characters outside it are replaced
+    data = text.encode("cp1252", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def recipient_lines(conference_id, role_id, certificate_type, name, university, paper_title):
+    """(style, text) lines of the recipient frame, in the order the template lays them out."""
+    lines = [("name", name)]
+    if university:
+        lines.append(("university", university))
+    if paper_title:
+        lines.append(("detail", f"presented the paper \u201c{paper_title}\u201d"))
+    lines.append(("number", f"Certificate no. {conference_id}-{role_id}-{certificate_type.value}"))
+    return lines
+
+
+class CertificateStamper:
+    """
+    A base certificate page prepared once for repeated filling. The page gets two
+    standard fonts and one extra content stream; each stamp() only rewrites that
+    stream (centered text operators, wrapped to the recipient frame) and serialises
+    the document, so nothing of the base page is parsed or laid out again.
+    """
+
+    def __init__(self, base_pdf):
+        from pypdf import PdfReader, PdfWriter
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+        self._writer = PdfWriter(clone_from=PdfReader(io.BytesIO(base_pdf)))
+        page = self._writer.pages[0]
+
+        resources = page[NameObject("/Resources")].get_object()
+        if "/Font" not in resources:
+            resources[NameObject("/Font")] = DictionaryObject()
+        fonts = resources["/Font"].get_object()
+        for font_name, resource_name in _STAMP_FONTS.items():
+            fonts[NameObject(resource_name)] = DictionaryObject({
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject(f"/{font_name}"),
+                NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+            })
+
+        # q <base content> Q <stamp>: the base page cannot leak graphics state into the stamp.
+        # pypdf has no public way to add an indirect object (_add_object): requirements.txt pins it.
+        opening, self._stamp = DecodedStreamObject(), DecodedStreamObject()
+        opening.set_data(b"q\n")
+        contents = page.get("/Contents")
+        base_streams = list(contents.get_object()) if isinstance(contents.get_object(), ArrayObject) else [contents]
+        page[NameObject("/Contents")] = ArrayObject(
+            [self._writer._add_object(opening)] + base_streams + [self._writer._add_object(self._stamp)]
+        )
+
+    def _operators(self, lines):
+        from reportlab.lib.utils import simpleSplit
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        x, y, width, height = RECIPIENT_FRAME
+        top = y + height
+        operators = [b"\nQ\nBT"]
+        for style, text in lines:
+            font, size, leading, (red, green, blue) = STAMP_STYLES[style]
+            operators.append(f"{red} {green} {blue} rg {_STAMP_FONTS[font]} {size} Tf".encode())
+            for line in simpleSplit(text, font, size, width):
+                # Text vertically centered in its line box (Helvetica's ascent is ~0.75em)
+                baseline = top - (leading - size) / 2 - size * 0.75
+                left = x + (width - stringWidth(line, font, size)) / 2
+                operators.append(b"1 0 0 1 %.2f %.2f Tm %s Tj" % (left, baseline, _pdf_text(line)))
+                top -= leading
+        operators.append(b"ET\n")
+        return b"\n".join(operators)
+
+    def stamp(self, conference_id, role_id, certificate_type, name, university=None, paper_title=None):
+        """PDF bytes of the base page with this recipient's fields filled in."""
+        self._stamp.set_data(self._operators(
+            recipient_lines(conference_id, role_id, certificate_type, name, university, paper_title)
+        ))
+        output = io.BytesIO()
+        self._writer.write(output)
+        return output.getvalue()
+
+
+def _write_pdf(job):
+    """Process pool worker ("html" mode): converts one certificate's HTML and writes it."""
+    html, path = job
+    try:
+        write_atomic(path, generate_pdf_from_html(html).getbuffer())
+        return None
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+
+
+# Stampers of the current run, built once per worker process by _init_stamp_worker
+_stampers = {}
+
+
+def _init_stamp_worker(bases):
+    _stampers.clear()
+    for certificate_type, pdf in bases.items():
+        _stampers[certificate_type] = CertificateStamper(pdf)
+
+
+def _stamp_pdf(job):
+    """Process pool worker ("stamp" mode): stamps one certificate onto its base page and writes it."""
+    fields, path = job
+    try:
+        write_atomic(path, _stampers[fields["certificate_type"]].stamp(**fields))
+        return None
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+
+
+def _insert_certificates(rows):
+    for attempt in range(2):
+        try:
+            db.session.execute(insert(Certificate), rows)
+            db.session.commit()
+            return len(rows)
+        except IntegrityError:
+            # A concurrent run issued some of these since the lookup: keep only the missing ones
+            db.session.rollback()
+            if attempt:
+                raise
+            issued = set(db.session.execute(
+                select(Certificate.role_id, Certificate.certificate_type).where(
+                    tuple_(Certificate.role_id, Certificate.certificate_type).in_(
+                        [(row["role_id"], row["certificate_type"]) for row in rows]
+                    )
+                )
+            ).all())
+            rows = [row for row in rows if (row["role_id"], row["certificate_type"]) not in issued]
+            if not rows:
+                return 0
+
+
+def generate_certificates(conf_id, limit=None, processes=None, on_progress=None, allow_incomplete=False):
+    """
+    Issues the missing certificates of a conference, at most `limit` of them.
+    `on_progress(report)` is called after every batch. Returns the CertificateReport;
+    raises ValueError if the conference has not ended (unless allow_incomplete).
+    """
+    config = current_app.config
+    batch_size = config.get("CERTIFICATE_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    processes = processes or config.get("CERTIFICATE_PROCESSES") or os.cpu_count()
+
+    conference = db.session.get(Conference, conf_id)
+    if conference is None:
+        raise ValueError(f"Conference {conf_id} does not exist.")
+    if conference.status != "completed" and not allow_incomplete:
+        raise ValueError("Certificates can only be issued once the conference has ended.")
+
+    pending = pending_certificates(conf_id)
+    report = CertificateReport(pending=len(pending))
+    if limit is not None:
+        pending = pending[:limit]
+    if not pending:
+        return report
+
+    relative_dir = os.path.join(CERTIFICATE_DIR, str(conf_id))
+    os.makedirs(os.path.join(uploads_root(), relative_dir), exist_ok=True)
+
+    stamp = config.get("CERTIFICATE_RENDER_MODE", DEFAULT_RENDER_MODE) == "stamp"
+    pool_options = {}
+    if stamp:
+        # Laid out once per type here; workers receive the pages once, not with every job
+        bases = {certificate_type: render_certificate_base(conference, certificate_type)
+                 for certificate_type in {job[1] for job in pending}}
+        pool_options = dict(initializer=_init_stamp_worker, initargs=(bases,))
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(pending)), **pool_options) as pool:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            jobs = []
+            for role_id, certificate_type, name, university, paper_title in batch:
+                path = os.path.join(uploads_root(), relative_dir, f"{role_id}_{certificate_type.value}.pdf")
+                if stamp:
+                    jobs.append((dict(conference_id=conf_id, role_id=role_id, certificate_type=certificate_type,
+                                      name=name, university=university, paper_title=paper_title), path))
+                else:
+                    jobs.append((render_certificate_html(conference, certificate_type, role_id, name, university,
+                                                         paper_title), path))
+
+            errors = pool.map(_stamp_pdf if stamp else _write_pdf, jobs,
+                              chunksize=max(1, len(jobs) // (processes * 4)))
+
+            now = utc_now_naive()
+            rows = []
+            for (role_id, certificate_type, *_), (_, path), error in zip(batch, jobs, errors):
+                if error:
+                    report.add_error(role_id, error)
+                    continue
+                rows.append(dict(role_id=role_id, certificate_type=certificate_type,
+                                 file_path=os.path.relpath(path, uploads_root()), issued_at=now))
+
+            if rows:
+                report.issued += _insert_certificates(rows)
+            if on_progress:
+                on_progress(report)
+
+    return report
+
+
+def benchmark_render_modes(conference, count=50):
+    """
+    Average seconds per author certificate in each render mode, rendered in-process
+    with no pool and no file writes. The stamp figure includes laying out the base page.
+    """
+    certificate_type = CertificateType.author
+    recipients = [(role_id, f"Benchmark Recipient {role_id}", "Benchmark University", f"Benchmark paper {role_id}")
+                  for role_id in range(1, count + 1)]
+
+    start = time.perf_counter()
+    for role_id, name, university, paper_title in recipients:
+        generate_pdf_from_html(render_certificate_html(conference, certificate_type, role_id, name, university,
+                                                       paper_title))
+    html_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stamper = CertificateStamper(render_certificate_base(conference, certificate_type))
+    for role_id, name, university, paper_title in recipients:
+        stamper.stamp(conference.conference_id, role_id, certificate_type, name, university, paper_title)
+    stamp_seconds = time.perf_counter() - start
+
+    return {"html": html_seconds / count, "stamp": stamp_seconds / count}
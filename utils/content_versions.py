@@ -0,0 +1,114 @@
+"""
+Per-conference version of what the public pages show.
+
+Conference.content_version is bumped, in the same transaction, whenever an ORM flush
+touches something visible on the conference's public pages: the conference itself,
+its tracks, sessions, session assignments, papers, roles and registrations, or the
+name of a user holding one of its roles. Together with the conference's date-derived
+status (which changes without any write) it forms the version tag that published
+copies of the pages are compared against (see utils/static_site.py).
+
+Code that keeps such copies registers a callback with on_content_change(app, ...);
+it is called after each commit made under that app with the ids of the conferences
+that changed (including deleted ones). Callbacks run on the committing thread and
+must not use the session.
+
+Bulk UPDATE/DELETE statements (session.execute(update(...)), Query.update()) bypass
+the flush hook: code issuing one against public content must call
+bump_conference_versions() with the affected conference ids in the same transaction.
+"""
+import hashlib
+from itertools import chain
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import load_only
+
+from extensions import db
+from models import Conference, ConferenceRole, Paper, Registration, Session, SessionPaper, Track, User
+
+_INFO_KEY = "changed_conferences"
+_PUBLIC_MODELS = (Conference, Track, Session, Paper, Registration, ConferenceRole)
+_LISTENERS_KEY = "content_change_listeners"
+
+
+def _bump_versions(session, flush_context):
+    conference_ids, session_ids, user_ids = set(), set(), set()
+    modified = (obj for obj in session.dirty if session.is_modified(obj, include_collections=False))
+    for obj in chain(session.new, session.deleted, modified):
+        if isinstance(obj, _PUBLIC_MODELS):
+            conference_ids.add(obj.conference_id)
+        elif isinstance(obj, SessionPaper):
+            session_ids.add(obj.session_id)
+        elif isinstance(obj, User) and obj not in session.new and inspect(obj).attrs.name.history.has_changes():
+            user_ids.add(obj.user_id)
+
+    connection = session.connection()
+    if session_ids:
+        conference_ids.update(connection.execute(
+            select(Session.conference_id).where(Session.session_id.in_(session_ids))
+        ).scalars())
+    if user_ids:
+        conference_ids.update(connection.execute(
+            select(ConferenceRole.conference_id).where(ConferenceRole.user_id.in_(user_ids))
+        ).scalars())
+    bump_conference_versions(conference_ids, session)
+
+
+def bump_conference_versions(conference_ids, session=None):
+    """
+    Bumps the content version of the conferences in the session's transaction and
+    notifies on_content_change() listeners once it commits. Flushes do this
+    themselves; bulk UPDATE/DELETE statements on public content must call it.
+    """
+    conference_ids = set(conference_ids)
+    conference_ids.discard(None)
+    if not conference_ids:
+        return
+    session = session or db.session()
+    # Same connection and transaction as the writes, so the bump commits or rolls back with them
+    session.connection().execute(
+        update(Conference).where(Conference.conference_id.in_(conference_ids))
+        .values(content_version=Conference.content_version + 1)
+    )
+    session.info.setdefault(_INFO_KEY, set()).update(conference_ids)
+
+
+def _notify(session):
+    changed = session.info.pop(_INFO_KEY, None)
+    if changed and has_app_context():
+        for callback in current_app.extensions.get(_LISTENERS_KEY, ()):
+            callback(changed)
+
+
+def _discard(session, previous_transaction):
+    session.info.pop(_INFO_KEY, None)
+
+
+def on_content_change(app, callback):
+    """Calls `callback(conference_ids)` after every commit under `app` that changed public conference content."""
+    app.extensions.setdefault(_LISTENERS_KEY, []).append(callback)
+
+
+def init_content_versions(app):
+    """Installs the version-bumping flush hook and the post-commit notifications."""
+    for name, listener in (("after_flush", _bump_versions), ("after_commit", _notify),
+                           ("after_soft_rollback", _discard)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def conference_versions(conference_ids=None):
+    """{conference_id: version tag}; the tag changes with content_version and with the conference's status."""
+    query = Conference.query.options(
+        load_only(Conference.conference_id, Conference.content_version, Conference.start_date, Conference.end_date)
+    )
+    if conference_ids is not None:
+        query = query.filter(Conference.conference_id.in_(conference_ids))
+    return {conference.conference_id: f"{conference.content_version}-{conference.status}" for conference in query}
+
+
+def listing_version(versions):
+    """Version tag of pages listing every conference, from conference_versions()."""
+    payload = ";".join(f"{conf_id}:{tag}" for conf_id, tag in sorted(versions.items()))
+    return hashlib.sha256(payload.encode("ascii")).hexdigest()[:16]
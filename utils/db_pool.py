@@ -0,0 +1,129 @@
+"""
+Database connection pool settings and usage metrics.
+
+configure_db_pool() turns the DB_* settings into SQLAlchemy engine options for the
+server databases (SQLite keeps SQLAlchemy's defaults). Every process (gunicorn
+worker) has its own pool:
+
+* DB_POOL_SIZE connections are kept open and up to DB_MAX_OVERFLOW more are opened
+  under load; past that a request waits DB_POOL_TIMEOUT seconds for a free one and
+  then fails, instead of opening connections without bound. The server must accept
+  workers x (size + overflow) connections;
+* DB_POOL_RECYCLE replaces connections older than that many seconds, before a
+  proxy or firewall drops them silently;
+* DB_POOL_PRE_PING tests each connection as it is checked out and reconnects if the
+  test fails, so connections broken by a database failover or restart are replaced
+  without failing the request;
+* DB_STATEMENT_TIMEOUT_MS (PostgreSQL) cancels runaway statements server-side and
+  DB_CONNECT_TIMEOUT bounds connection attempts, so neither holds a slot forever.
+
+Explicit SQLALCHEMY_ENGINE_OPTIONS take precedence over the DB_* settings.
+
+init_db_pool_metrics() counts pool events per app. pool_metrics() combines them with
+the pools' current state for the /admin/db-pool page; /readyz checks out a pooled
+connection and runs a trivial query (routes/health.py).
+"""
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from extensions import db
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 30
+DEFAULT_POOL_RECYCLE = 1800
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+DEFAULT_CONNECT_TIMEOUT = 10
+
+
+def engine_options(config):
+    """SQLAlchemy engine options for the configured database, from the DB_* settings."""
+    backend = make_url(config["SQLALCHEMY_DATABASE_URI"]).get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    options = {
+        "pool_size": config.get("DB_POOL_SIZE", DEFAULT_POOL_SIZE),
+        "max_overflow": config.get("DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW),
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", DEFAULT_POOL_RECYCLE),
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+    }
+    if backend == "postgresql":
+        connect_args = {"connect_timeout": config.get("DB_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)}
+        statement_timeout = config.get("DB_STATEMENT_TIMEOUT_MS", DEFAULT_STATEMENT_TIMEOUT_MS)
+        if statement_timeout:
+            connect_args["options"] = f"-c statement_timeout={int(statement_timeout)}"
+        options["connect_args"] = connect_args
+    return options
+
+
+def configure_db_pool(app):
+    """Sets SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings; must run before db.init_app()."""
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config), **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    }
+
+
+class PoolMetrics:
+    """Event counters of an engine's connection pool, plus its high-water mark of checked-out connections."""
+
+    COUNTERS = ("connects", "checkouts", "invalidations")
+
+    def __init__(self, engine):
+        # engine.pool is replaced by dispose(); the replacement keeps these listeners
+        self.engine = engine
+        pool = engine.pool
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.COUNTERS, 0)
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        event.listen(pool, "connect", lambda *args: self._count("connects"))
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        # Includes connections the pre-ping found broken
+        event.listen(pool, "invalidate", lambda *args: self._count("invalidations"))
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self._counts["checkouts"] += 1
+            self._checked_out += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._checked_out = max(self._checked_out - 1, 0)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = dict(self._counts, checked_out=self._checked_out, peak_checked_out=self._peak_checked_out)
+        pool = self.engine.pool
+        metrics["pool"] = type(pool).__name__
+        # QueuePool reports its configuration and current state; other pool classes report less
+        for name, method in (("size", "size"), ("idle", "checkedin")):
+            if hasattr(pool, method):
+                metrics[name] = getattr(pool, method)()
+        if hasattr(pool, "overflow"):
+            # Negative while fewer than `size` connections have been opened
+            metrics["overflow"] = max(pool.overflow(), 0)
+            metrics["max_overflow"] = pool._max_overflow
+        return metrics
+
+
+def init_db_pool_metrics(app):
+    """Starts counting pool events of every engine of the app (call after db.init_app())."""
+    with app.app_context():
+        app.extensions["db_pool_metrics"] = {
+            bind_key or "default": PoolMetrics(engine) for bind_key, engine in db.engines.items()
+        }
+
+
+def pool_metrics(app):
+    """{bind name: metrics dict} for this process."""
+    return {name: metrics.snapshot() for name, metrics in app.extensions.get("db_pool_metrics", {}).items()}
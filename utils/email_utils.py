@@ -0,0 +1,74 @@
+"""
+Shared SendGrid helpers.
+
+send_email() sends synchronously and reports success; enqueue_email() hands the
+message to a small background outbox so batch jobs (reminder digests, invitations)
+don't block on the SendGrid API one message at a time.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+DEFAULT_OUTBOX_WORKERS = 4
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def send_email(to_email, subject, plain_text_content=None, html_content=None,
+               sender_email=None, sender_name="UniConfMgr"):
+    """Sends one email through SendGrid. Returns True if the API accepted it."""
+    if sender_email is None:
+        sender_email = current_app.config['MAIL_USERNAME']  # Verified SendGrid Sender
+
+    # Imported on first send: most workers never send mail
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
+
+    message = Mail(
+        from_email=(sender_email, sender_name),
+        to_emails=to_email,
+        subject=subject,
+        plain_text_content=plain_text_content,
+        html_content=html_content
+    )
+
+    try:
+        sg = SendGridAPIClient(os.environ.get('SENDGRID_API_KEY'))
+        response = sg.send(message)
+
+        if 200 <= response.status_code < 300:
+            return True
+        print(f"SENDGRID API FAILED: Status {response.status_code}")
+        return False
+
+    except Exception as e:
+        print(f"SENDGRID API ERROR: {e}")
+        return False
+
+
+def _get_outbox():
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            workers = current_app.config.get('MAIL_OUTBOX_WORKERS', DEFAULT_OUTBOX_WORKERS)
+            _outbox = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mail-outbox")
+        return _outbox
+
+
+def enqueue_email(to_email, subject, plain_text_content=None, html_content=None, sender_name="UniConfMgr"):
+    """
+    Queues an email on the background outbox and returns a Future that resolves
+    to send_email()'s result. Must be called inside an app context; the sender is
+    resolved here because outbox threads have no app context of their own.
+    """
+    sender_email = current_app.config['MAIL_USERNAME']
+    return _get_outbox().submit(
+        send_email, to_email, subject,
+        plain_text_content=plain_text_content,
+        html_content=html_content,
+        sender_email=sender_email,
+        sender_name=sender_name
+    )
@@ -0,0 +1,242 @@
+"""
+Streaming per-conference exports (registrations, authors, reviewers, papers) as CSV or XLSX.
+
+Each dataset is one column-only SELECT executed with yield_per, which on PostgreSQL
+uses a server-side cursor, so rows arrive EXPORT_BATCH_SIZE at a time and no ORM
+objects are built. The writers are generators yielding encoded chunks, meant for
+a streamed Response: memory stays flat and the first bytes go out immediately,
+however many rows the conference has.
+
+XLSX is written without a spreadsheet library: the sheet XML is streamed into a
+zip archive on an unseekable sink (zipfile then uses data descriptors), and the
+compressed bytes are handed on as they are produced.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from xml.sax.saxutils import escape
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from extensions import db
+from models import ConferenceRole, Paper, Registration, Review, Track, User, UserRole
+
+DEFAULT_BATCH_SIZE = 1000
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _registrations(conf_id):
+    return select(
+        Registration.registration_id, User.name, User.email, User.university_name, ConferenceRole.role,
+        Registration.registration_date, Registration.fee_amount, Registration.payment_status
+    ).join(ConferenceRole, ConferenceRole.id == Registration.role_id).join(
+        User, User.user_id == ConferenceRole.user_id
+    ).where(Registration.conference_id == conf_id).order_by(Registration.registration_id)
+
+
+def _authors(conf_id):
+    return select(
+        User.name, User.email, User.university_name, User.department, User.contact_no, Paper.title, Paper.status
+    ).select_from(ConferenceRole).join(User, User.user_id == ConferenceRole.user_id).outerjoin(
+        Paper, Paper.author_role_id == ConferenceRole.id
+    ).where(
+        ConferenceRole.conference_id == conf_id, ConferenceRole.role == UserRole.author, ConferenceRole.status == 1
+    ).order_by(ConferenceRole.id)
+
+
+def _reviewers(conf_id):
+    return select(
+        User.name, User.email, User.university_name, ConferenceRole.expertise,
+        func.count(Review.review_id), func.count(Review.submitted_at)
+    ).select_from(ConferenceRole).join(User, User.user_id == ConferenceRole.user_id).outerjoin(
+        Review, Review.reviewer_role_id == ConferenceRole.id
+    ).where(
+        ConferenceRole.conference_id == conf_id, ConferenceRole.role == UserRole.reviewer, ConferenceRole.status == 1
+    ).group_by(
+        ConferenceRole.id, User.name, User.email, User.university_name, ConferenceRole.expertise
+    ).order_by(ConferenceRole.id)
+
+
+def _papers(conf_id):
+    return select(
+        Paper.paper_id, Paper.title, Track.name, User.name, User.email, Paper.status, Paper.created_at,
+        func.count(Review.review_id), func.count(Review.submitted_at), func.avg(Review.score)
+    ).join(ConferenceRole, ConferenceRole.id == Paper.author_role_id).join(
+        User, User.user_id == ConferenceRole.user_id
+    ).outerjoin(Track, Track.track_id == Paper.track_id).outerjoin(
+        Review, Review.paper_id == Paper.paper_id
+    ).where(Paper.conference_id == conf_id).group_by(
+        Paper.paper_id, Paper.title, Track.name, User.name, User.email, Paper.status, Paper.created_at
+    ).order_by(Paper.paper_id)
+
+
+# dataset -> (header row, statement builder taking the conference id)
+DATASETS = {
+    "registrations": (
+        ["Registration ID", "Name", "Email", "University", "Role", "Registered At", "Fee", "Payment Status"],
+        _registrations
+    ),
+    "authors": (
+        ["Name", "Email", "University", "Department", "Contact No", "Paper Title", "Paper Status"],
+        _authors
+    ),
+    "reviewers": (
+        ["Name", "Email", "University", "Expertise", "Reviews Assigned", "Reviews Submitted"],
+        _reviewers
+    ),
+    "papers": (
+        ["Paper ID", "Title", "Track", "Author", "Author Email", "Status", "Submitted At",
+         "Reviews Assigned", "Reviews Submitted", "Average Score"],
+        _papers
+    ),
+}
+
+
+def _cell(value):
+    """Plain Python value for a result column: enums by value, dates as text."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def stream_rows(dataset, conf_id):
+    """Yields the dataset's rows for one conference as tuples of plain values."""
+    batch_size = current_app.config.get("EXPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    statement = DATASETS[dataset][1](conf_id).execution_options(yield_per=batch_size)
+    for row in db.session.execute(statement):
+        yield tuple(_cell(value) for value in row)
+
+
+def _csv_text(value):
+    # Spreadsheet apps run cells starting with these as formulas; user-entered text is defused
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+def csv_stream(headers, rows, flush_every=500):
+    """CSV bytes (UTF-8 with BOM, so Excel detects the encoding), yielded every `flush_every` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_csv_text("" if value is None else value) for value in row])
+        if count % flush_every == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object collecting what zipfile writes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_stream(sheet_name, headers, rows, flush_every=500):
+    """A single-sheet XLSX workbook, yielded as compressed chunks while the rows are read."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            parts = ["<row>" + "".join(_xlsx_cell(value) for value in headers) + "</row>"]
+            for count, row in enumerate(rows, start=1):
+                parts.append("<row>" + "".join(_xlsx_cell(value) for value in row) + "</row>")
+                if count % flush_every == 0:
+                    sheet.write("".join(parts).encode("utf-8"))
+                    parts.clear()
+                    yield sink.drain()
+            parts.append("</sheetData></worksheet>")
+            sheet.write("".join(parts).encode("utf-8"))
+    yield sink.drain()
+
+
+def export_stream(dataset, conf_id, fmt):
+    """Generator of the encoded export; `dataset` must be in DATASETS and `fmt` in FORMATS."""
+    headers = DATASETS[dataset][0]
+    rows = stream_rows(dataset, conf_id)
+    if fmt == "xlsx":
+        return xlsx_stream(dataset.title(), headers, rows)
+    return csv_stream(headers, rows)
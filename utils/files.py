@@ -0,0 +1,39 @@
+"""
+Atomic file writes for the on-disk caches, exports and job files.
+
+Data goes to a uniquely named temporary file (tempfile.mkstemp) in the target's
+directory and is renamed over the target, so readers only ever see a complete
+file and concurrent writers, threads or processes, never share a temporary file:
+the last rename wins.
+"""
+import contextlib
+import os
+import tempfile
+
+# mkstemp creates files readable by the owner only; cached pages are served by the web server
+FILE_MODE = 0o644
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="wb", encoding=None):
+    """
+    Yields a temporary file that replaces `path` when the block exits normally and
+    is removed if it raises. The directory must exist.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.",
+                                     suffix=".part")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            os.chmod(temp_path, FILE_MODE)
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+
+
+def write_atomic(path, data):
+    """Writes bytes (or bytes-like) `data` to `path` atomically."""
+    with atomic_open(path) as f:
+        f.write(data)
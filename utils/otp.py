@@ -0,0 +1,104 @@
+"""
+One-time codes for email-verified registration.
+
+A registration is parked in otp_verifications until the user types the 6-digit
+code we emailed them; only then is the User row created. Codes are stored as an
+HMAC (keyed with SECRET_KEY) and compared in constant time, each pending
+registration allows OTP_MAX_ATTEMPTS guesses, and expired rows are removed by
+`flask purge-otps` in bounded batches.
+"""
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from extensions import db
+from models import OTPVerification, utc_now_naive
+
+DEFAULT_TTL_MINUTES = 10
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_PURGE_BATCH_SIZE = 1000
+
+# check_otp() outcomes
+OTP_OK = "ok"
+OTP_INVALID = "invalid"
+OTP_EXPIRED = "expired"
+OTP_LOCKED = "locked"
+
+
+def _digest(code):
+    key = current_app.config["SECRET_KEY"].encode()
+    return hmac.new(key, code.encode(), hashlib.sha256).hexdigest()
+
+
+def create_pending_registration(email, full_name, password_hash, **profile):
+    """
+    Replaces any pending registration for `email` with a fresh one and returns the
+    plain code to email to the user. The caller commits.
+    """
+    OTPVerification.query.filter_by(email=email).delete(synchronize_session=False)
+
+    code = f"{secrets.randbelow(10 ** 6):06d}"
+    ttl = current_app.config.get("OTP_TTL_MINUTES", DEFAULT_TTL_MINUTES)
+    db.session.add(OTPVerification(
+        email=email,
+        otp_hash=_digest(code),
+        full_name=full_name,
+        password_hash=password_hash,
+        expires_at=utc_now_naive() + timedelta(minutes=ttl),
+        **profile
+    ))
+    return code
+
+
+def check_otp(email, code):
+    """
+    Checks `code` against the live pending registration for `email`.
+    Returns (outcome, pending_row); pending_row is only set for OTP_OK.
+    """
+    pending = OTPVerification.query.filter(
+        OTPVerification.email == email,
+        OTPVerification.expires_at > utc_now_naive()
+    ).order_by(OTPVerification.id.desc()).first()
+    if pending is None:
+        return OTP_EXPIRED, None
+
+    max_attempts = current_app.config.get("OTP_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    attempts, otp_hash = pending.attempts, pending.otp_hash
+
+    # Reserve the attempt with a guarded UPDATE before comparing, so concurrent
+    # guesses cannot get past the limit between read and write
+    reserved = OTPVerification.query.filter(
+        OTPVerification.id == pending.id,
+        OTPVerification.attempts < max_attempts
+    ).update({OTPVerification.attempts: OTPVerification.attempts + 1}, synchronize_session=False)
+    db.session.commit()
+    if not reserved:
+        return OTP_LOCKED, None
+
+    if hmac.compare_digest(otp_hash, _digest((code or "").strip())):
+        return OTP_OK, pending
+    return (OTP_LOCKED if attempts + 1 >= max_attempts else OTP_INVALID), None
+
+
+def purge_expired_otps(now=None, batch_size=None):
+    """
+    Deletes expired pending registrations, batch_size rows per transaction so a
+    large backlog never holds a long lock. Returns the number of rows deleted.
+    """
+    now = now or utc_now_naive()
+    batch_size = batch_size or current_app.config.get("OTP_PURGE_BATCH_SIZE", DEFAULT_PURGE_BATCH_SIZE)
+
+    total = 0
+    while True:
+        batch = select(OTPVerification.id).where(OTPVerification.expires_at <= now).limit(batch_size)
+        deleted = db.session.execute(
+            delete(OTPVerification).where(OTPVerification.id.in_(batch.scalar_subquery()))
+        ).rowcount
+        db.session.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,214 @@
+"""
+HTTP caching of the public conference pages for anonymous visitors.
+
+Views wrapped with cache_public_page() get, for anonymous GET/HEAD requests:
+
+* an ETag built from the content version of what the page shows (the conference's
+  tag from utils/content_versions.py, or the listing tag for the explore page) and
+  a fingerprint of the templates, so it changes on data edits and on deploys;
+* 304 Not Modified when If-None-Match matches, without running the view;
+* Cache-Control: public, max-age=PAGE_CACHE_MAX_AGE and Vary: Cookie;
+* the rendered body served from a cache keyed by that version, so a hit costs one
+  small version query instead of the view's queries and template render.
+
+Logged-in users, requests with pending flash messages and non-200 responses are
+passed through untouched. Cached bodies are dropped after every commit that
+changes a conference (on_content_change); stale keys could never match anyway.
+The ETags are only as good as the versions: bulk writes to public content must
+call bump_conference_versions() (see utils/content_versions.py).
+
+The body cache is chosen by PAGE_CACHE_URL:
+
+    memory://            in-process LRU bounded by entries and bytes (default; per worker)
+    redis://host:6379/0  shared across workers (needs the optional `redis` package)
+
+Any object with the same get()/set()/invalidate() methods can be installed instead
+via app.extensions["page_cache_backend"], e.g. a local stand-in for the shared store.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from utils.content_versions import conference_versions, listing_version, on_content_change
+
+LISTING_TAG = "listing"
+
+
+def conference_tag(conf_id):
+    return f"conference:{conf_id}"
+
+
+class MemoryBackend:
+    """In-process LRU of (mimetype, body), bounded by entry count and total body bytes."""
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (mimetype, body, tags)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[:2]
+
+    def set(self, key, mimetype, body, tags):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (mimetype, body, tuple(tags))
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if tags.intersection(entry[2])]:
+                self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
+class RedisBackend:
+    """Bodies shared across workers; each tag is a set of the keys to drop with it."""
+
+    def __init__(self, client, prefix="pagecache:", ttl=86400):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        mimetype, body = self.client.hmget(self.prefix + key, "mimetype", "body")
+        if body is None:
+            return None
+        return mimetype.decode(), body
+
+    def set(self, key, mimetype, body, tags):
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping={"mimetype": mimetype, "body": body})
+        pipe.expire(self.prefix + key, self.ttl)
+        for tag in tags:
+            pipe.sadd(self.prefix + "tag:" + tag, self.prefix + key)
+            pipe.expire(self.prefix + "tag:" + tag, self.ttl)
+        pipe.execute()
+
+    def invalidate(self, tags):
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = self.client.smembers(tag_key)
+            self.client.delete(tag_key, *keys)
+
+
+def _create_backend(config):
+    url = config.get("PAGE_CACHE_URL", "memory://")
+    if url.startswith("memory://"):
+        return MemoryBackend(config.get("PAGE_CACHE_MAX_ENTRIES", 512),
+                             config.get("PAGE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("PAGE_CACHE_URL points to Redis but the 'redis' package is not installed.")
+        return RedisBackend(redis.Redis.from_url(url))
+    raise RuntimeError(f"Unsupported PAGE_CACHE_URL: {url}")
+
+
+def get_backend(app=None):
+    """Returns the app's page cache backend, creating it from config on first use."""
+    app = app or current_app
+    if "page_cache_backend" not in app.extensions:
+        app.extensions["page_cache_backend"] = _create_backend(app.config)
+    return app.extensions["page_cache_backend"]
+
+
+def _template_fingerprint(app):
+    """Hash of the template files' sizes and mtimes: identical across workers of one deploy."""
+    if "page_cache_build" not in app.extensions:
+        digest = hashlib.sha256()
+        folder = os.path.join(app.root_path, app.template_folder or "templates")
+        for root, dirs, files in os.walk(folder):
+            dirs.sort()
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f"{os.path.relpath(os.path.join(root, name), folder)}:{stat.st_size}:"
+                              f"{stat.st_mtime_ns};".encode())
+        app.extensions["page_cache_build"] = digest.hexdigest()[:12]
+    return app.extensions["page_cache_build"]
+
+
+def cache_public_page(conference_arg=None):
+    """
+    Decorator caching a public view for anonymous visitors. `conference_arg` names the
+    view argument holding the conference id; without it the page lists every conference.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if (request.method not in ("GET", "HEAD") or not current_app.config.get("PAGE_CACHE_ENABLED", True)
+                    or session.get("user_id") or session.get("_flashes")):
+                return f(*args, **kwargs)
+
+            if conference_arg:
+                conf_id = kwargs[conference_arg]
+                version = conference_versions([conf_id]).get(conf_id)
+                if version is None:
+                    return f(*args, **kwargs)
+                tags = (conference_tag(conf_id),)
+            else:
+                conf_id, version = "all", listing_version(conference_versions())
+                tags = (LISTING_TAG,)
+
+            etag = f"{request.endpoint}-{conf_id}-{version}-{_template_fingerprint(current_app)}"
+            max_age = current_app.config.get("PAGE_CACHE_MAX_AGE", 60)
+
+            def with_cache_headers(response):
+                response.set_etag(etag)
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+                response.vary.add("Cookie")
+                return response
+
+            if request.if_none_match.contains(etag):
+                return with_cache_headers(make_response("", 304))
+
+            backend = get_backend()
+            key = f"{request.full_path}|{etag}"
+            cached = backend.get(key)
+            if cached is not None:
+                mimetype, body = cached
+                return with_cache_headers(current_app.response_class(body, mimetype=mimetype))
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough or session.get("_flashes"):
+                return response
+            backend.set(key, response.mimetype, response.get_data(), tags)
+            return with_cache_headers(response)
+
+        return decorated_function
+
+    return decorator
+
+
+def init_page_cache(app):
+    """Drops cached bodies of conferences (and the listing) changed by a commit."""
+    if not app.config.get("PAGE_CACHE_ENABLED", True):
+        return
+
+    def invalidate(conference_ids):
+        get_backend(app).invalidate([LISTING_TAG] + [conference_tag(conf_id) for conf_id in conference_ids])
+
+    on_content_change(app, invalidate)
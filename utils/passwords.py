@@ -0,0 +1,111 @@
+"""
+Configurable password hashing.
+
+The algorithm and work factor come from the app config (PASSWORD_HASH_METHOD /
+PASSWORD_SALT_LENGTH), so each environment can pick its own cost. Hashes made
+under an older policy are transparently upgraded on the next successful login.
+
+Hashing and verification run on a small bounded thread pool: at most
+PASSWORD_HASH_WORKERS hashes are computed at once per process, and callers that
+cannot get a slot within PASSWORD_HASH_QUEUE_TIMEOUT seconds get PasswordHashBusy
+instead of piling more CPU work onto an already saturated worker.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_HASH_METHOD = "scrypt"
+DEFAULT_SALT_LENGTH = 16
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_QUEUE_TIMEOUT = 5.0
+# Stored for accounts that have no password yet: not a "method$salt$hash" string, so
+# no password verifies against it. The owner sets one through a reset link.
+UNUSABLE_PASSWORD = "!"
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+_method_prefixes = {}
+
+
+class PasswordHashBusy(Exception):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_QUEUE_TIMEOUT."""
+
+
+def _policy():
+    config = current_app.config
+    return (
+        config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD),
+        config.get("PASSWORD_SALT_LENGTH", DEFAULT_SALT_LENGTH),
+    )
+
+
+def _get_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            workers = current_app.config.get("PASSWORD_HASH_WORKERS", DEFAULT_HASH_WORKERS)
+            max_pending = current_app.config.get("PASSWORD_HASH_MAX_PENDING", DEFAULT_MAX_PENDING)
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+            # Slots = running + queued jobs; beyond that callers wait, then give up
+            _slots = threading.BoundedSemaphore(workers + max_pending)
+        return _pool, _slots
+
+
+def _run_bounded(func, *args):
+    pool, slots = _get_pool()
+    timeout = current_app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)
+    if not slots.acquire(timeout=timeout):
+        raise PasswordHashBusy()
+    try:
+        return pool.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def _method_prefix(method):
+    """
+    The method string Werkzeug actually stores for a configured method, e.g.
+    "scrypt" -> "scrypt:32768:8:1", "pbkdf2" -> "pbkdf2:sha256:1000000".
+    """
+    if method not in _method_prefixes:
+        _method_prefixes[method] = generate_password_hash("", method=method, salt_length=1).split("$", 1)[0]
+    return _method_prefixes[method]
+
+
+def hash_password(password):
+    """Hashes a password with the current policy."""
+    method, salt_length = _policy()
+    return _run_bounded(generate_password_hash, password, method, salt_length)
+
+
+def verify_password(password_hash, password):
+    """Checks a password against a stored hash (any supported method)."""
+    if not password_hash or password is None:
+        return False
+    return _run_bounded(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True if the stored hash was made with a different method, cost or salt length."""
+    method, salt_length = _policy()
+    try:
+        stored_method, salt, _ = password_hash.split("$", 2)
+    except ValueError:
+        return True
+    return stored_method != _method_prefix(method) or len(salt) != salt_length
+
+
+def verify_and_upgrade(user, password):
+    """
+    Verifies the user's password and, if it matches but was hashed under an older
+    policy, replaces user.password_hash with a fresh hash. The caller commits.
+    """
+    if not verify_password(user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+    return True
@@ -0,0 +1,342 @@
+"""
+PDF rendering engines for the programme schedule and certificates.
+
+Views and jobs ask the configured engine (PDF_ENGINE) for a document instead of
+converting HTML themselves:
+
+* "xhtml2pdf" (default): renders the print templates (organiser/schedule_pdf.html,
+  certificates/certificate.html) and converts the HTML, as before;
+* "reportlab": lays the same documents out directly with reportlab's platypus and
+  canvas, skipping HTML and CSS parsing altogether. Output mirrors the templates'
+  structure and styling closely but not pixel for pixel.
+
+Both converters are imported on first use, so workers that never produce a PDF
+don't load them.
+
+A new engine subclasses PdfEngine, implements every document method and is added
+to ENGINES. `flask benchmark-pdf-engines` compares render time and peak Python
+memory of the engines on a synthetic schedule.
+"""
+import io
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import groupby
+from xml.sax.saxutils import escape
+
+from flask import current_app, render_template
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import cm
+
+from models import (
+    Conference, ConferenceRole, Paper, PaperStatus, PaymentStatus, Registration, Session, SessionPaper, Track, User
+)
+
+DEFAULT_ENGINE = "xhtml2pdf"
+
+# pisa writes temporary files relative to the working directory, which is process-wide
+_chdir_lock = threading.Lock()
+
+
+def generate_pdf_from_html(html_content):
+    """Converts an HTML document with xhtml2pdf; returns a BytesIO positioned at 0."""
+    from xhtml2pdf import pisa
+
+    pdf_output = io.BytesIO()
+    with _chdir_lock:
+        cwd_backup = os.getcwd()
+        try:
+            os.chdir(tempfile.gettempdir())
+
+            pisa_status = pisa.CreatePDF(
+                html_content.encode("utf-8", "ignore"),
+                dest=pdf_output
+            )
+
+            if pisa_status.err:
+                raise Exception(f"PDF conversion failed (pisa code {pisa_status.err}).")
+
+            pdf_output.seek(0)
+            return pdf_output
+
+        finally:
+            os.chdir(cwd_backup)
+
+
+def confirmed_papers(session):
+    """Papers of a session that appear on the printed schedule: accepted and with the fee paid."""
+    papers = []
+    for session_paper in session.papers_in_session:
+        paper = session_paper.paper
+        registration = paper.author_role.registration_link
+        if paper.status == PaperStatus.accepted and registration and \
+                registration.payment_status == PaymentStatus.completed:
+            papers.append(paper)
+    return papers
+
+
+class PdfEngine:
+    """Renders the application's PDF documents; every method returns PDF bytes."""
+    name = None
+
+    def schedule(self, conference, sessions_by_date, heading=True, footer=True):
+        """
+        Programme schedule: `sessions_by_date` maps each day to its sessions (with tracks
+        and papers loaded). `heading`/`footer` drop the title block and the closing line,
+        for parts of a schedule rendered separately (see utils/schedule_pdf.py).
+        """
+        raise NotImplementedError
+
+    def certificate(self, conference, certificate_type, role_id=None, name=None, university=None,
+                    paper_title=None, blank=False):
+        """One landscape A4 certificate; with `blank`, the recipient frame is left empty for stamping."""
+        raise NotImplementedError
+
+
+class XhtmlPdfEngine(PdfEngine):
+    name = "xhtml2pdf"
+
+    def schedule(self, conference, sessions_by_date, heading=True, footer=True):
+        html = render_template(
+            "organiser/schedule_pdf.html", conference=conference,
+            all_sessions=[session for sessions in sessions_by_date.values() for session in sessions],
+            sessions_by_date=sessions_by_date, heading=heading, footer=footer
+        )
+        return generate_pdf_from_html(html).getvalue()
+
+    def certificate(self, conference, certificate_type, role_id=None, name=None, university=None,
+                    paper_title=None, blank=False):
+        html = render_template(
+            "certificates/certificate.html", conference=conference, certificate_type=certificate_type.value,
+            role_id=role_id, name=name, university=university, paper_title=paper_title, blank=blank
+        )
+        return generate_pdf_from_html(html).getvalue()
+
+
+@lru_cache(maxsize=None)
+def _schedule_styles():
+    """Paragraph styles mirroring the CSS of organiser/schedule_pdf.html (Georgia -> Times)."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+
+    def style(name, **options):
+        return ParagraphStyle(name, **dict(dict(fontName="Times-Roman", fontSize=10, leading=12,
+                                                textColor=colors.HexColor("#1f2937")), **options))
+
+    return {
+        "title": style("ScheduleTitle", fontName="Times-Bold", fontSize=16, leading=20,
+                       textColor=colors.HexColor("#312e81")),
+        "meta": style("ScheduleMeta", fontName="Times-Bold", leading=13),
+        "day": style("ScheduleDay", fontName="Times-Bold", fontSize=17, leading=21, spaceBefore=18, spaceAfter=8,
+                     textColor=colors.HexColor("#10b981")),
+        "track": style("ScheduleTrack", fontName="Times-Bold", leading=13, textColor=colors.HexColor("#5b21b6"),
+                       backColor=colors.HexColor("#f3f4f6"), borderPadding=(4, 8, 4, 8), leftIndent=8,
+                       spaceBefore=6, spaceAfter=4),
+        "description": style("ScheduleTrackDescription", leftIndent=15, textColor=colors.HexColor("#6b7280"),
+                             spaceAfter=6),
+        "header": style("ScheduleHeader", fontName="Times-Bold", fontSize=9, leading=11),
+        "cell": style("ScheduleCell"),
+        "paper": style("SchedulePaper", leftIndent=8, bulletIndent=0),
+        "footer": style("ScheduleFooter", alignment=2, spaceBefore=40, textColor=colors.HexColor("#4b5563")),
+    }
+
+
+class ReportlabEngine(PdfEngine):
+    name = "reportlab"
+
+    def _track_block(self, track, sessions, width):
+        from reportlab.lib import colors
+        from reportlab.platypus import KeepTogether, Paragraph, Spacer, Table, TableStyle
+
+        styles = _schedule_styles()
+        rows = [[Paragraph(label, styles["header"]) for label in ("Time", "Event/Session / Papers", "Location")]]
+        for session in sorted(sessions, key=lambda s: s.schedule_time):
+            details = [Paragraph(f"<b>{escape(session.name)}</b>", styles["cell"])]
+            if session.session_chair_role:
+                details.append(Paragraph(f"Chair: {escape(session.session_chair_role.user.name)}", styles["cell"]))
+            for paper in confirmed_papers(session):
+                details.append(Paragraph(
+                    f"(ID: {paper.paper_id}) {escape(paper.title)} — Author: {escape(paper.author_role.user.name)}",
+                    styles["paper"], bulletText="•"
+                ))
+            rows.append([
+                Paragraph(session.schedule_time.strftime("%I:%M %p"), styles["cell"]),
+                details,
+                Paragraph(escape(session.location or "TBD"), styles["cell"]),
+            ])
+
+        table = Table(rows, colWidths=[2.4 * cm, width - 6.4 * cm, 4 * cm], repeatRows=1)
+        table.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 1, colors.HexColor("#eeeeee")),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e5e7eb")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ]))
+        description = track.description if track else "Sessions not assigned to a specific track."
+        return KeepTogether([
+            Paragraph(escape(track.name if track else "General/Unassigned Sessions"), styles["track"]),
+            Paragraph(escape(description or ""), styles["description"]),
+            table,
+            Spacer(1, 8),
+        ])
+
+    def schedule(self, conference, sessions_by_date, heading=True, footer=True):
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+        styles = _schedule_styles()
+        output = io.BytesIO()
+        document = SimpleDocTemplate(output, pagesize=A4, title=f"{conference.title} - Official Program Schedule",
+                                     leftMargin=1.5 * cm, rightMargin=1.5 * cm, topMargin=1.5 * cm,
+                                     bottomMargin=1.5 * cm)
+        story = []
+        if heading:
+            story += [
+                Paragraph(f"{escape(conference.title)} Program Schedule", styles["title"]),
+                Spacer(1, 4),
+                Paragraph(f"Dates: {conference.start_date.strftime('%B %d, %Y')} - "
+                          f"{conference.end_date.strftime('%B %d, %Y')}", styles["meta"]),
+                Paragraph(f"Location: {escape(conference.location or '')}", styles["meta"]),
+            ]
+        for day, sessions in sessions_by_date.items():
+            story.append(Paragraph(f"Day: {day.strftime('%A, %B %d, %Y')}", styles["day"]))
+            by_track = sorted(sessions, key=lambda s: s.track.name if s.track else "")
+            for _, track_sessions in groupby(by_track, key=lambda s: s.track.name if s.track else ""):
+                track_sessions = list(track_sessions)
+                story.append(self._track_block(track_sessions[0].track, track_sessions, document.width))
+        if not sessions_by_date:
+            story.append(Paragraph("No sessions have been scheduled yet.", styles["cell"]))
+        if footer:
+            story.append(Paragraph("Generated by UniConfMgr", styles["footer"]))
+        document.build(story)
+        return output.getvalue()
+
+    def certificate(self, conference, certificate_type, role_id=None, name=None, university=None,
+                    paper_title=None, blank=False):
+        # Geometry shared with the stamper, so stamped and fully rendered certificates match
+        from reportlab.lib.utils import simpleSplit
+        from reportlab.pdfgen import canvas
+
+        from utils.certificates import RECIPIENT_FRAME, STAMP_STYLES, recipient_lines
+
+        page_width, page_height = landscape(A4)
+        output = io.BytesIO()
+        pdf = canvas.Canvas(output, pagesize=(page_width, page_height))
+        pdf.setTitle(f"{conference.title} - Certificate")
+        pdf.rect(1.2 * cm, 1.2 * cm, 27.3 * cm, 18.6 * cm)
+
+        def centred(text, font, size, rgb, top):
+            pdf.setFont(font, size)
+            pdf.setFillColorRGB(*rgb)
+            for line in simpleSplit(text, font, size, 25.7 * cm):
+                pdf.drawCentredString(page_width / 2, top - size * 0.75, line)
+                top -= size * 1.4
+            return top
+
+        grey, ink = (0.42, 0.447, 0.502), (0.122, 0.161, 0.216)
+        heading = {"author": "Presentation", "reviewer": "Reviewing"}.get(certificate_type.value, "Participation")
+        top = centred(f"Certificate of {heading}", "Helvetica-Bold", 34, (0.263, 0.22, 0.792), page_height - 2.4 * cm)
+        top = centred(conference.title, "Helvetica", 14, grey, top)
+        centred("This is to certify that", "Helvetica", 13, ink, top - 24)
+
+        if certificate_type.value == "author":
+            lead = "at"
+        elif certificate_type.value == "reviewer":
+            lead = "served as a reviewer for the programme committee of"
+        else:
+            lead = "participated in"
+        held = conference.start_date.strftime("%d %B %Y")
+        if conference.end_date != conference.start_date:
+            held += " to " + conference.end_date.strftime("%d %B %Y")
+        if conference.location:
+            held += f" at {conference.location}"
+        footer = (f"{lead} {conference.title}, hosted by {conference.hosting_department}, "
+                  f"{conference.hosting_university}, held {held}.")
+        centred(footer, "Helvetica", 13, ink, page_height - 13.8 * cm)
+
+        if not blank:
+            x, y, width, height = RECIPIENT_FRAME
+            top = y + height
+            for style, text in recipient_lines(conference.conference_id, role_id, certificate_type, name,
+                                               university, paper_title):
+                font, size, leading, rgb = STAMP_STYLES[style]
+                pdf.setFont(font, size)
+                pdf.setFillColorRGB(*rgb)
+                for line in simpleSplit(text, font, size, width):
+                    pdf.drawCentredString(x + width / 2, top - (leading - size) / 2 - size * 0.75, line)
+                    top -= leading
+
+        pdf.showPage()
+        pdf.save()
+        return output.getvalue()
+
+
+ENGINES = {engine.name: engine for engine in (XhtmlPdfEngine, ReportlabEngine)}
+_instances = {}
+
+
+def get_pdf_engine(name=None):
+    """The engine called `name`, or the configured PDF_ENGINE. Raises ValueError for unknown names."""
+    name = name or current_app.config.get("PDF_ENGINE", DEFAULT_ENGINE)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown PDF engine {name!r}; choose one of {', '.join(ENGINES)}.")
+    if name not in _instances:
+        _instances[name] = ENGINES[name]()
+    return _instances[name]
+
+
+def synthetic_schedule(sessions=100, papers_per_session=4, days=3, tracks=4):
+    """A conference and its sessions_by_date built from unsaved model objects, for benchmarks."""
+    conference = Conference(conference_id=0, title="Benchmark Conference", hosting_university="Benchmark University",
+                            hosting_department="Computer Science", start_date=date(2030, 1, 1),
+                            end_date=date(2030, 1, days), location="Main Campus")
+    track_objects = [Track(track_id=t, name=f"Track {t + 1}", description=f"Papers on topic {t + 1}.")
+                     for t in range(tracks)]
+
+    sessions_by_date = {}
+    for s in range(sessions):
+        day = conference.start_date + timedelta(days=s % days)
+        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=9, minutes=30 * (s // days % 16))
+        session = Session(session_id=s, name=f"Session {s + 1}", schedule_time=start, location=f"Room {s % 7 + 1}",
+                          track=track_objects[s % tracks])
+        chair = ConferenceRole(id=s, user=User(name=f"Chair {s + 1}"))
+        session.session_chair_role = chair
+        for p in range(papers_per_session):
+            paper_id = s * papers_per_session + p + 1
+            author = ConferenceRole(id=100000 + paper_id, user=User(name=f"Author {paper_id}"),
+                                    registration_link=Registration(payment_status=PaymentStatus.completed))
+            paper = Paper(paper_id=paper_id, title=f"A study of benchmark topic number {paper_id} in practice",
+                          status=PaperStatus.accepted, author_role=author)
+            session.papers_in_session.append(SessionPaper(paper=paper))
+        sessions_by_date.setdefault(day, []).append(session)
+    return conference, dict(sorted(sessions_by_date.items()))
+
+
+def benchmark_engines(sessions=100, papers_per_session=4, repeat=3):
+    """
+    {engine name: (seconds per render, peak traced MiB, PDF bytes)} for the synthetic
+    schedule. Memory is the tracemalloc peak of one render (Python allocations only).
+    """
+    conference, sessions_by_date = synthetic_schedule(sessions, papers_per_session)
+    results = {}
+    for name in ENGINES:
+        engine = get_pdf_engine(name)
+        pdf = engine.schedule(conference, sessions_by_date)  # warm-up: imports, fonts, template compile
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.schedule(conference, sessions_by_date)
+        seconds = (time.perf_counter() - start) / repeat
+
+        tracemalloc.start()
+        try:
+            engine.schedule(conference, sessions_by_date)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        results[name] = (seconds, peak / (1024 * 1024), len(pdf))
+    return results
@@ -0,0 +1,128 @@
+"""
+Declarative route permissions.
+
+Every protected view states what it needs with @requires(...) (or one of the
+named decorators below built from it):
+
+    @requires()                            logged in
+    @requires(admin=True)                  admin or super admin
+    @requires(super_admin=True)            super admin
+    @requires(role=UserRole.reviewer)      approved reviewer of the conference in kwargs["conf_id"]
+
+All checks are answered by one Principal per request, kept on the request. It loads
+what it needs at most once: the global roles (from the server-side session cache,
+or one users row with cookie sessions) and the user's role in a conference (one
+lookup on the (user_id, conference_id) unique index, since a user holds at most
+one role per conference). Views can reuse the loaded role through
+current_principal().conference_role(conf_id) instead of querying it again.
+"""
+from functools import wraps
+
+from flask import request, session, flash, redirect, url_for, abort
+
+from models import ConferenceRole, UserRole
+from utils.sessions import current_global_roles
+
+APPROVED = 1
+
+ROLE_DENIED_MESSAGES = {
+    UserRole.organizer: "You do not have organizer privileges for this conference.",
+    UserRole.author: "You do not have approved author privileges for this conference.",
+    UserRole.reviewer: "You do not have approved reviewer privileges for this conference.",
+    UserRole.participant: "Access denied. You are not a confirmed participant for this event.",
+}
+
+
+class Principal:
+    """The current user as seen by permission checks. Built lazily, once per request."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._global_roles = None
+        self._conference_roles = {}
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    def _roles(self):
+        if self._global_roles is None:
+            self._global_roles = current_global_roles()
+        return self._global_roles
+
+    @property
+    def is_admin(self):
+        """True for admins and super admins."""
+        is_admin, is_super_admin = self._roles()
+        return is_admin or is_super_admin
+
+    @property
+    def is_super_admin(self):
+        return self._roles()[1]
+
+    def conference_role(self, conference_id):
+        """The user's ConferenceRole in the conference (any role/status), or None."""
+        if conference_id not in self._conference_roles:
+            self._conference_roles[conference_id] = ConferenceRole.query.filter_by(
+                user_id=self.user_id, conference_id=conference_id
+            ).first()
+        return self._conference_roles[conference_id]
+
+    def has_conference_role(self, conference_id, role, status=APPROVED):
+        conference_role = self.conference_role(conference_id)
+        return conference_role is not None and conference_role.role == role and conference_role.status == status
+
+
+def current_principal():
+    # Stored on the request rather than flask.g: g is shared by every request
+    # handled inside an already pushed app context (tests, CLI scripts)
+    principal = getattr(request, "principal", None)
+    if principal is None:
+        principal = request.principal = Principal(session.get("user_id"))
+    return principal
+
+
+def requires(admin=False, super_admin=False, role=None, status=APPROVED, conf_arg="conf_id"):
+    """
+    Decorator factory for protected views. Anonymous users are sent to the login
+    page; logged-in users missing a requirement are sent back to their dashboard.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            principal = current_principal()
+            if not principal.is_authenticated:
+                flash("Please log in to access this page.", "error")
+                return redirect(url_for("auth.login"))
+
+            if super_admin and not principal.is_super_admin:
+                flash("You do not have permission to access this page.", "error")
+                return redirect(url_for("auth.dashboard"))
+
+            if admin and not principal.is_admin:
+                flash("You do not have administrative privileges for this page.", "error")
+                return redirect(url_for("auth.dashboard"))
+
+            if role is not None:
+                conference_id = kwargs.get(conf_arg)
+                if not conference_id:
+                    abort(400)
+                if not principal.has_conference_role(conference_id, role, status):
+                    flash(ROLE_DENIED_MESSAGES[role], "error")
+                    return redirect(url_for("auth.dashboard"))
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+login_required = requires()
+admin_required = requires(admin=True)
+super_admin_required = requires(super_admin=True)
+organizer_required = requires(role=UserRole.organizer)
+author_required = requires(role=UserRole.author)
+reviewer_required = requires(role=UserRole.reviewer)
+participant_required = requires(role=UserRole.participant)
@@ -0,0 +1,502 @@
+"""
+Proceedings volume compiled from the camera-ready PDFs of a conference's accepted papers.
+
+Papers are ordered as they are presented: scheduled papers by session time (then
+presentation time within the session), followed by unscheduled accepted papers by
+track. The volume is a title page and table of contents, then every camera-ready
+file with running page numbers and one PDF bookmark per paper.
+
+Source files are opened one at a time, from disk, and the volume is written to disk
+object by object as each one is copied, so a build holds a single camera-ready file
+in memory however many papers the volume has. The front matter is built last (page
+numbers are known by then) and placed first in the page tree. Page numbers are added
+as an extra content stream per page, so no source page is parsed or re-laid out.
+
+Builds are cached in uploads/proceedings/<conference>/<key>.pdf, where the key is a
+SHA-256 over every camera-ready file's hash plus the order and the table-of-contents
+text. Nothing changed means the cached file is served; a new upload, a title edit
+or a schedule change produces a new key and a fresh build. Builds run on a small
+background thread pool (start_proceedings_build) or inline (`flask compile-proceedings`).
+
+The front matter is drawn with reportlab directly: xhtml2pdf conversion changes the
+process's working directory, which is not safe off the request thread.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from flask import current_app
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from sqlalchemy import select
+
+from extensions import db
+from models import Conference, ConferenceRole, Paper, PaperStatus, Session, SessionPaper, Track, User
+from utils.files import atomic_open
+
+DEFAULT_WORKERS = 1
+PROCEEDINGS_DIR = "proceedings"
+CAMERA_READY_DIR = "camera_ready"
+# Bump when the layout changes so existing cached volumes are rebuilt
+LAYOUT_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+PAGE_NUMBER_FONT = ("Helvetica", 9)
+PAGE_NUMBER_MARGIN = 0.8 * cm
+
+
+@dataclass
+class ProceedingsEntry:
+    paper_id: int
+    title: str
+    authors: str
+    university: str
+    track: str
+    session: str
+    file_path: str
+    sha256: str = None
+    # 1-based number of the paper's first page in the volume, set while compiling
+    first_page: int = None
+
+
+@dataclass
+class ProceedingsStatus:
+    entries: list
+    # (paper_id, title) of accepted papers whose camera-ready file is missing
+    missing: list
+    key: str
+    path: str
+    ready: bool = False
+    building: bool = False
+    error: str = None
+
+
+@dataclass
+class ProceedingsReport:
+    key: str
+    path: str
+    papers: int = 0
+    pages: int = 0
+    cached: bool = False
+    missing: list = field(default_factory=list)
+
+
+def uploads_root():
+    return os.path.join(current_app.root_path, "uploads")
+
+
+def proceedings_path(conf_id, key):
+    return os.path.join(uploads_root(), PROCEEDINGS_DIR, str(conf_id), f"{key}.pdf")
+
+
+# path -> (size, mtime_ns, sha256): files are only re-read when they change on disk
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_sha256(path):
+    stat = os.stat(path)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    with _file_hashes_lock:
+        _file_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def proceedings_entries(conf_id):
+    """
+    (entries, missing): the accepted papers with a camera-ready file on disk, in
+    presentation order and hashed, and (paper_id, title) of those without one.
+    """
+    rows = db.session.execute(
+        select(
+            Paper.paper_id, Paper.title, Paper.camera_ready_file, User.name, User.university_name, Track.name,
+            Session.session_id, Session.name, Session.schedule_time, SessionPaper.presentation_time
+        ).join(ConferenceRole, ConferenceRole.id == Paper.author_role_id).join(
+            User, User.user_id == ConferenceRole.user_id
+        ).outerjoin(Track, Track.track_id == Paper.track_id).outerjoin(
+            SessionPaper, SessionPaper.paper_id == Paper.paper_id
+        ).outerjoin(Session, Session.session_id == SessionPaper.session_id).where(
+            Paper.conference_id == conf_id, Paper.status == PaperStatus.accepted
+        )
+    ).all()
+
+    def presentation_order(row):
+        *_, track, session_id, _, schedule_time, presentation_time = row
+        if session_id is None:
+            return (1, datetime.max, 0, datetime.max, track or "", row.paper_id)
+        return (0, schedule_time or datetime.max, session_id, presentation_time or datetime.max, "", row.paper_id)
+
+    entries, missing = [], []
+    directory = os.path.join(uploads_root(), CAMERA_READY_DIR)
+    for row in sorted(rows, key=presentation_order):
+        paper_id, title, filename, author, university, track, _, session_name, _, _ = row
+        path = os.path.join(directory, filename) if filename else None
+        if not path or not os.path.isfile(path):
+            missing.append((paper_id, title))
+            continue
+        entries.append(ProceedingsEntry(paper_id, title, author, university, track, session_name, path,
+                                        sha256=file_sha256(path)))
+    return entries, missing
+
+
+def proceedings_key(conference, entries):
+    """Cache key of the volume: changes with any file, the order or the table-of-contents text."""
+    payload = json.dumps([
+        LAYOUT_VERSION, conference.title, conference.hosting_department, conference.hosting_university,
+        conference.start_date.isoformat(), conference.end_date.isoformat(), conference.location,
+        [(e.paper_id, e.title, e.authors, e.university, e.track, e.session, e.sha256) for e in entries],
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _front_matter(conference, entries):
+    """Title page and table of contents (PDF bytes)."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    title = ParagraphStyle("ProceedingsTitle", parent=styles["Title"], fontSize=26, leading=32, spaceAfter=18)
+    subtitle = ParagraphStyle("ProceedingsSubtitle", parent=styles["Normal"], fontSize=13, leading=18,
+                              alignment=1, textColor=colors.HexColor("#4b5563"))
+    session_style = ParagraphStyle("TocSession", parent=styles["Normal"], fontName="Helvetica-Bold",
+                                   fontSize=10, spaceBefore=8)
+    paper_style = ParagraphStyle("TocPaper", parent=styles["Normal"], fontSize=10, leading=13)
+    author_style = ParagraphStyle("TocAuthor", parent=paper_style, fontName="Helvetica-Oblique",
+                                  textColor=colors.HexColor("#4b5563"))
+
+    dates = conference.start_date.strftime("%d %B %Y")
+    if conference.end_date != conference.start_date:
+        dates += " to " + conference.end_date.strftime("%d %B %Y")
+    story = [
+        Spacer(1, 6 * cm),
+        Paragraph(escape(conference.title), title),
+        Paragraph("Proceedings", subtitle),
+        Spacer(1, 1.5 * cm),
+        Paragraph(escape(f"{conference.hosting_department}, {conference.hosting_university}"), subtitle),
+        Paragraph(escape(dates + (f", {conference.location}" if conference.location else "")), subtitle),
+        PageBreak(),
+        Paragraph("Contents", styles["Heading1"]),
+    ]
+
+    rows, row_styles, heading = [], [], object()
+    for entry in entries:
+        section = entry.session or (f"Unscheduled: {entry.track}" if entry.track else "Unscheduled")
+        if section != heading:
+            heading = section
+            row_styles.append(("SPAN", (0, len(rows)), (1, len(rows))))
+            rows.append([Paragraph(escape(section), session_style), ""])
+        authors = ", ".join(filter(None, [entry.authors, entry.university]))
+        rows.append([
+            [Paragraph(escape(entry.title), paper_style), Paragraph(escape(authors), author_style)],
+            str(entry.first_page),
+        ])
+    if rows:
+        table = Table(rows, colWidths=[14.5 * cm, 1.5 * cm], repeatRows=0)
+        table.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("FONTSIZE", (1, 0), (1, -1), 10),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ] + row_styles))
+        story.append(table)
+
+    output = io.BytesIO()
+    SimpleDocTemplate(output, pagesize=A4, title=f"{conference.title} - Proceedings",
+                      leftMargin=2.5 * cm, rightMargin=2.5 * cm, topMargin=2.5 * cm, bottomMargin=2.5 * cm
+                      ).build(story)
+    return output.getvalue()
+
+
+class _VolumeWriter:
+    """
+    Writes a PDF to an open file object by object, as pages are added: only the
+    source file being copied is in memory, plus the offset of each object written.
+    Pages are copied with everything they reference and can get a centered page
+    number at the bottom, added as an extra content stream without parsing theirs.
+    """
+
+    def __init__(self, f):
+        from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+        self._file = f
+        # Offset of object n at index n - 1; None while reserved but not yet written
+        self._offsets = []
+        f.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self._pages = self._reserve()
+        font, _ = PAGE_NUMBER_FONT
+        self._font = self._add(DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject(f"/{font}"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        }))
+        opening = DecodedStreamObject()
+        opening.set_data(b"q\n")
+        self._opening = self._add(opening)
+
+    def _reserve(self):
+        from pypdf.generic import IndirectObject
+
+        self._offsets.append(None)
+        return IndirectObject(len(self._offsets), 0, None)
+
+    def _write(self, ref, obj):
+        self._offsets[ref.idnum - 1] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % ref.idnum)
+        obj.write_to_stream(self._file)
+        self._file.write(b"\nendobj\n")
+
+    def _add(self, obj):
+        ref = self._reserve()
+        self._write(ref, obj)
+        return ref
+
+    def _copy(self, obj, refs, pending):
+        """`obj` with its references renumbered; objects it references for the first time are queued."""
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, StreamObject
+
+        if isinstance(obj, IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key not in refs:
+                refs[key] = self._reserve()
+                pending.append(obj)
+            return refs[key]
+        if isinstance(obj, StreamObject):
+            # The stream data is copied as stored (still encoded by its /Filter). get_data() would
+            # decode it and pypdf cannot re-encode most filters, so this reads _data (pinned in requirements.txt).
+            copy = DecodedStreamObject()
+            copy._data = obj._data
+            copy.update({key: self._copy(value, refs, pending) for key, value in obj.items()})
+            return copy
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({key: self._copy(value, refs, pending) for key, value in obj.items()})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._copy(value, refs, pending) for value in obj)
+        return obj
+
+    def add_pages(self, reader, first_number=None):
+        """
+        Copies every page of `reader`, numbered from `first_number` unless it is None.
+        Returns the references of the copied pages.
+        """
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        # Source (idnum, generation) -> reference in the volume. Pages are mapped up front
+        # so links between them resolve, and are only written below, without their /Parent.
+        refs, pending, page_refs = {}, [], []
+        pages = reader.pages
+        for page in pages:
+            page_refs.append(self._reserve())
+            if page.indirect_reference is not None:
+                key = (page.indirect_reference.idnum, page.indirect_reference.generation)
+                refs[key] = page_refs[-1]
+
+        for index, (page, ref) in enumerate(zip(pages, page_refs)):
+            skipped = ("/Parent",) if first_number is None else ("/Parent", "/Resources", "/Contents")
+            copy = DictionaryObject({key: self._copy(value, refs, pending)
+                                     for key, value in page.items() if key not in skipped})
+            copy[NameObject("/Parent")] = self._pages
+            if first_number is not None:
+                resources = page["/Resources"].get_object() if "/Resources" in page else DictionaryObject()
+                fonts = resources["/Font"].get_object() if "/Font" in resources else DictionaryObject()
+                copy[NameObject("/Resources")] = DictionaryObject({
+                    key: self._copy(value, refs, pending) for key, value in resources.items() if key != "/Font"
+                })
+                copy["/Resources"][NameObject("/Font")] = DictionaryObject({
+                    key: self._copy(value, refs, pending) for key, value in fonts.items()
+                })
+                copy["/Resources"]["/Font"][NameObject("/ProceedingsPageNo")] = self._font
+
+                font, size = PAGE_NUMBER_FONT
+                box = page.cropbox
+                text = str(first_number + index)
+                x = (float(box.left) + float(box.right) - stringWidth(text, font, size)) / 2
+                y = float(box.bottom) + PAGE_NUMBER_MARGIN
+                stamp = DecodedStreamObject()
+                stamp.set_data(b"\nQ\nq BT 0.42 0.447 0.502 rg /ProceedingsPageNo %d Tf 1 0 0 1 %.2f %.2f Tm (%s) Tj ET Q\n"
+                               % (size, x, y, text.encode()))
+
+                # q <page content> Q <number>: the page cannot leak graphics state into the number
+                contents = page.get("/Contents")
+                streams = []
+                if contents is not None:
+                    streams = list(contents.get_object()) if isinstance(contents.get_object(), ArrayObject) else [contents]
+                copy[NameObject("/Contents")] = ArrayObject(
+                    [self._opening] + [self._copy(stream, refs, pending) for stream in streams] + [self._add(stamp)]
+                )
+            self._write(ref, copy)
+
+            while pending:
+                source = pending.pop()
+                self._write(refs[(source.idnum, source.generation)], self._copy(source.get_object(), refs, pending))
+        return page_refs
+
+    def close(self, pages, bookmarks, title):
+        """Writes the page tree (`pages` in order), one bookmark per (title, page), the metadata and the trailer."""
+        from pypdf.generic import ArrayObject, DictionaryObject, NameObject, NumberObject, create_string_object
+
+        self._write(self._pages, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(pages),
+            NameObject("/Count"): NumberObject(len(pages)),
+        }))
+        catalog = DictionaryObject({NameObject("/Type"): NameObject("/Catalog"), NameObject("/Pages"): self._pages})
+        if bookmarks:
+            outline, items = self._reserve(), [self._reserve() for _ in bookmarks]
+            for index, (text, page) in enumerate(bookmarks):
+                item = DictionaryObject({
+                    NameObject("/Title"): create_string_object(text),
+                    NameObject("/Parent"): outline,
+                    NameObject("/Dest"): ArrayObject([page, NameObject("/Fit")]),
+                })
+                if index > 0:
+                    item[NameObject("/Prev")] = items[index - 1]
+                if index < len(items) - 1:
+                    item[NameObject("/Next")] = items[index + 1]
+                self._write(items[index], item)
+            self._write(outline, DictionaryObject({
+                NameObject("/Type"): NameObject("/Outlines"),
+                NameObject("/First"): items[0],
+                NameObject("/Last"): items[-1],
+                NameObject("/Count"): NumberObject(len(items)),
+            }))
+            catalog[NameObject("/Outlines")] = outline
+        root = self._add(catalog)
+        info = self._add(DictionaryObject({NameObject("/Title"): create_string_object(title)}))
+
+        xref = self._file.tell()
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        for offset in self._offsets:
+            self._file.write(b"%010d 00000 n \n" % offset)
+        self._file.write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                         % (len(self._offsets) + 1, root.idnum, info.idnum, xref))
+
+
+def _write_volume(conference, entries, path):
+    """Builds the volume into `path` (atomically). Returns the number of pages."""
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_open(path) as f:
+        volume = _VolumeWriter(f)
+        body, bookmarks = [], []
+        for entry in entries:
+            entry.first_page = len(body) + 1
+            try:
+                with open(entry.file_path, "rb") as source:
+                    pages = volume.add_pages(PdfReader(source), first_number=entry.first_page)
+            except (OSError, PyPdfError) as e:
+                raise ValueError(f'The camera-ready file of "{entry.title}" (paper {entry.paper_id}) '
+                                 f"could not be read: {e}") from e
+            if pages:
+                bookmarks.append((entry.title, pages[0]))
+            body += pages
+
+        front = volume.add_pages(PdfReader(io.BytesIO(_front_matter(conference, entries))))
+        volume.close(front + body, bookmarks, f"{conference.title} - Proceedings")
+    return len(front) + len(body)
+
+
+def proceedings_status(conf_id):
+    """Current key, cached file and build state of a conference's proceedings."""
+    conference = db.session.get(Conference, conf_id)
+    entries, missing = proceedings_entries(conf_id)
+    key = proceedings_key(conference, entries)
+    path = proceedings_path(conf_id, key)
+    status = ProceedingsStatus(entries, missing, key, path, ready=bool(entries) and os.path.isfile(path))
+
+    with _jobs_lock:
+        job = _jobs.get(conf_id)
+    if job and not status.ready:
+        job_key, future = job
+        if not future.done():
+            status.building = True
+        elif job_key == key and future.exception() is not None:
+            status.error = str(future.exception())
+    return status
+
+
+def compile_proceedings(conf_id, force=False):
+    """
+    Builds the proceedings of a conference unless a volume with the current key is
+    already cached (or `force`). Returns a ProceedingsReport; raises ValueError if the
+    conference does not exist, has no camera-ready files or one cannot be read.
+    """
+    conference = db.session.get(Conference, conf_id)
+    if conference is None:
+        raise ValueError(f"Conference {conf_id} does not exist.")
+
+    entries, missing = proceedings_entries(conf_id)
+    if not entries:
+        raise ValueError("No accepted paper has a camera-ready file yet.")
+    key = proceedings_key(conference, entries)
+    report = ProceedingsReport(key, proceedings_path(conf_id, key), papers=len(entries), missing=missing)
+
+    if os.path.isfile(report.path) and not force:
+        from pypdf import PdfReader
+
+        report.cached = True
+        report.pages = len(PdfReader(report.path).pages)
+        return report
+
+    report.pages = _write_volume(conference, entries, report.path)
+    # Older builds of this conference are superseded by the new key
+    for name in os.listdir(os.path.dirname(report.path)):
+        if name.endswith(".pdf") and name != os.path.basename(report.path):
+            os.remove(os.path.join(os.path.dirname(report.path), name))
+    return report
+
+
+# conf_id -> (key, Future) of the latest background build in this process
+_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            workers = current_app.config.get("PROCEEDINGS_WORKERS", DEFAULT_WORKERS)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proceedings")
+        return _executor
+
+
+def _build_in_background(app, conf_id):
+    with app.app_context():
+        try:
+            return compile_proceedings(conf_id)
+        finally:
+            db.session.remove()
+
+
+def start_proceedings_build(conf_id, key):
+    """
+    Queues a background build for the conference unless one is already queued or
+    running. Must be called inside an app context. Returns False if one was running.
+    """
+    executor = _get_executor()
+    with _jobs_lock:
+        job = _jobs.get(conf_id)
+        if job and not job[1].done():
+            return False
+        future = executor.submit(_build_in_background, current_app._get_current_object(), conf_id)
+        _jobs[conf_id] = (key, future)
+    return True
@@ -0,0 +1,101 @@
+"""
+EXPLAIN helpers for checking that hot queries hit the intended indexes.
+
+Each entry in ROLE_LOOKUP_QUERIES reproduces the query shape used by a route
+(decorators, view_participants, manage_reviewers, manage_pending_participants)
+together with the indexes it may use. Works on SQLite
+(EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN, with seq scans disabled so small
+development tables still show whether the index is usable).
+"""
+from sqlalchemy import and_, or_, text
+
+from extensions import db
+from models import ConferenceRole, UserRole
+
+
+def _decorator_lookup():
+    # utils.permissions.Principal.conference_role (all conference role decorators)
+    return ConferenceRole.query.filter_by(user_id=1, conference_id=1).limit(1)
+
+
+def _view_participants():
+    return ConferenceRole.query.filter(
+        ConferenceRole.conference_id == 1,
+        ConferenceRole.status == 1,
+        ConferenceRole.role.in_([UserRole.participant, UserRole.author, UserRole.reviewer])
+    )
+
+
+def _manage_reviewers():
+    return ConferenceRole.query.filter_by(conference_id=1, role=UserRole.reviewer, status=0)
+
+
+def _approved_users_count():
+    # organizer.dashboard: DISTINCT user_id over approved roles
+    return db.session.query(ConferenceRole.user_id).filter_by(conference_id=1, status=1).distinct()
+
+
+def _manage_pending_participants():
+    # utils.role_queues.queue_page, first page
+    return ConferenceRole.query.filter_by(role=UserRole.participant, status=0).order_by(
+        ConferenceRole.conference_id, ConferenceRole.id
+    ).limit(51)
+
+
+def _view_all_organizers():
+    # utils.role_queues.queue_page, keyset page after (conference 1, role 1)
+    return ConferenceRole.query.filter(
+        ConferenceRole.role == UserRole.organizer,
+        ConferenceRole.status == 1,
+        or_(ConferenceRole.conference_id > 1,
+            and_(ConferenceRole.conference_id == 1, ConferenceRole.id > 1))
+    ).order_by(ConferenceRole.conference_id, ConferenceRole.id).limit(51)
+
+
+# SQLite names the index behind a UNIQUE constraint sqlite_autoindex_<table>_N
+_USER_CONFERENCE_UNIQUE = ("_user_conference_uc", "sqlite_autoindex_conference_roles")
+_CONF_STATUS_ROLE = ("ix_conference_roles_conf_status_role_user",)
+_ROLE_STATUS_CONF = ("ix_conference_roles_role_status_conf_id",)
+
+# (name, query builder, acceptable indexes). Where every filtered column is an equality
+# match, both composites are an exact seek and either one is an acceptable plan.
+ROLE_LOOKUP_QUERIES = [
+    ("role decorators", _decorator_lookup, _USER_CONFERENCE_UNIQUE),
+    ("view_participants", _view_participants, _CONF_STATUS_ROLE + _ROLE_STATUS_CONF),
+    ("manage_reviewers", _manage_reviewers, _CONF_STATUS_ROLE + _ROLE_STATUS_CONF),
+    ("organizer dashboard count", _approved_users_count, _CONF_STATUS_ROLE),
+    ("manage_pending_participants", _manage_pending_participants, _ROLE_STATUS_CONF),
+    ("view_all_organizers", _view_all_organizers, _ROLE_STATUS_CONF),
+]
+
+
+def explain(query):
+    """Returns the database's plan for a Query/Select as a list of text lines."""
+    statement = getattr(query, "statement", query)
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    if dialect.name == "sqlite":
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return [row[-1] for row in rows]
+
+    if dialect.name == "postgresql":
+        # SET LOCAL only lasts until the end of the transaction we roll back below
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        try:
+            rows = db.session.execute(text(f"EXPLAIN {sql}")).all()
+        finally:
+            db.session.rollback()
+        return [row[0] for row in rows]
+
+    raise NotImplementedError(f"EXPLAIN is not supported for dialect '{dialect.name}'.")
+
+
+def check_role_lookup_plans():
+    """Returns [(name, acceptable_indexes, used: bool, plan_lines)] for every hot ConferenceRole query."""
+    results = []
+    for name, build_query, acceptable_indexes in ROLE_LOOKUP_QUERIES:
+        plan = explain(build_query())
+        used = any(index in line for line in plan for index in acceptable_indexes)
+        results.append((name, acceptable_indexes, used, plan))
+    return results
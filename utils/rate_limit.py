@@ -0,0 +1,182 @@
+"""
+Token-bucket rate limiting for the auth endpoints.
+
+Each protected endpoint has per-IP and per-account limits (RATELIMIT_RULES).
+Buckets live in a storage backend chosen by RATELIMIT_STORAGE_URL:
+
+    memory://            in-process LRU table (default; per worker)
+    redis://host:6379/0  shared across workers (needs the optional `redis` package)
+
+Any object with the same take() method can be installed instead via
+app.extensions["rate_limit_backend"], e.g. a local stand-in for the shared store.
+
+IP buckets are keyed on request.remote_addr. Behind reverse proxies set
+TRUSTED_PROXIES to their number, so it is the client's address taken from
+X-Forwarded-For (see create_app) rather than the proxy's, shared by every client.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request, render_template, make_response
+
+DEFAULT_RULES = {
+    # scope: {"ip": "N/period", "account": "N/period"}
+    "login": {"ip": "20/minute", "account": "5/minute"},
+    "register": {"ip": "5/minute", "account": "3/hour"},
+    "reset_password": {"ip": "5/minute", "account": "3/hour"},
+    "verify_otp": {"ip": "10/minute"},
+}
+
+_PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(limit):
+    """'5/minute' -> (capacity=5, refill_per_second=5/60)."""
+    count, period = limit.split("/", 1)
+    count = int(count)
+    seconds = _PERIOD_SECONDS[period.strip().rstrip("s")]
+    return count, count / seconds
+
+
+class MemoryBackend:
+    """
+    In-process token buckets, at most max_keys of them: past that the least recently
+    used buckets are dropped (the longest idle, so usually full again anyway).
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, last_refill, capacity, rate), least recently used first
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        """Takes `cost` tokens from the bucket. Returns (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, _, _ = self._buckets.get(key, (capacity, now, capacity, rate))
+            tokens = min(capacity, tokens + (now - last) * rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (cost - tokens) / rate
+
+            self._buckets[key] = (tokens, now, capacity, rate)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class RedisBackend:
+    """Token buckets shared across workers, updated atomically by a Lua script."""
+
+    _SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+    def __init__(self, client, prefix="ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self._SCRIPT)
+
+    def take(self, key, capacity, rate, cost=1):
+        allowed, retry_after = self._script(keys=[self.prefix + key], args=[capacity, rate, time.time(), cost])
+        return bool(int(allowed)), float(retry_after)
+
+
+def _create_backend(url):
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATELIMIT_STORAGE_URL points to Redis but the 'redis' package is not installed.")
+        return RedisBackend(redis.Redis.from_url(url))
+    raise RuntimeError(f"Unsupported RATELIMIT_STORAGE_URL: {url}")
+
+
+def get_backend():
+    """Returns the app's rate-limit backend, creating it from config on first use."""
+    extensions = current_app.extensions
+    if "rate_limit_backend" not in extensions:
+        extensions["rate_limit_backend"] = _create_backend(
+            current_app.config.get("RATELIMIT_STORAGE_URL", "memory://")
+        )
+    return extensions["rate_limit_backend"]
+
+
+def check_limits(scope, account=None):
+    """
+    Takes a token from the IP bucket and (if given) the account bucket for `scope`.
+    Returns 0 if allowed, otherwise the number of seconds until a retry can succeed.
+    A request the IP bucket denies never reaches the account bucket, so flooding
+    from one address cannot drain (lock out) someone else's account.
+    """
+    rules = current_app.config.get("RATELIMIT_RULES", DEFAULT_RULES).get(scope, {})
+    backend = get_backend()
+
+    checks = []
+    if "ip" in rules:
+        checks.append((f"{scope}:ip:{request.remote_addr}", rules["ip"]))
+    if account and "account" in rules:
+        checks.append((f"{scope}:account:{account.strip().lower()}", rules["account"]))
+
+    for key, limit in checks:
+        capacity, rate = parse_limit(limit)
+        allowed, wait = backend.take(key, capacity, rate)
+        if not allowed:
+            return wait
+    return 0.0
+
+
+def rate_limited(scope, account_field=None):
+    """
+    Decorator limiting POST requests to a view. `account_field` names the form field
+    (e.g. "email") used for the per-account bucket. Over the limit -> 429 + Retry-After.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != "POST" or not current_app.config.get("RATELIMIT_ENABLED", True):
+                return f(*args, **kwargs)
+
+            account = request.form.get(account_field) if account_field else None
+            retry_after = check_limits(scope, account)
+            if retry_after:
+                retry_seconds = max(1, math.ceil(retry_after))
+                response = make_response(
+                    render_template("errors/too_many_requests.html", retry_after=retry_seconds), 429
+                )
+                response.headers["Retry-After"] = str(retry_seconds)
+                return response
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,98 @@
+"""
+Overdue-review reminder job.
+
+Selects every overdue, not-yet-reminded review across all conferences with one
+indexed query (submitted_at IS NULL AND due_at < now, on papers still awaiting a
+decision), groups them per reviewer
+and queues a single digest email per reviewer instead of one mail per review.
+"""
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import or_
+
+from extensions import db
+from models import Review, Paper, PaperStatus, Conference, ConferenceRole, User, utc_now_naive
+from utils.email_utils import enqueue_email
+
+
+def find_overdue_reviews(now=None):
+    """Returns overdue review rows that are due a (re)minder, ordered per reviewer."""
+    now = now or utc_now_naive()
+    interval = timedelta(hours=current_app.config.get('REVIEW_REMINDER_INTERVAL_HOURS', 48))
+
+    return db.session.query(
+        Review.review_id,
+        Review.due_at,
+        Paper.title.label("paper_title"),
+        Conference.title.label("conference_title"),
+        User.email,
+        User.name
+    ).join(Paper, Paper.paper_id == Review.paper_id).join(
+        Conference, Conference.conference_id == Paper.conference_id
+    ).join(
+        ConferenceRole, ConferenceRole.id == Review.reviewer_role_id
+    ).join(
+        User, User.user_id == ConferenceRole.user_id
+    ).filter(
+        Review.submitted_at.is_(None),
+        Review.due_at < now,
+        # A decided paper needs no more reviews
+        Paper.status.notin_([PaperStatus.accepted, PaperStatus.rejected]),
+        or_(Review.last_reminded_at.is_(None), Review.last_reminded_at < now - interval)
+    ).order_by(User.email, Review.due_at).all()
+
+
+def _digest_body(name, rows):
+    lines = "\n".join(
+        f"  - \"{row.paper_title}\" ({row.conference_title}), due {row.due_at.strftime('%Y-%m-%d')}"
+        for row in rows
+    )
+    return f"""
+Dear {name},
+
+The following review(s) assigned to you are past their due date:
+
+{lines}
+
+Please log in to your reviewer dashboard to submit them as soon as possible.
+
+The UniConfMgr Team
+"""
+
+
+def send_overdue_review_reminders(now=None):
+    """
+    Queues one digest per reviewer and stamps last_reminded_at on every review
+    whose digest SendGrid accepted (single UPDATE). Returns (digests_sent, reviews_reminded).
+    """
+    now = now or utc_now_naive()
+    rows = find_overdue_reviews(now)
+
+    digests = {}
+    for row in rows:
+        digests.setdefault(row.email, []).append(row)
+
+    pending = []
+    for email, reviewer_rows in digests.items():
+        future = enqueue_email(
+            email,
+            f"Reminder: {len(reviewer_rows)} overdue review(s)",
+            plain_text_content=_digest_body(reviewer_rows[0].name, reviewer_rows)
+        )
+        pending.append((future, reviewer_rows))
+
+    digests_sent = 0
+    reminded_ids = []
+    for future, reviewer_rows in pending:
+        if future.result():
+            digests_sent += 1
+            reminded_ids.extend(row.review_id for row in reviewer_rows)
+
+    if reminded_ids:
+        Review.query.filter(Review.review_id.in_(reminded_ids)).update(
+            {Review.last_reminded_at: now}, synchronize_session=False
+        )
+        db.session.commit()
+
+    return digests_sent, len(reminded_ids)
@@ -0,0 +1,219 @@
+"""
+Review-score statistics for organizer decisions.
+
+Raw Review.score values are not comparable across reviewers (some score
+everything 2-3, others 4-5). This module loads every scored review of a
+conference once, builds per-reviewer distributions and calibrated paper
+scores with NumPy in a single vectorized pass, and caches the result per
+conference until the underlying reviews change.
+"""
+import threading
+
+import numpy as np
+from sqlalchemy import func
+
+from extensions import db
+from models import Review, Paper
+
+# Reviewers with fewer scored reviews than this are standardized against the
+# conference-wide distribution instead of their own (too few points for a std).
+MIN_REVIEWS_FOR_CALIBRATION = 3
+
+_stats_cache = {}
+_cache_lock = threading.Lock()
+
+
+class ConferenceScoreStats:
+    """Per-reviewer and per-paper score statistics for one conference."""
+
+    def __init__(self, conference_id, fingerprint, global_mean, global_std,
+                 reviewers, papers, ranking):
+        self.conference_id = conference_id
+        self.fingerprint = fingerprint
+        self.global_mean = global_mean
+        self.global_std = global_std
+        self.reviewers = reviewers  # {reviewer_role_id: {...}}
+        self.papers = papers        # {paper_id: {...}}
+        self.ranking = ranking      # [paper_id, ...] best first
+
+    def paper_summary(self, paper_id):
+        return self.papers.get(paper_id)
+
+    def reviewer_summary(self, reviewer_role_id):
+        return self.reviewers.get(reviewer_role_id)
+
+    def ranked_papers(self):
+        """Returns paper summaries ordered by calibrated score (best first)."""
+        return [self.papers[pid] for pid in self.ranking]
+
+
+def _fingerprint(conference_id):
+    """Cheap aggregate that changes whenever a scored review is added, edited or removed."""
+    row = db.session.query(
+        func.count(Review.review_id),
+        func.coalesce(func.sum(Review.score), 0),
+        func.max(Review.review_id),
+        func.max(Review.submitted_at)
+    ).join(Paper, Paper.paper_id == Review.paper_id).filter(
+        Paper.conference_id == conference_id,
+        Review.score.isnot(None)
+    ).one()
+    return tuple(row)
+
+
+def _empty_stats(conference_id, fingerprint):
+    return ConferenceScoreStats(conference_id, fingerprint, None, None, {}, {}, [])
+
+
+def compute_score_stats(conference_id, fingerprint=None):
+    """Builds ConferenceScoreStats from the review matrix of one conference."""
+    if fingerprint is None:
+        fingerprint = _fingerprint(conference_id)
+
+    rows = db.session.query(
+        Review.paper_id, Review.reviewer_role_id, Review.score
+    ).join(Paper, Paper.paper_id == Review.paper_id).filter(
+        Paper.conference_id == conference_id,
+        Review.score.isnot(None)
+    ).all()
+
+    if not rows:
+        return _empty_stats(conference_id, fingerprint)
+
+    data = np.array(rows, dtype=np.int64)
+    scores = data[:, 2].astype(np.float64)
+
+    # Map sparse ids onto dense 0..n-1 indexes so bincount can aggregate
+    paper_ids, paper_idx = np.unique(data[:, 0], return_inverse=True)
+    reviewer_ids, reviewer_idx = np.unique(data[:, 1], return_inverse=True)
+
+    global_mean = scores.mean()
+    global_std = scores.std()
+
+    # --- Per-reviewer distribution ---
+    r_count = np.bincount(reviewer_idx)
+    r_mean = np.bincount(reviewer_idx, weights=scores) / r_count
+    r_var = np.bincount(reviewer_idx, weights=scores ** 2) / r_count - r_mean ** 2
+    r_std = np.sqrt(np.clip(r_var, 0.0, None))
+
+    # Reviewers with too few reviews (or no spread) fall back to the global distribution
+    calibrated_reviewer = (r_count >= MIN_REVIEWS_FOR_CALIBRATION) & (r_std > 0)
+    base_mean = np.where(calibrated_reviewer, r_mean, global_mean)
+    base_std = np.where(calibrated_reviewer, r_std, global_std)
+
+    review_base_std = base_std[reviewer_idx]
+    z = np.divide(scores - base_mean[reviewer_idx], review_base_std,
+                  out=np.zeros_like(scores), where=review_base_std > 0)
+
+    # --- Per-paper aggregates ---
+    p_count = np.bincount(paper_idx)
+    p_raw_mean = np.bincount(paper_idx, weights=scores) / p_count
+    p_z_mean = np.bincount(paper_idx, weights=z) / p_count
+    # Project z back onto the familiar 1-5 scale so organizers can read it
+    p_calibrated = global_mean + p_z_mean * global_std
+
+    # Rank: calibrated score desc, then more reviews first, then paper id for stability
+    order = np.lexsort((paper_ids, -p_count, -p_calibrated))
+
+    reviewers = {}
+    for i, role_id in enumerate(reviewer_ids.tolist()):
+        reviewers[role_id] = {
+            "reviewer_role_id": role_id,
+            "count": int(r_count[i]),
+            "mean": float(r_mean[i]),
+            "std": float(r_std[i]),
+            "bias": float(r_mean[i] - global_mean),
+            "calibrated": bool(calibrated_reviewer[i]),
+        }
+
+    papers = {}
+    for rank, i in enumerate(order.tolist(), start=1):
+        paper_id = int(paper_ids[i])
+        papers[paper_id] = {
+            "paper_id": paper_id,
+            "rank": rank,
+            "review_count": int(p_count[i]),
+            "raw_mean": float(p_raw_mean[i]),
+            "z_score": float(p_z_mean[i]),
+            "calibrated_score": float(p_calibrated[i]),
+        }
+
+    ranking = [int(paper_ids[i]) for i in order.tolist()]
+
+    return ConferenceScoreStats(conference_id, fingerprint, float(global_mean), float(global_std),
+                                reviewers, papers, ranking)
+
+
+def get_conference_score_stats(conference_id):
+    """
+    Returns cached ConferenceScoreStats for a conference, recomputing only when
+    the review fingerprint has changed since the last computation.
+    """
+    fingerprint = _fingerprint(conference_id)
+
+    with _cache_lock:
+        cached = _stats_cache.get(conference_id)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached
+
+    stats = compute_score_stats(conference_id, fingerprint)
+    with _cache_lock:
+        _stats_cache[conference_id] = stats
+    return stats
+
+
+def invalidate_score_stats(conference_id):
+    """Drops the cached statistics for a conference (call after review changes)."""
+    with _cache_lock:
+        _stats_cache.pop(conference_id, None)
+
+
+def propose_decisions(stats, papers, track_rules, revision_margin=0.0):
+    """
+    Proposes accept / revision_required / reject for every undecided paper.
+
+    papers:        iterable of (paper_id, track_id) for the undecided papers
+    track_rules:   {track_id: ("capacity", n) | ("threshold", score)}; tracks
+                   without a rule get no proposal
+    revision_margin: calibrated-score band below the acceptance cutoff that is
+                   proposed as revision_required instead of reject
+
+    Returns {paper_id: "accepted" | "revision_required" | "rejected"}.
+    Papers without any scored review are left out (nothing to rank them by).
+    """
+    # Group scored papers per track, keeping the global ranking order
+    by_track = {}
+    for paper_id, track_id in papers:
+        if stats.paper_summary(paper_id) is not None:
+            by_track.setdefault(track_id, []).append(paper_id)
+    for track_papers in by_track.values():
+        track_papers.sort(key=lambda pid: stats.papers[pid]["rank"])
+
+    proposals = {}
+    for track_id, ranked_ids in by_track.items():
+        rule = track_rules.get(track_id)
+        if not rule:
+            continue
+
+        mode, value = rule
+        if mode == "capacity":
+            capacity = max(int(value), 0)
+            accepted_ids = set(ranked_ids[:capacity])
+            # Cutoff is the score of the last accepted paper; ties beyond capacity are not accepted
+            if capacity and ranked_ids:
+                cutoff = stats.papers[ranked_ids[min(capacity, len(ranked_ids)) - 1]]["calibrated_score"]
+            else:
+                cutoff = float("inf")
+        else:
+            cutoff = float(value)
+            accepted_ids = {pid for pid in ranked_ids if stats.papers[pid]["calibrated_score"] >= cutoff}
+
+        for pid in ranked_ids:
+            if pid in accepted_ids:
+                proposals[pid] = "accepted"
+            elif stats.papers[pid]["calibrated_score"] >= cutoff - revision_margin:
+                proposals[pid] = "revision_required"
+            else:
+                proposals[pid] = "rejected"
+
+    return proposals
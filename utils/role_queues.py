@@ -0,0 +1,92 @@
+"""
+Keyset-paginated ConferenceRole queues for the admin pages.
+
+Rows are ordered by (conference_id, id) and a page starts strictly after the
+last row of the previous one (cursor "<conference_id>.<role_id>"), so every
+page is a bounded index range scan on ix_conference_roles_role_status_conf_id
+however deep the admin pages. Per-conference counts come from one GROUP BY.
+"""
+from dataclasses import dataclass
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import Conference, ConferenceRole
+
+DEFAULT_PAGE_SIZE = 50
+
+
+@dataclass
+class QueuePage:
+    roles: list
+    next_cursor: str
+    # [(conference_id, title, count)] for the whole queue, and the total
+    conference_counts: list
+    total: int
+    conference_id: int = None
+
+    def count_for(self, conference_id):
+        for conf_id, _, count in self.conference_counts:
+            if conf_id == conference_id:
+                return count
+        return 0
+
+
+def _parse_cursor(cursor):
+    try:
+        conference_id, role_id = (int(part) for part in cursor.split(".", 1))
+    except (AttributeError, ValueError):
+        return None
+    return conference_id, role_id
+
+
+def owned_by(admin_id):
+    """Criterion: the role belongs to a conference created by the given admin."""
+    return ConferenceRole.conference_id.in_(
+        select(Conference.conference_id).where(Conference.created_by_admin_id == admin_id).scalar_subquery()
+    )
+
+
+def queue_page(role, status, cursor=None, conference_id=None, page_size=None, admin_id=None):
+    """
+    One page of roles with the given role/status, plus per-conference counts; only
+    conferences created by `admin_id` when given.
+    """
+    page_size = page_size or current_app.config.get("QUEUE_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    queue = [ConferenceRole.role == role, ConferenceRole.status == status]
+    if admin_id is not None:
+        queue.append(owned_by(admin_id))
+    criteria = list(queue)
+    if conference_id:
+        criteria.append(ConferenceRole.conference_id == conference_id)
+
+    query = ConferenceRole.query.options(
+        joinedload(ConferenceRole.user),
+        joinedload(ConferenceRole.conference)
+    ).filter(*criteria)
+
+    position = _parse_cursor(cursor) if cursor else None
+    if position:
+        after_conf, after_id = position
+        query = query.filter(or_(
+            ConferenceRole.conference_id > after_conf,
+            and_(ConferenceRole.conference_id == after_conf, ConferenceRole.id > after_id)
+        ))
+
+    # One extra row tells us whether there is a next page without a COUNT
+    roles = query.order_by(ConferenceRole.conference_id, ConferenceRole.id).limit(page_size + 1).all()
+    next_cursor = None
+    if len(roles) > page_size:
+        roles = roles[:page_size]
+        next_cursor = f"{roles[-1].conference_id}.{roles[-1].id}"
+
+    conference_counts = db.session.query(
+        ConferenceRole.conference_id, Conference.title, func.count(ConferenceRole.id)
+    ).join(Conference, Conference.conference_id == ConferenceRole.conference_id).filter(
+        *queue
+    ).group_by(ConferenceRole.conference_id, Conference.title).order_by(ConferenceRole.conference_id).all()
+
+    total = sum(count for _, _, count in conference_counts)
+    return QueuePage(roles, next_cursor, conference_counts, total, conference_id)
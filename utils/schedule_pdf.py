@@ -0,0 +1,117 @@
+"""
+Programme schedule PDF assembled from per-day fragments.
+
+Each day of the schedule is rendered on its own by the configured PDF engine (the
+first day carries the title block, the last one the footer) and cached on disk
+under uploads/schedule_fragments/<conference>/<key>.pdf. The key is a SHA-256
+over everything the day prints: the sessions' names, times, locations, tracks,
+chairs and confirmed papers, plus the engine and, for the first day, the
+conference heading. Editing a day-2 session therefore changes only day 2's key:
+the other days come from the cache and the document is a page-level concatenation
+of the fragments. The assembled document is cached under the keys of its fragments.
+
+Nothing has to invalidate the cache: a stale fragment simply stops being referenced,
+and files no longer referenced are removed after each assembly. Each day starts
+on a new page.
+"""
+import hashlib
+import io
+import json
+import os
+
+from flask import current_app
+
+from utils.files import write_atomic
+from utils.pdf_engines import confirmed_papers, get_pdf_engine
+
+FRAGMENT_DIR = "schedule_fragments"
+# Bump when a schedule layout changes so cached fragments are re-rendered
+LAYOUT_VERSION = 1
+
+
+def fragment_dir(conf_id):
+    return os.path.join(current_app.root_path, "uploads", FRAGMENT_DIR, str(conf_id))
+
+
+def _session_fingerprint(session):
+    track, chair = session.track, session.session_chair_role
+    return [
+        session.session_id, session.name, session.schedule_time.isoformat(), session.location,
+        track.name if track else None, track.description if track else None,
+        chair.user.name if chair else None,
+        [(paper.paper_id, paper.title, paper.author_role.user.name) for paper in confirmed_papers(session)],
+    ]
+
+
+def fragment_key(engine, conference, day, sessions, heading, footer):
+    """Cache key of one day's fragment: changes with anything the fragment prints."""
+    payload = [LAYOUT_VERSION, engine.name, day.isoformat(), footer,
+               [_session_fingerprint(session) for session in sessions]]
+    if heading:
+        payload.append([conference.title, conference.start_date.isoformat(), conference.end_date.isoformat(),
+                        conference.location])
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def _read(path):
+    """The cached file's bytes, or None. A worker holding a newer schedule may delete it at any time."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _cached(path, render):
+    data = _read(path)
+    if data is None:
+        data = render()
+        write_atomic(path, data)
+    return data
+
+
+def schedule_pdf(conference, sessions_by_date):
+    """
+    PDF bytes of the whole schedule, re-rendering only days whose content changed.
+    `sessions_by_date` maps each day to its sessions, in calendar order.
+    """
+    engine = get_pdf_engine()
+    if not sessions_by_date:
+        return engine.schedule(conference, {})
+
+    directory = fragment_dir(conference.conference_id)
+    os.makedirs(directory, exist_ok=True)
+
+    days = list(sessions_by_date.items())
+    fragments = []
+    for index, (day, sessions) in enumerate(days):
+        heading, footer = index == 0, index == len(days) - 1
+        key = fragment_key(engine, conference, day, sessions, heading, footer)
+        fragments.append((key, day, sessions, heading, footer))
+
+    document_key = hashlib.sha256("".join(key for key, *_ in fragments).encode("ascii")).hexdigest()
+    document_path = os.path.join(directory, f"schedule-{document_key}.pdf")
+    data = _read(document_path)
+    if data is not None:
+        return data
+
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for key, day, sessions, heading, footer in fragments:
+        data = _cached(os.path.join(directory, f"{key}.pdf"),
+                       lambda: engine.schedule(conference, {day: sessions}, heading=heading, footer=footer))
+        writer.append(io.BytesIO(data))
+    output = io.BytesIO()
+    writer.write(output)
+    write_atomic(document_path, output.getvalue())
+
+    # Fragments and documents of earlier versions of the schedule are no longer reachable
+    current = {f"{key}.pdf" for key, *_ in fragments} | {os.path.basename(document_path)}
+    for name in os.listdir(directory):
+        if name.endswith(".pdf") and name not in current:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+    return output.getvalue()
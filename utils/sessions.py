@@ -0,0 +1,266 @@
+"""
+Optional server-side session store.
+
+By default Flask keeps the whole session (user_id, is_admin, is_super_admin, ...)
+in the signed cookie, so a demoted or deleted admin keeps their privileges until
+the cookie goes away. With SESSION_BACKEND set to "sql" (user_sessions table) or
+"memory" (per-process dict, for development / single-worker setups) the cookie
+only carries a signed session id and the data lives on the server:
+
+- the user's resolved global roles are cached in the session at login, so admin
+  checks need no per-request User query. The app never changes the roles of an
+  existing account; deleting an admin revokes their sessions;
+- revoke_user_sessions() logs a user out everywhere, effective on their next request.
+
+Conference roles are not cached here: they change on every approval and are
+checked against conference_roles directly.
+"""
+import hashlib
+import secrets
+import threading
+
+from flask import current_app, session
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from itsdangerous import Signer, BadSignature
+from sqlalchemy import delete, select, update
+from werkzeug.datastructures import CallbackDict
+
+from extensions import db
+from models import User, UserSession, utc_now_naive
+
+
+# ---------- STORES ----------
+
+class SQLSessionStore:
+    """Sessions in the user_sessions table. Uses its own short transactions, never db.session."""
+
+    def load(self, sid, now):
+        with db.engine.connect() as conn:
+            return conn.execute(
+                select(UserSession.data).where(UserSession.sid == sid, UserSession.expires_at > now)
+            ).scalar()
+
+    def save(self, sid, user_id, data, expires_at):
+        values = {"user_id": user_id, "data": data, "expires_at": expires_at}
+        with db.engine.begin() as conn:
+            updated = conn.execute(update(UserSession).where(UserSession.sid == sid).values(**values)).rowcount
+            if not updated:
+                conn.execute(UserSession.__table__.insert().values(sid=sid, **values))
+
+    def delete(self, sid):
+        with db.engine.begin() as conn:
+            conn.execute(delete(UserSession).where(UserSession.sid == sid))
+
+    def delete_user(self, user_id, keep_sid=None):
+        statement = delete(UserSession).where(UserSession.user_id == user_id)
+        if keep_sid:
+            statement = statement.where(UserSession.sid != keep_sid)
+        with db.engine.begin() as conn:
+            return conn.execute(statement).rowcount
+
+    def purge(self, now):
+        with db.engine.begin() as conn:
+            return conn.execute(delete(UserSession).where(UserSession.expires_at <= now)).rowcount
+
+
+class MemorySessionStore:
+    """Sessions in a per-process dict. Only suitable for a single worker."""
+
+    def __init__(self):
+        self._sessions = {}  # sid -> (user_id, data, expires_at)
+        self._lock = threading.Lock()
+
+    def load(self, sid, now):
+        record = self._sessions.get(sid)
+        if record and record[2] > now:
+            return record[1]
+        return None
+
+    def save(self, sid, user_id, data, expires_at):
+        with self._lock:
+            self._sessions[sid] = (user_id, data, expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def delete_user(self, user_id, keep_sid=None):
+        with self._lock:
+            sids = [sid for sid, record in self._sessions.items() if record[0] == user_id and sid != keep_sid]
+            for sid in sids:
+                del self._sessions[sid]
+        return len(sids)
+
+    def purge(self, now):
+        with self._lock:
+            expired = [sid for sid, record in self._sessions.items() if record[2] <= now]
+            for sid in expired:
+                del self._sessions[sid]
+        return len(expired)
+
+
+SESSION_STORES = {"sql": SQLSessionStore, "memory": MemorySessionStore}
+
+
+# ---------- SESSION INTERFACE ----------
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict whose contents live in a store; the cookie only holds the id."""
+
+    server_side = True
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.previous_sid = None
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+def _new_sid():
+    return secrets.token_urlsafe(32)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = session_json_serializer
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="server-side-session", key_derivation="hmac",
+                      digest_method=hashlib.sha256)
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.load(sid, utc_now_naive())
+                if data is not None:
+                    return ServerSideSession(self.serializer.loads(data), sid=sid)
+
+        return ServerSideSession(sid=_new_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if session.previous_sid:
+            self.store.delete(session.previous_sid)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+
+        if not self.should_set_cookie(app, session):
+            return
+
+        self.store.save(
+            session.sid,
+            session.get("user_id"),
+            self.serializer.dumps(dict(session)),
+            utc_now_naive() + app.permanent_session_lifetime
+        )
+        response.set_cookie(
+            name, self._signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session), httponly=httponly,
+            domain=domain, path=path, secure=secure, samesite=samesite
+        )
+
+
+def init_sessions(app):
+    """Installs the server-side session interface if SESSION_BACKEND asks for one."""
+    backend = app.config.get("SESSION_BACKEND", "cookie")
+    if backend == "cookie":
+        return
+    if backend not in SESSION_STORES:
+        raise RuntimeError(f"Unsupported SESSION_BACKEND: {backend}")
+    app.session_interface = ServerSideSessionInterface(SESSION_STORES[backend]())
+
+
+def _store():
+    interface = current_app.session_interface
+    return interface.store if isinstance(interface, ServerSideSessionInterface) else None
+
+
+# ---------- HELPERS USED BY THE AUTH ROUTES ----------
+
+def _role_claims(user):
+    return {"is_admin": user.is_admin, "is_super_admin": user.is_super_admin}
+
+
+def start_user_session(user):
+    """Logs `user` in: fresh session id (no fixation), identity and cached global roles."""
+    session.clear()
+    if getattr(session, "server_side", False):
+        session.previous_sid = session.sid if not session.new else None
+        session.sid = _new_sid()
+    session["user_id"] = user.user_id
+    session["user_name"] = user.name
+    session.update(_role_claims(user))
+
+
+def current_global_roles():
+    """
+    (is_admin, is_super_admin) for the logged-in user. With a server-side store the
+    cached values are authoritative; cookie sessions cannot be revoked, so they are
+    re-read from the users table.
+    """
+    if getattr(session, "server_side", False):
+        return bool(session.get("is_admin")), bool(session.get("is_super_admin"))
+
+    user = User.query.get(session["user_id"])
+    if user is None:
+        return False, False
+    return user.is_admin, user.is_super_admin
+
+
+def revoke_user_sessions(user_id, keep_current=False):
+    """Ends every server-side session of the user (optionally except the current one)."""
+    store = _store()
+    if store is None:
+        return 0
+    keep_sid = session.sid if keep_current and getattr(session, "server_side", False) else None
+    return store.delete_user(user_id, keep_sid=keep_sid)
+
+
+def purge_expired_sessions(now=None):
+    """Deletes expired server-side sessions. Returns the number removed."""
+    store = _store()
+    if store is None:
+        return 0
+    return store.purge(now or utc_now_naive())
@@ -0,0 +1,92 @@
+"""
+Worker start-up benchmark.
+
+measure_startup() boots the app in fresh interpreters, the way a gunicorn worker
+does (`from app import app`, which runs create_app()), under `python -X importtime`.
+Template warm-up is a separate, deliberate cost of web workers, so the children run
+with TEMPLATE_WARMUP=0 and the report covers the boot itself. Each run
+reports wall time, peak RSS and the import log; the slowest imports and the heavy
+optional dependencies that got loaded show what start-up is paying for. PDF
+converters and the SendGrid SDK are imported on first use, so a healthy boot lists
+none of HEAVY_MODULES. `flask benchmark-startup` prints the report.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+# Dependencies only some requests need; none of them should load at boot
+HEAVY_MODULES = ("xhtml2pdf", "sendgrid", "pypdf", "reportlab.platypus", "reportlab.pdfgen")
+
+_CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import app
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds,
+                  "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "loaded": [name for name in %r if name in sys.modules]}))
+"""
+
+
+@dataclass
+class StartupReport:
+    runs: int
+    seconds: float  # median wall time of `from app import app`
+    max_rss_mib: float  # median peak RSS after boot
+    heavy_loaded: list = field(default_factory=list)
+    slowest: list = field(default_factory=list)  # [(top-level import, cumulative seconds)], last run
+
+
+def parse_importtime(log, expand=("app",)):
+    """
+    {module: cumulative seconds} of the top-level imports in a `python -X importtime`
+    log. Modules in `expand` are replaced by what they imported directly; create_app()
+    runs after the app module has loaded, so its imports are top level already.
+    """
+    imports, children = {}, {}
+    for line in log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        # The log indents each nesting level by two spaces after the separator's one, and
+        # lists a module's imports before the module itself
+        level, seconds = (len(name) - len(name.lstrip()) - 1) // 2, int(cumulative) / 1_000_000
+        name = name.strip()
+        if level == 1:
+            children[name] = children.get(name, 0) + seconds
+        elif level == 0:
+            if name in expand:
+                for child, child_seconds in children.items():
+                    imports[child] = imports.get(child, 0) + child_seconds
+            else:
+                imports[name] = imports.get(name, 0) + seconds
+            children = {}
+    return imports
+
+
+def measure_startup(runs=3, top=10, root=None):
+    """Boots the app `runs` times in subprocesses from `root` (default: the project directory)."""
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples, log = [], ""
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD % (HEAVY_MODULES,)],
+                                cwd=root, capture_output=True, text=True, env={**os.environ, "TEMPLATE_WARMUP": "0"})
+        if result.returncode != 0:
+            raise RuntimeError(f"App failed to start:\n{result.stderr[-2000:]}")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        log = result.stderr
+
+    max_rss = statistics.median(sample["max_rss"] for sample in samples)
+    return StartupReport(
+        runs=runs,
+        seconds=statistics.median(sample["seconds"] for sample in samples),
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        max_rss_mib=max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+        heavy_loaded=samples[-1]["loaded"],
+        slowest=sorted(parse_importtime(log).items(), key=lambda item: item[1], reverse=True)[:top],
+    )
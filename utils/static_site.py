@@ -0,0 +1,167 @@
+"""
+Static copy of the public conference pages for a plain web server or CDN.
+
+publish_static_site() renders, exactly as an anonymous visitor gets them:
+
+* /explore_conferences              -> explore_conferences/index.html
+* /conference/<id>                  -> conference/<id>/index.html
+* /conference/<id>/schedule_view    -> conference/<id>/schedule_view/index.html
+* /conference/<id>/schedule_pdf     -> conference/<id>/schedule_pdf (PDF, no extension)
+
+plus the app's static/ folder. manifest.json in the output directory records the
+version tag each conference was published at (utils/content_versions.py); a run
+only re-renders conferences whose tag changed, removes conferences that no longer
+exist, and re-renders the listing when any tag changed. Schedule pages are only
+written while the schedule exists (the app redirects otherwise).
+
+Pages link to the live app for logging in and applying, so serve the directory at
+the app's own origin in front of it, e.g. nginx `try_files $uri $uri/index.html @app;`
+with `default_type application/pdf` for the schedule_pdf location.
+
+With STATIC_EXPORT_DIR set, every commit that changes public content queues a
+background publish (STATIC_PUBLISH_ON_CHANGE); `flask export-static` runs one now.
+"""
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from flask import current_app
+
+from utils.content_versions import conference_versions, listing_version, on_content_change
+from utils.files import write_atomic
+
+MANIFEST = "manifest.json"
+# Bump when the exported page set or its layout changes, so the next run re-renders everything
+EXPORT_VERSION = 1
+
+
+@dataclass
+class StaticExportReport:
+    conferences_rendered: int = 0
+    conferences_unchanged: int = 0
+    conferences_removed: int = 0
+    files_written: int = 0
+    listing_rendered: bool = False
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, data)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("export_version") == EXPORT_VERSION else {}
+
+
+def _export_page(client, url, path, mimetype="text/html"):
+    """Writes the anonymous response for `url` to `path`; removes `path` if the page is not available."""
+    response = client.get(url)
+    if response.status_code == 200 and response.mimetype == mimetype:
+        _write_atomic(path, response.get_data())
+        return True
+    _remove(path)
+    return False
+
+
+def publish_static_site(output_dir=None, force=False):
+    """
+    Brings the static copy in `output_dir` (default STATIC_EXPORT_DIR) up to date;
+    `force` re-renders everything. Must run inside an app context. Returns a StaticExportReport.
+    """
+    app = current_app._get_current_object()
+    output_dir = output_dir or app.config.get("STATIC_EXPORT_DIR")
+    if not output_dir:
+        raise ValueError("No output directory: pass one or set STATIC_EXPORT_DIR.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = {} if force else _load_manifest(output_dir)
+    published = manifest.get("conferences", {})
+    versions = {str(conf_id): tag for conf_id, tag in conference_versions().items()}
+    report = StaticExportReport()
+    # No cookie jar: a flash from a redirected page must not leak into the next one
+    client = app.test_client(use_cookies=False)
+
+    for conf_id, tag in versions.items():
+        if published.get(conf_id) == tag:
+            report.conferences_unchanged += 1
+            continue
+        base = os.path.join(output_dir, "conference", conf_id)
+        written = [
+            _export_page(client, f"/conference/{conf_id}", os.path.join(base, "index.html")),
+            _export_page(client, f"/conference/{conf_id}/schedule_view",
+                         os.path.join(base, "schedule_view", "index.html")),
+            _export_page(client, f"/conference/{conf_id}/schedule_pdf", os.path.join(base, "schedule_pdf"),
+                         mimetype="application/pdf"),
+        ]
+        report.files_written += sum(written)
+        report.conferences_rendered += 1
+        published[conf_id] = tag
+
+    for conf_id in set(published) - set(versions):
+        shutil.rmtree(os.path.join(output_dir, "conference", conf_id), ignore_errors=True)
+        del published[conf_id]
+        report.conferences_removed += 1
+
+    listing = listing_version(versions)
+    if manifest.get("listing") != listing:
+        report.files_written += _export_page(client, "/explore_conferences",
+                                             os.path.join(output_dir, "explore_conferences", "index.html"))
+        if app.static_folder and os.path.isdir(app.static_folder):
+            shutil.copytree(app.static_folder, os.path.join(output_dir, "static"), dirs_exist_ok=True)
+        report.listing_rendered = True
+
+    _write_atomic(os.path.join(output_dir, MANIFEST), json.dumps(
+        {"export_version": EXPORT_VERSION, "listing": listing, "conferences": published}, indent=1
+    ).encode("utf-8"))
+    return report
+
+
+# At most one publish queued behind the running one: each run catches up on every change
+_publisher = None
+_publisher_lock = threading.Lock()
+_queued = False
+
+
+def _publish_in_background(app):
+    global _queued
+    with _publisher_lock:
+        _queued = False
+    with app.app_context():
+        try:
+            publish_static_site()
+        except Exception as e:
+            print(f"STATIC SITE PUBLISH ERROR: {e}")
+
+
+def _schedule_publish(app):
+    def on_change(conference_ids):
+        global _publisher, _queued
+        with _publisher_lock:
+            if _queued:
+                return
+            if _publisher is None:
+                _publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="static-site")
+            _queued = True
+            _publisher.submit(_publish_in_background, app)
+    return on_change
+
+
+def init_static_site(app):
+    """Publishes the static copy after content changes when STATIC_EXPORT_DIR is set."""
+    if app.config.get("STATIC_EXPORT_DIR") and app.config.get("STATIC_PUBLISH_ON_CHANGE", True):
+        on_content_change(app, _schedule_publish(app))
@@ -0,0 +1,50 @@
+"""
+Jinja bytecode cache and template warm-up.
+
+Compiled templates are written to a FileSystemBytecodeCache directory
+(JINJA_BYTECODE_CACHE_DIR, default: Jinja's per-user temp directory), which every
+worker on the host shares: a template is compiled to Python once per source change
+and later workers only unmarshal it. Entries are keyed by the template's source
+checksum, so edited templates are recompiled automatically; writes are atomic.
+
+warm_templates() loads every template into the environment's in-memory cache. With
+TEMPLATE_WARMUP=1 (meant for the web server only; CLI commands and the start-up
+benchmark leave it off) it runs when the app is created, so a worker has all templates
+ready before it accepts traffic; with gunicorn --preload the master does it once and
+the workers inherit the result. `flask warm-templates` fills the disk cache as a deploy
+step and reports any template that fails to compile.
+"""
+import time
+
+from jinja2 import FileSystemBytecodeCache, TemplateError
+from jinja2.utils import LRUCache
+
+TEMPLATE_EXTENSIONS = (".html", ".txt", ".xml")
+
+
+def init_template_cache(app):
+    """Installs the bytecode cache unless JINJA_BYTECODE_CACHE is off. Touches no templates."""
+    if app.config.get("JINJA_BYTECODE_CACHE", True):
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+            app.config.get("JINJA_BYTECODE_CACHE_DIR") or None, "uniconfmgr-%s.cache"
+        )
+
+
+def warm_templates(app):
+    """
+    Compiles (or loads from the bytecode cache) every template of the app.
+    Returns (templates loaded, seconds, [(template name, error message)]).
+    """
+    start = time.perf_counter()
+    loaded, errors = 0, []
+    names = app.jinja_env.list_templates(filter_func=lambda name: name.endswith(TEMPLATE_EXTENSIONS))
+    # Keep every template compiled in memory (Jinja's default LRU holds 400)
+    if isinstance(app.jinja_env.cache, LRUCache) and app.jinja_env.cache.capacity < len(names) * 2:
+        app.jinja_env.cache = LRUCache(len(names) * 2)
+    for name in names:
+        try:
+            app.jinja_env.get_template(name)
+            loaded += 1
+        except TemplateError as e:
+            errors.append((name, str(e)))
+    return loaded, time.perf_counter() - start, errors
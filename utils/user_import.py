@@ -0,0 +1,299 @@
+"""
+Bulk user import from CSV.
+
+The file is streamed and handled IMPORT_CHUNK_SIZE rows at a time, so memory
+stays flat for university-sized lists. Per chunk:
+
+1. rows are validated (email-validator, no DNS lookups) and deduplicated within
+   the file;
+2. one `email IN (...)` query drops addresses that already have an account;
+3. new users are inserted with a single executemany INSERT and committed;
+4. invitation emails are queued on the outbox.
+
+Expected columns: name, email, and optionally university_name, department,
+contact_no. Imported accounts are admin-vetted, so they start email-verified.
+They start without a usable password: the invitation links to the password reset
+page (auth.reset_token) with a token valid for IMPORT_INVITATION_EXPIRES_SEC, which
+stops working once the password is set. No password is ever emailed or stored in
+the outbox, and nothing needs hashing during the import.
+
+Imports started from the admin page run on a background thread
+(start_user_import): the upload is saved to uploads/imports/<job>.csv and the
+report is written to <job>.json after every chunk, so any worker can show the
+progress (import_status). The CSV is deleted once the import ends. A job whose
+status file has not been touched for STALE_AFTER_SEC is reported as failed: the
+process running it has exited (queued jobs are touched by the running one).
+`flask import-users` runs inline.
+"""
+import csv
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from email_validator import validate_email, EmailNotValidError
+from flask import current_app, render_template, url_for
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import User, utc_now_naive
+from utils.email_utils import enqueue_email
+from utils.files import atomic_open
+from utils.passwords import UNUSABLE_PASSWORD
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_INVITATION_EXPIRES_SEC = 7 * 24 * 3600
+MAX_REPORTED_ERRORS = 100
+IMPORTS_DIR = "imports"
+# Chunks are written every few seconds; this much silence means the worker is gone
+STALE_AFTER_SEC = 300
+
+REQUIRED_COLUMNS = {"name", "email"}
+# Optional column -> users column length
+OPTIONAL_COLUMNS = {"university_name": 200, "department": 200, "contact_no": 20}
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    invitations_queued: int = 0
+    # (line number, message); capped at MAX_REPORTED_ERRORS
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+@dataclass
+class ImportStatus:
+    # "queued", "running", "finished" or "failed"
+    state: str
+    report: ImportReport
+    error: str = None
+
+
+def _parse_row(line, row, seen, report):
+    name = (row.get("name") or "").strip()
+    raw_email = (row.get("email") or "").strip()
+    if not name or not raw_email:
+        report.add_error(line, "Missing name or email.")
+        return None
+
+    try:
+        email = validate_email(raw_email, check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        report.add_error(line, f"{raw_email}: {e}")
+        return None
+
+    if email in seen:
+        report.duplicates += 1
+        return None
+    seen.add(email)
+
+    parsed = {"name": name[:120], "email": email}
+    for column, max_length in OPTIONAL_COLUMNS.items():
+        parsed[column] = (row.get(column) or "").strip()[:max_length] or None
+    return parsed
+
+
+def _new_rows(chunk):
+    emails = [row["email"] for row in chunk]
+    existing = set(db.session.execute(select(User.email).where(User.email.in_(emails))).scalars())
+    return [row for row in chunk if row["email"] not in existing]
+
+
+def _import_chunk(chunk, report):
+    """Inserts the chunk's new accounts and commits. Returns their email addresses."""
+    new_rows = _new_rows(chunk)
+    now = utc_now_naive()
+    for attempt in range(2):
+        if not new_rows:
+            break
+        try:
+            db.session.execute(insert(User), [
+                dict(row, password_hash=UNUSABLE_PASSWORD, is_email_verified=True, is_admin=False,
+                     is_super_admin=False, created_at=now)
+                for row in new_rows
+            ])
+            db.session.commit()
+            break
+        except IntegrityError:
+            # Someone registered one of these addresses since the lookup: re-check once
+            db.session.rollback()
+            if attempt:
+                raise
+            new_rows = _new_rows(new_rows)
+
+    report.duplicates += len(chunk) - len(new_rows)
+    report.created += len(new_rows)
+    return [row["email"] for row in new_rows]
+
+
+def _queue_invitations(emails, base_url, report):
+    if not emails:
+        return
+    expires_sec = current_app.config.get("IMPORT_INVITATION_EXPIRES_SEC", DEFAULT_INVITATION_EXPIRES_SEC)
+    users = db.session.execute(select(User).where(User.email.in_(emails))).scalars()
+    # Links are built for the site at `base_url`: imports also run without a request
+    with current_app.test_request_context(base_url=base_url):
+        for user in users:
+            enqueue_email(
+                user.email,
+                "Your UniConfMgr account has been created",
+                html_content=render_template(
+                    "emails/imported_user_invitation.html",
+                    name=user.name, email=user.email, expires_days=max(expires_sec // 86400, 1),
+                    set_password_url=url_for("auth.reset_token", token=user.get_reset_token(expires_sec),
+                                             _external=True)
+                )
+            )
+            report.invitations_queued += 1
+
+
+def import_users(text_stream, base_url, send_invitations=True, on_progress=None):
+    """
+    Imports users from a CSV text stream; invitation links point at the site at
+    `base_url`. `on_progress(report)` is called after every chunk. Returns the
+    ImportReport; raises ValueError for a bad header.
+    """
+    chunk_size = current_app.config.get("IMPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+
+    reader = csv.DictReader(text_stream)
+    columns = {column.strip() for column in (reader.fieldnames or [])}
+    missing = REQUIRED_COLUMNS - columns
+    if missing:
+        raise ValueError(f"CSV is missing required column(s): {', '.join(sorted(missing))}.")
+    reader.fieldnames = [column.strip() for column in reader.fieldnames]
+
+    report = ImportReport()
+    seen = set()
+    chunk = []
+
+    def flush():
+        created = _import_chunk(chunk, report)
+        if send_invitations:
+            _queue_invitations(created, base_url, report)
+        chunk.clear()
+        if on_progress:
+            on_progress(report)
+
+    # Line 1 is the header
+    for line, row in enumerate(reader, start=2):
+        report.rows_read += 1
+        parsed = _parse_row(line, row, seen, report)
+        if parsed:
+            chunk.append(parsed)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    return report
+
+
+def _job_paths(job_id):
+    """(csv path, status path) of an import job."""
+    directory = os.path.join(current_app.root_path, "uploads", IMPORTS_DIR)
+    return os.path.join(directory, f"{job_id}.csv"), os.path.join(directory, f"{job_id}.json")
+
+
+def _save_status(path, state, report, error=None):
+    with atomic_open(path, "w", encoding="utf-8") as f:
+        json.dump({"state": state, "report": asdict(report), "error": error}, f)
+
+
+def import_status(job_id):
+    """ImportStatus of a job started by start_user_import, or None if there is no such job."""
+    if not job_id.isalnum():
+        return None
+    _, status_path = _job_paths(job_id)
+    try:
+        with open(status_path, encoding="utf-8") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return None
+    report = ImportReport(**saved["report"])
+    report.errors = [tuple(error) for error in report.errors]
+    status = ImportStatus(saved["state"], report, saved["error"])
+    if status.state in ("queued", "running") and time.time() - os.path.getmtime(status_path) > STALE_AFTER_SEC:
+        status.state = "failed"
+        status.error = ("The import stopped unexpectedly (the server process running it exited). "
+                        "Accounts created so far are kept; import the file again to add the rest.")
+    return status
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Status paths of the jobs queued in this process, kept fresh by the running import
+_waiting = set()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # One import at a time per process
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-import")
+        return _executor
+
+
+def _import_in_background(app, job_id, base_url, send_invitations):
+    with app.app_context():
+        csv_path, status_path = _job_paths(job_id)
+        last = ImportReport()
+
+        def progress(report):
+            nonlocal last
+            last = report
+            _save_status(status_path, "running", report)
+            with _executor_lock:
+                waiting = list(_waiting)
+            for path in waiting:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    pass
+
+        with _executor_lock:
+            _waiting.discard(status_path)
+
+        try:
+            with open(csv_path, encoding="utf-8-sig", newline="") as f:
+                report = import_users(f, base_url, send_invitations=send_invitations, on_progress=progress)
+            _save_status(status_path, "finished", report)
+        except Exception as e:
+            print(f"USER IMPORT ERROR ({job_id}): {e}")
+            _save_status(status_path, "failed", last, str(e) or e.__class__.__name__)
+        finally:
+            db.session.remove()
+            try:
+                os.remove(csv_path)
+            except FileNotFoundError:
+                pass
+
+
+def start_user_import(upload, base_url, send_invitations=True):
+    """
+    Saves an uploaded CSV (anything with .save(path), e.g. a werkzeug FileStorage)
+    and imports it on a background thread. Must be called inside an app context.
+    Returns the job id for import_status().
+    """
+    job_id = secrets.token_hex(8)
+    csv_path, status_path = _job_paths(job_id)
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    upload.save(csv_path)
+    _save_status(status_path, "queued", ImportReport())
+    executor = _get_executor()
+    with _executor_lock:
+        _waiting.add(status_path)
+    executor.submit(_import_in_background, current_app._get_current_object(), job_id, base_url, send_invitations)
+    return job_id